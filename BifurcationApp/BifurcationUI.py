@@ -1,19 +1,21 @@
 import streamlit as st
-import pyfurc as pf
-import matplotlib.pyplot as plt
-import sympy as sp
 import numpy as np
-from PIL import Image
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
 import os
-import shutil
-import pandas as pd
+import time
+import uuid
+from bifurcation_engine import KIT_CASES, METRICS, span
 
-# Directory to save images and plots
-SAVE_DIR = "stability_analysis_files"
-if not os.path.exists(SAVE_DIR):
-    os.makedirs(SAVE_DIR)
+# Heavy modules (sympy, pyfurc, pandas, Matplotlib, reportlab, PIL) are imported by the pages and
+# helpers that use them, so a cold start only pays for the selected page.
+
+# Set BIFURCATION_ANALYTIC=0 to always run the AUTO continuation
+USE_ANALYTIC = os.environ.get("BIFURCATION_ANALYTIC", "1") != "0"
+
+# Set BIFURCATION_SOLVER=numpy to replace AUTO with the in-process NumPy continuation
+SOLVER = os.environ.get("BIFURCATION_SOLVER", "auto")
+
+# Width of the main column of the page, plots are rendered to this many pixels
+PLOT_WIDTH = 704
 #######################################################################################################################################
 # Helping Functions
 def set_custom_theme():
@@ -45,127 +47,261 @@ def set_custom_theme():
     """
     
     st.markdown(custom_css, unsafe_allow_html=True)
-    
-def plot_bifurcation(P_max, parameter, energy_formula, constants):
+
+@st.cache_resource
+def get_solution_cache():
+    from bifurcation_engine import SolutionCache
+    # Shared by all sessions of the server; set BIFURCATION_CACHE_DIR to also keep solutions on disk
+    return SolutionCache(max_entries=64, disk_dir=os.environ.get("BIFURCATION_CACHE_DIR"))
+
+@st.cache_resource
+def get_workspace_manager():
+    from bifurcation_engine import WorkspaceManager
+    # Scratch directories for the solver runs, on tmpfs when available (see BIFURCATION_WORKSPACE_DIR)
+    workspace = WorkspaceManager()
+    workspace.remove_stale()
+    return workspace
+
+@st.cache_resource
+def get_report_builder():
+    from bifurcation_engine import ReportBuilder
+    # Built reports and their decoded images, shared by all sessions
+    return ReportBuilder()
+
+@st.cache_resource
+def get_sketch_store():
+    from bifurcation_engine import SketchStore
+    # Uploaded sketches by content hash, decoded and scaled once for all sessions
+    return SketchStore()
+
+def get_session_id():
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+@st.cache_resource
+def get_job_scheduler():
+    from bifurcation_engine import JobScheduler
+    # Solver runs happen in worker processes so that the page stays responsive (see BIFURCATION_SOLVER_WORKERS)
+    return JobScheduler(max_workers=int(os.environ.get("BIFURCATION_SOLVER_WORKERS", 0)) or None)
+
+@st.fragment(run_every=0.5)
+def show_job_progress(job_id):
+    scheduler = get_job_scheduler()
+    if scheduler.status(job_id) not in ("queued", "running"):
+        st.rerun()  # Rerun the whole page to pick up the result
+    stage, fraction, elapsed = scheduler.progress(job_id)
+    st.progress(fraction, text=f"Solving ({stage}, {elapsed:.1f} s)...")
+
+def solve_bifurcation(slot, energy_formula, parameter, P_max, constants):
+    """Returns the bifurcation branches as a BranchStore, or None while they are still being solved in the background.
+
+    The continuation (AUTO, or NumPy with BIFURCATION_SOLVER=numpy) only runs on a cache
+    miss when the energy has no closed-form equilibrium paths. Finished results are delivered into
+    `st.session_state.solutions[slot]`; a job for outdated inputs of the same slot is cancelled.
+    Every point is classified as stable or unstable from the Hessian of the energy.
+    `parameter` may name several DOFs ("q1, q2"); they become U(1), U(2), ... in that order.
+    """
+    from bifurcation_engine import (
+        build_energy_expression, classified_store, compile_energy, dof_names, solution_key, solution_metadata,
+        solve_analytic, solve_continuation, solve_job,
+    )
+    energy = build_energy_expression(energy_formula, parameter, constants)
+    key = solution_key(energy, parameter, P_max, constants)
+    solutions = st.session_state.setdefault("solutions", {})
+    if slot in solutions and solutions[slot][0] == key:
+        METRICS.count("cache.session.hit")
+        return solutions[slot][1]
+    METRICS.count("cache.session.miss")
+
+    branches = get_solution_cache().get(key)
+    if branches is None and USE_ANALYTIC:
+        # Closed-form equilibrium paths take milliseconds, AUTO is only needed without them
+        analytic_branches = solve_analytic(energy, constants, P_max)
+        if analytic_branches is not None:
+            branches = get_solution_cache().put(
+                key, analytic_branches, solution_metadata(energy, parameter, P_max, constants, "analytic")
+            )
+    if branches is None and SOLVER == "numpy":
+        # Small problems solve in milliseconds in this process, without code generation or files
+        compiled = compile_energy(energy_formula, parameter, list(constants))
+        branches = get_solution_cache().put(
+            key, solve_continuation(compiled, constants, P_max),
+            solution_metadata(energy, parameter, P_max, constants, "numpy"),
+        )
+    if branches is None:
+        scheduler = get_job_scheduler()
+        owner = f"{get_session_id()}/{slot}"
+        job_args = (solve_job, energy, constants, P_max, get_workspace_manager().root, get_session_id(), dof_names(parameter))
+        job_id = scheduler.submit(owner, key, *job_args)
+        if scheduler.status(job_id) in ("cancelled", "unknown"):
+            # Superseded, or dropped by the scheduler (e.g. its pool was shut down): solve again
+            scheduler.cancel(job_id)
+            job_id = scheduler.submit(owner, key, *job_args)
+        status = scheduler.status(job_id)
+        if status in ("cancelled", "unknown"):
+            scheduler.forget(job_id)
+            raise RuntimeError("The solver job was cancelled, please try again")
+        if status not in ("done", "failed"):
+            show_job_progress(job_id)
+            return None
+        try:
+            branches = get_solution_cache().put(
+                key, scheduler.result(job_id), solution_metadata(energy, parameter, P_max, constants, "auto")
+            )
+        finally:
+            scheduler.forget(job_id)
+    solutions[slot] = (key, classified_store(branches, energy_formula, parameter, constants))
+    return solutions[slot][1]
+
+def plot_bifurcation(P_max, parameter, energy_formula, constants, plot_dof=None):
+    from bifurcation_engine import bifurcation_figure, dof_names
     try:
-        q = pf.Dof(parameter)
-        P = pf.Load("P")
-        theta = q
-        for key, value in constants.items():
-            globals()[key] = float(value)
-    
-        V = pf.Energy(eval(energy_formula))
-        bf = pf.BifurcationProblem(V, name="bifurcation_solution")
-        bf.set_parameter("RL1", P_max)
-        
-        solver = pf.BifurcationProblemSolver(bf)
-        solver.solve()
-        
-        # Plot the Bifurcation Plot
-        fig, ax = plt.subplots()
-        for branch in bf.solution.raw_data:
-            ax.plot(branch["U(1)"], branch["PAR(1)"])
+        raw_data = solve_bifurcation("stability_analysis", energy_formula, parameter, P_max, constants)
+        if raw_data is None:
+            return  # Still solving, the page reruns once the result is ready
         
-        ax.set_xlabel(parameter)
-        ax.set_ylabel("P")
-        ax.set_title("Bifurcation Plot")
-        
-        # Save plot to session state and folder
-        plot_path = os.path.join(SAVE_DIR, "bifurcation_plot.png")
-        fig.savefig(plot_path)
-        plt.close(fig)
-        
-        # Store the plot path in session state
-        st.session_state.plot_path = plot_path
+        # Keep the plot as a figure spec: rendered to PNG for the page, drawn as vectors into the report
+        dofs = dof_names(parameter)
+        plot_dof = plot_dof if plot_dof in dofs else dofs[0]
+        st.session_state.plot_spec = bifurcation_figure(
+            raw_data, xlabel=plot_dof, ylabel="P", dof=f"U({dofs.index(plot_dof) + 1})"
+        )
         st.session_state.plot_ready = True
+        st.session_state.plot_request = None
 
+    except Exception as e:
+        st.session_state.plot_request = None
+        st.error(f"An error occurred: {e}")
+
+def show_result_table(result_frame, key, page_size=200):
+    """Shows a result table one page at a time instead of sending every row to the browser."""
+    n_pages = result_frame.n_pages(page_size)
+    page_number = 1
+    if n_pages > 1:
+        page_number = st.number_input(f"Table page (1 - {n_pages})", min_value=1, max_value=n_pages, value=1, step=1, key=key)
+    st.dataframe(result_frame.page(page_number - 1, page_size), hide_index=True)
+    st.caption(f"{len(result_frame)} points in total")
+
+def show_interactive_plots(store, xlabel, load, P_max, configuration, initial_configuration):
+    """Bifurcation and deformation plots that follow a load slider from 0 to `P_max` in the browser, without reruns."""
+    from bifurcation_engine import interactive_chart
+    chart = interactive_chart(
+        store, np.linspace(0, P_max, 301), xlabel, "Load (P)", load,
+        configuration=configuration, initial_configuration=initial_configuration,
+    )
+    st.vega_lite_chart(chart, use_container_width=True)
+
+def show_load_animation(store, dof_label, P_max, configuration, initial_configuration):
+    """Load-stepping animation of the deformed system from 0 to `P_max`, played and scrubbed in the browser."""
+    import streamlit.components.v1 as components
+    from bifurcation_engine import animation_frames, animation_html
+    frames = animation_frames(store, np.linspace(0, P_max, 301), configuration, initial_configuration)
+    components.html(animation_html(frames, dof_label), height=360)
+
+def show_diagnostics(trace_id, started):
+    """Sidebar panel with the timed stages of this rerun, the stage statistics and the cache counters of the server."""
+    import pandas as pd
+    spans = sorted(METRICS.spans(trace_id), key=lambda item: item["start"])
+    parents = {item["span_id"]: item["parent_id"] for item in spans}
+
+    def depth(item):
+        level, parent = 0, item["parent_id"]
+        while parent in parents:
+            level, parent = level + 1, parents[parent]
+        return level
+
+    with st.sidebar:
+        st.subheader("Diagnostics")
+        st.caption(f"Rerun {trace_id} took {(time.perf_counter() - started) * 1000:.0f} ms so far")
+        if spans:
+            st.dataframe(pd.DataFrame({
+                "Stage": ["· " * depth(item) + item["name"] for item in spans],
+                "ms": [round(item["duration_ms"], 1) for item in spans],
+                "Details": [", ".join(f"{k}={v}" for k, v in item["attributes"].items()) for item in spans],
+            }), hide_index=True)
+        else:
+            st.caption("No timed stages in this rerun, everything came from the caches.")
+        stages = METRICS.stages()
+        if stages:
+            st.caption("All reruns of the server")
+            st.dataframe(pd.DataFrame({
+                "Stage": list(stages),
+                "Count": [stage["count"] for stage in stages.values()],
+                "Mean ms": [round(stage["mean_ms"], 1) for stage in stages.values()],
+                "Max ms": [round(stage["max_ms"], 1) for stage in stages.values()],
+            }), hide_index=True)
+        counters = METRICS.counters()
+        if counters:
+            st.dataframe(pd.DataFrame({"Counter": list(counters), "Value": list(counters.values())}), hide_index=True)
+        st.download_button("Download trace (JSON)", METRICS.to_json(trace_id), file_name=f"trace-{trace_id}.json",
+                           mime="application/json")
+        st.download_button("Download metrics (Prometheus)", METRICS.to_prometheus(), file_name="metrics.prom",
+                           mime="text/plain")
+
+def show_case_page(case):
+    """Page of a kit case: inputs, bifurcation plot and table, and the deformed system at the chosen load."""
+    from bifurcation_engine import ResultFrame, bifurcation_figure, deformation_figure
+    st.subheader(case.title)
+    show_image(case.image)
+
+    values = {item.name: st.number_input(item.label, value=item.default, step=item.step) for item in case.inputs}
+    load = values.pop("P")
+    constants = values
+    try:
+        raw_data = solve_bifurcation(f"{case.key}_bifurcation", case.formula, case.dof, case.P_max, constants)
     except Exception as e:
         st.error(f"An error occurred: {e}")
+        return
+    if raw_data is None:
+        st.stop()  # Still solving, the page reruns once the result is ready
+
+    # All equilibria at the requested load, interpolated along the branches
+    equilibria = raw_data.equilibria_at(load)
+    value = equilibria[-1] if len(equilibria) else None
+    spec = bifurcation_figure(raw_data, xlabel=case.dof_label, ylabel="Load (P)")
+    if value is not None:
+        # Highlight the identified points on the plot
+        spec.add_points(equilibria, load, color="red", label=f"Equilibria at P = {load:.3f}")
+        st.success(
+            f"The corresponding {case.dof} for load {load} is {value:.6f}"
+            + (f" (all equilibria: {', '.join(f'{v:.6f}' for v in equilibria)})" if len(equilibria) > 1 else "")
+        )
+    else:
+        st.warning(f"No corresponding {case.dof} found for load {load}")
 
-def save_pdf(description, uploaded_image_path, energy_formula, parameter, P_max, constants, plot_path):
-    pdf_path = os.path.join(SAVE_DIR, "bifurcation_report.pdf")
-    c = canvas.Canvas(pdf_path, pagesize=letter)
-
-    # Define starting positions and page dimensions
-    text_y = 750
-    text_x = 100
-    line_height = 14  # Height of each text line
-    bottom_margin = 50  # Margin to avoid text running into the footer or plot
-    page_width = letter[0] - 2 * text_x
-
-    # Function to add text and handle page breaks with word wrapping
-    def add_text(text, font_size):
-        nonlocal text_y
-        c.setFont("Helvetica", font_size)
-        lines = []
-        for line in text.split('\n'):
-            line = line.strip()
-            if not line:
-                lines.append("")
-                continue
-            while line:
-                if c.stringWidth(line, "Helvetica", font_size) <= page_width:
-                    lines.append(line)
-                    break
-                # Split line by words to fit within page width
-                split_point = len(line)
-                while c.stringWidth(line[:split_point], "Helvetica", font_size) > page_width:
-                    split_point = line.rfind(' ', 0, split_point)
-                if split_point == -1:
-                    split_point = len(line)
-                lines.append(line[:split_point])
-                line = line[split_point:].strip()
-
-        for line in lines:
-            if text_y <= bottom_margin:
-                c.showPage()
-                c.setFont("Helvetica", font_size)
-                text_y = 750
-            c.drawString(text_x, text_y, line)
-            text_y -= line_height
-
-    # Add the description to the PDF
-    add_text("Stability Analysis:\n", 20)
-    add_text("Description:", 16)
-    add_text("\n" + description, 12)
-    add_text("\nSketch:", 16)
-
-    # Add uploaded image to PDF, check if there's space, else create a new page
-    if uploaded_image_path:
-        if text_y - 300 <= bottom_margin:
-            c.showPage()
-            text_y = 750
-        c.drawImage(uploaded_image_path, text_x, text_y - 300, width=400, height=300)
-        text_y -= 320
-
-    # Add text for the inputs below the image, with space check
-    add_text("\nEnergy Formula:\n", 12)
-    add_text(f"V = {energy_formula}", 12)
-    add_text(f"Parameter = {parameter}", 12)
-    add_text(f"Max Parameter (P_max) = {P_max}", 12)
-    for key, value in constants.items():
-        add_text(f"{key} = {value}", 12)
-    # Add the plot to the PDF, check if there's space, else create a new page
-    if text_y - 300 <= bottom_margin:
-        c.showPage()
-        text_y = 750
-    add_text("\nPlot:", 16)
-    c.drawImage(plot_path, text_x, text_y - 300, width=400, height=300)
-
-    # Save the PDF
-    c.save()
-
-    return pdf_path
-
-def delete_bifurcation_folders():
-    script_dir = os.path.dirname(os.path.abspath(__file__))  # Get the script's directory
-    for folder in os.listdir(script_dir):
-        folder_path = os.path.join(script_dir, folder)
-        if os.path.isdir(folder_path) and folder.startswith("bifurcation_solution"):
-            shutil.rmtree(folder_path)
+    # Display the table in Streamlit
+    st.subheader(f"Data Table (P vs. {case.dof})")
+    show_result_table(ResultFrame(raw_data, dof_labels={"U(1)": case.dof_label}), key=f"{case.key}_table")
+
+    st.subheader("Plots")
+    if st.toggle("Interactive plots", key=f"{case.key}_interactive"):
+        show_interactive_plots(
+            raw_data, case.dof_label, load, case.P_max,
+            lambda P, dof: case.deformed(constants, P, dof), case.initial(constants),
+        )
+    elif st.button(case.plot_button):
+        with span("plot.render", figure="bifurcation"):
+            st.pyplot(spec.to_matplotlib())
+        if value:
+            xs, ys = case.deformed(constants, load, value)
+            with span("plot.render", figure="deformation"):
+                st.pyplot(deformation_figure(case.initial(constants), (xs, ys), case.deformation_title))
+            for line in case.results(constants, load, value):
+                st.write(line)
+    if st.toggle(
+        "Load-stepping animation", key=f"{case.key}_animation",
+        help=f"Increases the load from 0 to {case.P_max:g} along the equilibrium path, with buckling and snap-through. "
+             "All frames are computed at once, playing and scrubbing runs in the browser."
+    ):
+        show_load_animation(
+            raw_data, case.dof_label, case.P_max,
+            lambda P, dof: case.deformed(constants, P, dof), case.initial(constants),
+        )
 
 def show_image(filename):
     """Displays an image in a Streamlit app."""
+    from PIL import Image
     try:
         image = Image.open(filename)  # Open the image file
         st.image(image, caption="Uploaded Image", use_container_width =True)  # Show the image
@@ -181,12 +317,17 @@ def show_image(filename):
 set_custom_theme()
 st.title("Bifurcation App")
 
+# Every rerun is one trace of the timing metrics, see the Diagnostics panel of the sidebar
+st.session_state.reruns = st.session_state.get("reruns", 0) + 1
+trace_id = METRICS.begin_trace(f"{get_session_id()[:8]}-{st.session_state.reruns}")
+rerun_started = time.perf_counter()
+
 # Sidebar for Navigation
-page = st.sidebar.radio("Navigation", ["Stability Analysis","Stable Symmetric Bifurcation", "Unstable Symmetric Bifurcation", "Asymmetric Bifurcation", "Limit Point / Saddle-node"])
+page = st.sidebar.radio("Navigation", ["Stability Analysis", *KIT_CASES.titles(), "Limit Point / Saddle-node"])
 
 # Define pages
 if page == "Stability Analysis":
-    delete_bifurcation_folders()
+    from bifurcation_engine import FormulaError, dof_names, parse_constants
     st.subheader("Stability Analysis")
     # Description Input Section
     st.subheader("Description")
@@ -207,27 +348,41 @@ if page == "Stability Analysis":
         help="Upload an image (sketch) to visualize the problem setup."
     )
     
-    # Display uploaded image
-    uploaded_image_path = None
+    # Display the scaled-down variant of the uploaded image, decoded only once per upload
+    sketch = None
     if uploaded_file is not None:
-        image = Image.open(uploaded_file)
-        uploaded_image_path = os.path.join(SAVE_DIR, "uploaded_image.png")
-        image.save(uploaded_image_path)
-        st.image(image, caption="Uploaded Image", use_container_width=True)
+        try:
+            sketch = get_sketch_store().prepare(uploaded_file)
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            st.image(sketch.display, caption="Uploaded Image", use_container_width=True)
     
     # Inputs
     st.subheader("Input Parameters")
     energy_formula = st.text_input(
         "Energy Formula V", 
         "(1 / 2) * k * (q ** 2) * l ** 2 - 2 * P * l * (1 - sp.sqrt(1 - q ** 2))",
-        help="Define the energy formula (V). Use sp.cos(x), sp.sin(x), and sp.sqrt(x) for cosine(x), sine(x), and √x functions respectively. Use P as a force variable"
+        help="Define the energy formula (V). Use sp.cos(x), sp.sin(x), and sp.sqrt(x) (or cos(x), sin(x), sqrt(x)) for cosine(x), sine(x), and √x functions respectively. Use P as a force variable"
     )
     
     parameter = st.text_input(
         "Parameter (Degree of Freedom)", 
         "q",
-        help="Enter the name of the parameter (degree of freedom) to use in the formula, `q` for translation, or `theta` for rotation."
+        help="Enter the name of the parameter (degree of freedom) to use in the formula, `q` for translation, or `theta` for rotation. "
+             "For systems with several degrees of freedom, e.g. chains of links, enter their names separated by commas: `q1, q2, q3`."
     )
+    try:
+        dofs = dof_names(parameter)
+    except FormulaError as e:
+        st.error(str(e))
+        dofs = None
+    plot_dof = None
+    if dofs is not None and len(dofs) > 1:
+        plot_dof = st.selectbox(
+            "Plotted Degree of Freedom", dofs,
+            help="The bifurcation plot shows P against this degree of freedom; the stability is that of the whole system."
+        )
     P_max = st.number_input(
         "Max Parameter (P_max)", 
         min_value=0.0, 
@@ -240,10 +395,14 @@ if page == "Stability Analysis":
         "{'l': 1, 'k': 1}", 
         help="Enter the constant variables of the system. Syntax: `{'constant_name_1': value_1, constant_name_2': value_2, ...}`"
     )
-    constants = eval(constants)
-    if 'q' in constants:
+    try:
+        constants = parse_constants(constants)
+    except FormulaError as e:
+        st.error(str(e))
+        constants = None
+    if constants is not None and 'q' in constants:
         st.error("Constants should not contain 'q'. Please remove it.")
-    elif 'theta' in constants:
+    elif constants is not None and 'theta' in constants:
         st.error("Constants should not contain 'theta'. Please remove it.")
                 
         
@@ -255,407 +414,47 @@ if page == "Stability Analysis":
     st.subheader("Plot")
     
     # Buttons
-    if st.button("Plot"):
-        plot_bifurcation(P_max, parameter, energy_formula, constants)
+    if st.button("Plot") and constants is not None and dofs is not None:
+        st.session_state.plot_request = (P_max, parameter, energy_formula, constants, plot_dof)
+    if st.session_state.get("plot_request") is not None:
+        plot_bifurcation(*st.session_state.plot_request)
     
     if st.button("Clear Plot"):
         st.write("Plot cleared.")
         st.session_state.plot_ready = False
+        st.session_state.plot_request = None
     
     # Display the plot once it is generated and stored
     if st.session_state.plot_ready:
-        st.image(st.session_state.plot_path, caption="Bifurcation Plot", use_container_width=True)
-    
-    # Automatically generate and download PDF once everything is ready
-    if st.session_state.plot_ready:
-        if os.path.exists(SAVE_DIR):
-            plot_path = st.session_state.plot_path
-            if os.path.exists(plot_path):
-                pdf_path = save_pdf(
-                    st.session_state.get("description", ""),
-                    uploaded_image_path,
-                    energy_formula,
-                    parameter,
-                    P_max,
-                    constants,
-                    plot_path
-                )
-                
-                # Automatically trigger the download after generating the PDF
-                with open(pdf_path, "rb") as f:
-                    st.download_button(
-                        label="Generate Report",  # Renamed the button
-                        data=f,
-                        file_name="bifurcation_report.pdf",
-                        mime="application/pdf"
-                    )
-            else:
-                st.error("Please generate the plot before downloading the PDF.")
+        st.image(st.session_state.plot_spec.to_png(PLOT_WIDTH), caption="Bifurcation Plot", use_container_width=True)
+    
+    # The report is only rendered when the button is clicked, and only once per set of inputs
+    if st.session_state.plot_ready and constants is not None:
+        report_inputs = (
+            st.session_state.get("description", ""),
+            sketch.report if sketch is not None else None,
+            energy_formula,
+            parameter,
+            P_max,
+            constants,
+            st.session_state.plot_spec,
+        )
+        st.download_button(
+            label="Generate Report",  # Renamed the button
+            data=lambda: get_report_builder().build(*report_inputs),
+            file_name="bifurcation_report.pdf",
+            mime="application/pdf"
+        )
 #######################################################################################################################################
-############################################### Asymmetric Bifurcation ################################################################    
-elif page == "Asymmetric Bifurcation":
-    delete_bifurcation_folders()
-    
-    st.subheader("Asymmetric Bifurcation")
-    
-    show_image("images/asymmetric_case.jpeg")
-    
-    def calculate_and_plot_q_asym_bifurc(load, length, stiffness):
-        try:
-            l = length
-            q = pf.Dof("q")
-            P = pf.Load("P")
-            k = stiffness
-            
-            V = pf.Energy(eval("k*l*(1-sp.sqrt(1+q))**2 - P*l*(1-sp.sqrt(1-q**2))"))
-            bf = pf.BifurcationProblem(V, name="bifurcation_solution")
-            bf.set_parameter("RL1", 3)
-            
-            solver = pf.BifurcationProblemSolver(bf)
-            solver.solve()
-            
-            # Plot the Bifurcation Plot
-            fig, ax = plt.subplots()
-            corresponding_q = None
-            print(bf.solution.raw_data)
-            raw_data_list = []
-            for branch in bf.solution.raw_data:
-                ax.plot(branch["U(1)"], branch["PAR(1)"])
-            
-                # print(branch["U(1)"], branch["PAR(1)"])
-                # Convert raw_data to a pandas DataFrame
-                
-                # Search for the load in PAR(1) and find the corresponding q in U(1)
-                for par_value, u_value in zip(branch["PAR(1)"], branch["U(1)"]):
-                    raw_data_list.append({"Load (P)": par_value, "Displacement (q)": u_value})
-                    if abs(par_value - load) < 1e-2:  # Tolerance for floating-point comparison
-                        corresponding_q = u_value
-
-            if corresponding_q is not None:
-                # Highlight the identified point on the plot
-                ax.scatter(corresponding_q, load, color="red", label=f"Point ({corresponding_q:.3f}, {load:.3f})", zorder=5)
-
-            ax.set_xlabel("Displacement (q)")
-            ax.set_ylabel("Load (P)")
-            ax.set_title("Bifurcation Plot")
-            ax.legend()
-        
-            if corresponding_q is not None:
-                st.success(f"The corresponding q for load {load} is {corresponding_q:.6f}")
-            else:
-                st.warning(f"No corresponding q found for load {load}")
-    
-            return corresponding_q, fig, raw_data_list
-    
-        except Exception as e:
-            st.error(f"An error occurred: {e}")
-            return None
-
-
-    def calculate_vertical_displacement(P, k):
-        return P / k  # Hooke's law: displacement = force / spring constant
-
-    def plot_deformation(L, k, P, q):
-        # Compute displacements
-        delta = calculate_vertical_displacement(P, k)
-    
-        # Initial coordinates
-        x1, y1 = 0, 0
-        x2, y2 = L, 0
-        x3, y3 = L, L
-    
-        # Deformed coordinates
-        x3_def = L + q * L  # Top node moves horizontally
-        y3_def = L - delta  # Top node moves vertically
-    
-        # Plot the initial and deformed system
-        fig, ax = plt.subplots(figsize=(5, 4))
-        ax.plot([x1, x3, x2], [y1, y3, y2], 'o-', label='Initial Configuration', color='blue')
-        ax.plot([x1, x3_def, x2], [y1, y3_def, y2], 'o--', label='Deformed Configuration', color='red')
-    
-        # Plot settings
-        ax.set_title("Deformation of the 2 Rigid Links with Spring embedded in the left one")
-        ax.set_xlabel("X (cm)")
-        ax.set_ylabel("Y (cm)")
-        ax.axhline(0, color='black', linewidth=0.5, linestyle='--')
-        ax.axvline(0, color='black', linewidth=0.5, linestyle='--')
-        ax.legend()
-        ax.grid(True)
-        ax.axis('equal')
-    
-        return fig, delta, q * L    
-    
-    L = st.number_input("L (cm):", value=2.0, step=0.1)
-    k = st.number_input("k (N/cm):", value=1.0, step=0.1)
-    
-        
-    P = st.number_input("P (N):", value=1.41, step=0.1)
-    # q = st.number_input("q (ratio):", value=0.2, step=0.01)
-    # if st.button("Get Data Table"):
-    q, fig,raw_data_list = calculate_and_plot_q_asym_bifurc(P, L, k)
-    df = pd.DataFrame(raw_data_list)
-
-    # Display the table in Streamlit
-    st.subheader("Data Table (P vs. q)")
-    st.dataframe(df)
-    
-        
-    st.subheader("Plots")
-    if st.button("Update Plots"):
-        # q, fig = calculate_and_plot_q_asym_bifurc(P, L)
-        st.pyplot(fig)
-        if q:
-            fig2, delta, qL = plot_deformation(L, k, P, q)
-            st.pyplot(fig2)
-            st.write(f"**Vertical displacement of the top node (delta):** {delta:.2f} cm")
-            st.write(f"**Horizontal displacement of the top node (q*L):** {qL:.2f} cm")
-
-#######################################################################################################################################
-########################################## Stable Symmetric Bifurcation ###############################################################
-elif page == "Stable Symmetric Bifurcation":
-    delete_bifurcation_folders()
-    
-    def calculate_and_plot_theta_sym_bifurc(load, length, stiffness):
-        try:
-            l = length
-            theta = pf.Dof("theta")
-            P = pf.Load("P")
-            c = stiffness
-            
-            V = pf.Energy(eval("2 * c * theta**2 - 2 * P * L * (1 - sp.cos(theta))"))
-            bf = pf.BifurcationProblem(V, name="bifurcation_solution")
-            bf.set_parameter("RL1", 3)
-            
-            solver = pf.BifurcationProblemSolver(bf)
-            solver.solve()
-            
-            # Plot the Bifurcation Plot
-            fig, ax = plt.subplots()
-            corresponding_theta = None
-            print(bf.solution.raw_data)
-            raw_data_list = []
-            for branch in bf.solution.raw_data:
-                ax.plot(branch["U(1)"], branch["PAR(1)"])
-            
-                # print(branch["U(1)"], branch["PAR(1)"])
-                # Convert raw_data to a pandas DataFrame
-                
-                # Search for the load in PAR(1) and find the corresponding q in U(1)
-                for par_value, u_value in zip(branch["PAR(1)"], branch["U(1)"]):
-                    raw_data_list.append({"Load (P)": par_value, "Displacement (theta)": u_value})
-                    if abs(par_value - load) < 1e-2:  # Tolerance for floating-point comparison
-                        corresponding_theta = u_value
-
-            if corresponding_theta is not None:
-                # Highlight the identified point on the plot
-                ax.scatter(corresponding_theta, load, color="red", label=f"Point ({corresponding_theta:.3f}, {load:.3f})", zorder=5)
-
-            ax.set_xlabel("Displacement (theta)")
-            ax.set_ylabel("Load (P)")
-            ax.set_title("Bifurcation Plot")
-            ax.legend()
-        
-            if corresponding_theta is not None:
-                st.success(f"The corresponding q for load {load} is {corresponding_theta:.6f}")
-            else:
-                st.warning(f"No corresponding q found for load {load}")
-    
-            return corresponding_theta, fig, raw_data_list
-    
-        except Exception as e:
-            st.error(f"An error occurred: {e}")
-            return None
-            
-    st.subheader("Stable Symmetric Bifurcation")
-    
-    show_image("images/stable_symmetric_case.jpeg")
-    
-    # Input fields using Streamlit widgets
-    L = st.number_input("Enter L (cm):", value=2.0, step=0.1)
-    c = st.number_input("Enter c (N*cm/rad):", value=1.0, step=0.1)
-    P = st.number_input("Enter P (N):", value=1.31, step=0.1)
-    
-    theta_sym, fig,raw_data_list = calculate_and_plot_theta_sym_bifurc(P, L, c)
-    df = pd.DataFrame(raw_data_list)
-
-    # Display the table in Streamlit
-    st.subheader("Data Table (P vs. Theta)")
-    st.dataframe(df)
-    
-        
-    st.subheader("Plots")
-    # Compute Delta
-    Delta = L * (1 - np.cos(theta_sym))
-    
-    # Initial coordinates
-    x1, y1 = 0, 0
-    x2, y2 = L, 0
-    x3, y3 = 2 * L, 0
-    
-    # Deformed coordinates
-    x1_def, y1_def = Delta, 0
-    x2_def, y2_def = L + Delta / 2, abs(L * np.sin(theta_sym/1.5))
-    x3_def, y3_def = x3, y3
-    if st.button("Update Plot"):
-        st.pyplot(fig)
-        if theta_sym:
-            # Plot the initial and deformed system
-            fig2, ax = plt.subplots(figsize=(5, 4))
-            
-            ax.plot([x1, x2, x3], [y1, y2, y3], 'o-', label='Initial Configuration', color='blue')
-            ax.plot([x1_def, x2_def, x3_def], [y1_def, y2_def, y3_def], 'o--', label='Deformed Configuration', color='red')
-            
-            # Plot settings
-            ax.set_title("Deformation of 2 Rigid Links with Torsional Spring")
-            ax.set_xlabel("X (cm)")
-            ax.set_ylabel("Y (cm)")
-            ax.axhline(0, color='black', linewidth=0.5, linestyle='--')
-            ax.axvline(0, color='black', linewidth=0.5, linestyle='--')
-            ax.legend()
-            ax.grid(True)
-            ax.axis('equal')
-            
-            # Display the plot
-            st.pyplot(fig2)
-            
-            # Display results
-            st.write(f"Applied force (P): {P} N")
-            st.write(f"Angle (Theta): {np.degrees(theta_sym):.2f} degrees")
-            st.write(f"Horizontal displacement of left cart (Delta): {Delta:.2f} cm")
-
-#######################################################################################################################################
-################################## Unstable Symmetric Bifurcation #####################################################################
-elif page == "Unstable Symmetric Bifurcation":
-    delete_bifurcation_folders()
-    st.subheader("Unstable Symmetric Bifurcation")
-
-    show_image("images/unstable_symmetric_case.jpeg")
-    
-    def calculate_and_plot_q_unstable_sym_bifurc(load, length, stiffness):
-        try:
-            l = length
-            q = pf.Dof("q")
-            P = pf.Load("P")
-            k = stiffness
-            
-            V = pf.Energy(eval("(1/2) * k * q**2 * l**2 - 2 * P * l * (1 - sp.sqrt(1 - q**2))"))
-            bf = pf.BifurcationProblem(V, name="bifurcation_solution")
-            bf.set_parameter("RL1", 3)
-            
-            solver = pf.BifurcationProblemSolver(bf)
-            solver.solve()
-            
-            # Plot the Bifurcation Plot
-            fig, ax = plt.subplots()
-            corresponding_q = None
-            print(bf.solution.raw_data)
-            raw_data_list = []
-            for branch in bf.solution.raw_data:
-                ax.plot(branch["U(1)"], branch["PAR(1)"])
-            
-                # print(branch["U(1)"], branch["PAR(1)"])
-                # Convert raw_data to a pandas DataFrame
-                
-                # Search for the load in PAR(1) and find the corresponding q in U(1)
-                for par_value, u_value in zip(branch["PAR(1)"], branch["U(1)"]):
-                    raw_data_list.append({"Load (P)": par_value, "Displacement (q)": u_value})
-                    if abs(par_value - load) < 1e-2:  # Tolerance for floating-point comparison
-                        corresponding_q = u_value
-
-            if corresponding_q is not None:
-                # Highlight the identified point on the plot
-                ax.scatter(corresponding_q, load, color="red", label=f"Point ({corresponding_q:.3f}, {load:.3f})", zorder=5)
-
-            ax.set_xlabel("Displacement (q)")
-            ax.set_ylabel("Load (P)")
-            ax.set_title("Bifurcation Plot")
-            ax.legend()
-        
-            if corresponding_q is not None:
-                st.success(f"The corresponding q for load {load} is {corresponding_q:.6f}")
-            else:
-                st.warning(f"No corresponding q found for load {load}")
-    
-            return corresponding_q, fig, raw_data_list
-    
-        except Exception as e:
-            st.error(f"An error occurred: {e}")
-            return None
-            
-    def calculate_displacement(P, k):
-        return P / k  # Hooke's law: displacement = force / spring constant
-    
-    
-    
-    # Input fields
-    L = st.number_input("L (cm):", value=1.0)
-    k = st.number_input("k (N/cm):", value=3.0)
-    P = st.number_input("P (N):", value=0.857)
-    # q = st.number_input("q (ratio):", value=0.5)
-    q_unstable, fig,raw_data_list = calculate_and_plot_q_unstable_sym_bifurc(P, L, k)
-    df = pd.DataFrame(raw_data_list)
-
-    # Display the table in Streamlit
-    st.subheader("Data Table (P vs. q)")
-    st.dataframe(df)
-    
-        
-    st.subheader("Plots")
-    if st.button("Update Plots"):
-        st.pyplot(fig)
-        if q_unstable:
-            # Compute displacements
-            delta_x1 = calculate_displacement(P, k)
-        
-            # Initial coordinates
-            x1, y1 = 0, 0
-            x2, y2 = L, 0
-            x3, y3 = 2 * L, 0
-        
-            # Deformed coordinates
-            x1_def, y1_def = delta_x1, 0
-            x2_def = L + delta_x1 / 2
-            y2_def = abs(q_unstable * L)  # Vertical displacement of the center joint
-            x3_def, y3_def = x3, y3
-        
-            # Plot the initial and deformed system
-            fig2, ax = plt.subplots(figsize=(5, 4))
-            ax.plot([x1, x2, x3], [y1, y2, y3], 'o-', label='Initial Configuration', color='blue')
-            ax.plot([x1_def, x2_def, x3_def], [y1_def, y2_def, y3_def], 'o--', label='Deformed Configuration', color='red')
-        
-            # Plot settings
-            ax.set_title("Deformation of the 2 Rigid Links with Spring")
-            ax.set_xlabel("X (cm)")
-            ax.set_ylabel("Y (cm)")
-            ax.axhline(0, color='black', linewidth=0.5, linestyle='--')
-            ax.axvline(0, color='black', linewidth=0.5, linestyle='--')
-            ax.legend()
-            ax.grid(True)
-            ax.axis('equal')
-        
-            st.pyplot(fig2)
-        
-            # Display results
-            st.write(
-                f"**Applied force (P):** {P} N\n\n"
-                f"**Horizontal displacement of the left cart (Delta):** {delta_x1:.2f} cm\n\n"
-                f"**Center joint position:** X = {x2_def:.2f} cm, Y = {y2_def:.2f} cm"
-            )
+############################################# Kit Cases (see bifurcation_engine.cases) ################################################
+elif page in KIT_CASES.titles():
+    show_case_page(KIT_CASES.by_title(page))
 
 #######################################################################################################################################
 ############################################# Limit Point / Saddle-node ###############################################################
 
 elif page == "Limit Point / Saddle-node":
-    delete_bifurcation_folders()
-            
-    def calculate_vertical_displacement(P, k, theta):
-        theta_rad = np.radians(theta)
-        return P / (2 * k * np.cos(theta_rad))  # Hooke's law and geometry
-    
-    def calculate_horizontal_displacement(L, delta, theta):
-        theta_rad = np.radians(theta)
-        return delta * np.tan(theta_rad)  # Based on geometry of the system
-    
+    from bifurcation_engine import ShallowTruss, deformation_figure
 
     # Input fields
     st.subheader("Limit Point / Saddle-node")
@@ -666,50 +465,39 @@ elif page == "Limit Point / Saddle-node":
     P = st.number_input("P (N):", value=1.13, step=0.1)
     theta_initial = st.number_input("Initial angle θ = α (degrees):", value=30.0, step=0.1)
 
-    
+    # The equilibrium path, limit point and snap-through are closed-form (see bifurcation_engine.truss)
+    try:
+        truss = ShallowTruss(L, k, np.radians(theta_initial))
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
+    P_limit, theta_cr, theta_after = truss.snap_through()
+    theta = truss.angle_at(P)
+    st.success(
+        f"The limit load is {P_limit:.4f} N at θ = {np.degrees(theta_cr):.2f} degrees, where the truss snaps through "
+        f"to θ = {np.degrees(theta_after):.2f} degrees (a jump of {truss.deflection(theta_after) - truss.deflection(theta_cr):.2f} cm). "
+        + ("At the chosen load it has snapped through." if P > P_limit else "The chosen load is below the limit load.")
+    )
+
     st.subheader("2D Deformation with Spring")
     if st.button("Update Plot"):
-        # st.pyplot(fig4)
-        # Compute displacements
-        delta = calculate_vertical_displacement(P, k, theta_initial)
-        x1_def = -calculate_horizontal_displacement(L, delta, theta_initial)  # Carriage moves left
-        x3_def = L + x1_def  # Top node moves horizontally as the carriage moves
-
-        # Initial coordinates
-        x1, y1 = 0, 0  # Bottom-left node (carriage)
-        x2, y2 = 2 * L, 0  # Bottom-right fixed node
-        x3, y3 = L, L * np.tan(np.radians(theta_initial))  # Top node (initial position)
-
-        # Deformed coordinates
-        y3_def = y3 - delta  # Top node moves vertically by delta
-
-        # Calculate the new angle theta after deformation
-        new_theta = np.degrees(np.arctan((y3_def - y1) / (x3_def - x1_def)))
-
-        # Plot the initial and deformed system
-        fig, ax = plt.subplots()
-        ax.plot([x1, x3, x2], [y1, y3, y2], 'o-', label='Initial Configuration', color='blue')
-        ax.plot([x1_def, x3_def, x2], [y1, y3_def, y2], 'o--', label='Deformed Configuration', color='red')
-
-        # Plot settings
-        ax.set_title("Deformation of the 2D System with Spring")
-        ax.set_xlabel("X (cm)")
-        ax.set_ylabel("Y (cm)")
-        ax.axhline(0, color='black', linewidth=0.5, linestyle='--')
-        ax.axvline(0, color='black', linewidth=0.5, linestyle='--')
-        ax.legend()
-        ax.grid(True)
-        ax.axis('equal')
-
-        # Display the plot
-        st.pyplot(fig)
+        with span("plot.render", figure="bifurcation"):
+            st.pyplot(truss.figure(max(1.5 * P_limit, 1.1 * P), load=P).to_matplotlib())
+        (x1_def, x3_def, _), _ = truss.configuration(theta)
+        with span("plot.render", figure="deformation"):
+            st.pyplot(deformation_figure(
+                truss.configuration(truss.alpha), truss.configuration(theta), "Deformation of the 2D System with Spring"
+            ))
 
         # Display results
         st.text((
-            f"The vertical displacement (delta) is: {delta:.2f} cm\n"
+            f"The vertical displacement (delta) is: {truss.deflection(theta):.2f} cm\n"
             f"The horizontal displacement of the carriage is: {abs(x1_def):.2f} cm\n"
             f"The new horizontal position of the top node is: {x3_def:.2f} cm\n"
-            f"The new angle theta after deformation is: {new_theta:.2f} degrees"
+            f"The new angle theta after deformation is: {np.degrees(theta):.2f} degrees"
         ))
 ##############################################################################################################################################
-##############################################################################################################################################
\ No newline at end of file
+##############################################################################################################################################
+
+if st.sidebar.toggle("Diagnostics", help="Timings of the stages of this rerun (parsing, compiling, solving, plotting, reports) and the cache counters of the server."):
+    show_diagnostics(trace_id, rerun_started)
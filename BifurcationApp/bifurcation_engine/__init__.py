@@ -0,0 +1,51 @@
+"""Solver-side helpers for the Bifurcation App (caching and the result archive, closed-form, NumPy and AUTO solving, the shallow truss, headless API and batch solving, stability, workspaces, background jobs, sweeps, figures, animations, uploaded sketches, reports and timing metrics).
+
+Names are imported from their submodule on first use, so that e.g. a page that only
+needs the result tables does not load sympy, pyfurc, Matplotlib or reportlab.
+"""
+import importlib
+
+_SUBMODULES = {
+    "analytic": ["ANALYTIC_REGISTRY", "AnalyticModel", "AnalyticRegistry", "solve_analytic"],
+    "animation": ["animation_frames", "animation_html", "load_path"],
+    "api": ["BACKENDS", "StabilityResult", "classified_store", "solve"],
+    "archive": ["ResultArchive"],
+    "batch": ["load_problems", "solve_problems"],
+    "branches": ["Branch", "BranchStore", "Segment"],
+    "cache": ["SolutionCache", "solution_key", "solution_metadata"],
+    "cases": ["KIT_CASES", "CaseInput", "CaseRegistry", "KitCase"],
+    "charts": ["branch_rows", "interactive_chart", "lttb_indices"],
+    "continuation": ["Continuation", "EquilibriumSystem", "solve_continuation"],
+    "figures": ["FigureSpec", "bifurcation_figure", "deformation_figure"],
+    "formulas": [
+        "FORMULA_COMPILER", "CompiledEnergy", "FormulaCompiler", "FormulaError", "build_energy_expression",
+        "compile_energy", "dof_names", "parse_constants", "parse_formula",
+    ],
+    "frames": ["POINT_TYPES", "ResultFrame"],
+    "jobs": ["JobScheduler", "report_progress"],
+    "layout": ["GlyphWidths", "glyph_widths", "wrap_text"],
+    "metrics": ["METRICS", "Metrics", "span"],
+    "models": ["MODEL_REGISTRY", "EnergyModel", "ModelRegistry"],
+    "report": ["ReportBuilder", "report_key"],
+    "sketches": ["Sketch", "SketchStore", "sketch_digest"],
+    "solver": ["run_auto", "solve_branches", "solve_job"],
+    "stability": ["STABILITY_COLUMN", "classify_stability", "hessian_values", "split_by_stability"],
+    "sweep": ["SweepStore", "grid_configurations", "parse_grid", "run_sweep"],
+    "templates": ["ENERGY_TEMPLATES"],
+    "truss": ["ShallowTruss"],
+    "workspace": ["WorkspaceManager", "default_scratch_root", "workspace_for"],
+}
+_EXPORTS = {name: module for module, names in _SUBMODULES.items() for name in names}
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,18 @@
+"""Command line entry point, e.g. ``python -m bifurcation_engine sweep --help``."""
+import importlib
+import sys
+
+# Command -> module with a main(argv) function, imported only when the command runs
+COMMANDS = {"benchmark": "benchmark", "solve": "batch", "startup": "startup", "sweep": "sweep"}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print(f"usage: python -m bifurcation_engine {{{','.join(COMMANDS)}}} ...")
+        return 2
+    return importlib.import_module(f".{COMMANDS[argv[0]]}", __package__).main(argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pyfurc as pf
+import sympy as sp
+
+from .metrics import count, span
+
+# AUTO-07p point type codes used for the generated branches
+ORDINARY, BRANCH_POINT, END_POINT = 0, 1, 9
+# The DOF range starts at (-pi, pi) and is doubled at most this often to contain the paths
+MAX_WIDENINGS = 10
+
+
+class AnalyticModel:
+    """Closed-form equilibrium paths of a one-DOF energy that is linear in the load.
+
+    From dV/dq = g0(q) + P * g1(q) = 0 the nontrivial path is P(q) = -g0(q) / g1(q).
+    Trivial paths q = q0 exist where g0 and g1 vanish together; their bifurcation load
+    is the limit of P(q) for q -> q0. All expressions are lambdified once with the
+    constants as arguments.
+    """
+
+    def __init__(self, dof, constant_names, load_of_dof, trivial_paths):
+        self.dof = dof
+        self.constant_names = constant_names
+        self.load_of_dof = load_of_dof
+        self.trivial_paths = trivial_paths
+
+    def branches(self, constants, P_max, dof_range=None, n_points=2001):
+        """Evaluates the paths for `constants` as branches shaped like the AUTO solution.
+
+        By default the DOF range is widened from (-pi, pi) until the paths leave the load
+        window [0, P_max] inside it, with `n_points` per 2 pi; None if they never do
+        (e.g. paths that stay in the window for ever larger DOFs), so that the caller
+        falls back to a continuation.
+        """
+        args = [float(constants[name]) for name in self.constant_names]
+        if dof_range is None:
+            dof_range = self._dof_range(args, P_max)
+            if dof_range is None:
+                return None
+            n_points = int(np.ceil(n_points * (dof_range[1] - dof_range[0]) / (2 * np.pi)))
+        branches = []
+        roots = []
+        for root, critical_load in self.trivial_paths:
+            q0 = float(root(*args))
+            P_cr = _evaluate(critical_load, args)
+            roots.append((q0, P_cr))
+            loads = np.linspace(0.0, P_max, n_points)
+            if P_cr is not None and 0.0 < P_cr < P_max:
+                loads = np.union1d(loads, [P_cr])
+            types = np.full(len(loads), ORDINARY)
+            types[[0, -1]] = END_POINT
+            if P_cr is not None:
+                types[np.isclose(loads, P_cr, rtol=0, atol=1e-12)] = BRANCH_POINT
+            branches.append(_branch(loads, np.full(len(loads), q0), types))
+
+        q = np.linspace(dof_range[0], dof_range[1], n_points)
+        q = np.union1d(q, [q0 for q0, _ in roots if dof_range[0] < q0 < dof_range[1]])
+        loads = self._loads(q, args)
+        types = np.full(len(q), ORDINARY)
+        for q0, P_cr in roots:
+            at_root = q == q0
+            loads[at_root] = np.nan if P_cr is None else P_cr
+            types[at_root] = BRANCH_POINT
+        valid = np.isfinite(loads) & (loads >= 0.0) & (loads <= P_max)
+        for start, stop in _runs(valid):
+            if stop - start < 2:
+                continue
+            run_q, run_loads, run_types = q[start:stop], loads[start:stop], types[start:stop]
+            # Resolve the ends of the path, e.g. near singular positions or at P_max, with extra points
+            if start > 0 and types[start] != BRANCH_POINT:
+                extra_q, extra_loads = self._refine_end(args, q[start], q[start - 1], P_max)
+                run_q, run_loads = np.concatenate([extra_q, run_q]), np.concatenate([extra_loads, run_loads])
+                run_types = np.concatenate([np.full(len(extra_q), ORDINARY), run_types])
+            if stop < len(q) and types[stop - 1] != BRANCH_POINT:
+                extra_q, extra_loads = self._refine_end(args, q[stop - 1], q[stop], P_max)
+                run_q, run_loads = np.concatenate([run_q, extra_q]), np.concatenate([run_loads, extra_loads])
+                run_types = np.concatenate([run_types, np.full(len(extra_q), ORDINARY)])
+            order = np.argsort(run_q)
+            run_q, run_loads, run_types = run_q[order], run_loads[order], run_types[order]
+            run_types[[0, -1]] = np.where(run_types[[0, -1]] == BRANCH_POINT, BRANCH_POINT, END_POINT)
+            branches.append(_branch(run_loads, run_q, run_types))
+        return branches
+
+    def _dof_range(self, args, P_max):
+        """(lower, upper) DOF bounds at which the nontrivial path is outside the load window, or None."""
+        lower, upper = -np.pi, np.pi
+        for _ in range(MAX_WIDENINGS + 1):
+            loads = self._loads(np.array([lower, upper]), args)
+            inside = np.isfinite(loads) & (loads >= 0.0) & (loads <= P_max)
+            if not inside.any():
+                return lower, upper
+            lower, upper = 2 * lower if inside[0] else lower, 2 * upper if inside[1] else upper
+        return None
+
+    def _loads(self, q, args):
+        with np.errstate(all="ignore"):
+            loads = np.real_if_close(self.load_of_dof(q, *args))
+        return np.array(np.broadcast_to(loads, np.shape(q)), dtype=float)
+
+    def _refine_end(self, args, q_valid, q_invalid, P_max, iterations=48):
+        """Points between the last valid grid point and the end of the path next to it."""
+        inside, outside = q_valid, q_invalid
+        for _ in range(iterations):
+            middle = 0.5 * (inside + outside)
+            load = self._loads(np.array([middle]), args)[0]
+            if np.isfinite(load) and 0.0 <= load <= P_max:
+                inside = middle
+            else:
+                outside = middle
+        q = q_valid + (inside - q_valid) * (1.0 - 0.5 ** np.arange(1, iterations + 1))
+        q = np.unique(q[q != q_valid])
+        loads = self._loads(q, args)
+        keep = np.isfinite(loads) & (loads >= 0.0) & (loads <= P_max)
+        return q[keep], loads[keep]
+
+
+class AnalyticRegistry:
+    """Derives the closed form of each energy template once; None if there is none."""
+
+    def __init__(self, max_models=128):
+        self.max_models = max_models
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+
+    def model_for(self, energy, constant_names):
+        key = (sp.srepr(energy), tuple(sorted(constant_names)))
+        with self._lock:
+            if key in self._models:
+                count("cache.analytic.hit")
+            else:
+                count("cache.analytic.miss")
+                with span("analytic.derive"):
+                    self._models[key] = _derive(energy, key[1])
+                while len(self._models) > self.max_models:
+                    self._models.popitem(last=False)
+            self._models.move_to_end(key)
+            return self._models[key]
+
+
+def _derive(energy, constant_names):
+    dofs = [atom for atom in energy.atoms(pf.PhysicalQuantity) if atom.quantity_type == "dof"]
+    loads = [atom for atom in energy.atoms(pf.PhysicalQuantity) if atom.quantity_type == "load"]
+    if len(dofs) != 1 or len(loads) != 1:
+        return None
+    dof, load = dofs[0], loads[0]
+    constants = [sp.Symbol(name) for name in constant_names]
+    try:
+        equilibrium = sp.Poly(sp.diff(energy, dof), load)
+    except sp.PolynomialError:
+        return None
+    if equilibrium.degree() != 1:
+        return None
+    g1 = equilibrium.coeff_monomial(load)
+    g0 = equilibrium.coeff_monomial(1)
+    load_of_dof = -g0 / g1
+
+    trivial_paths = []
+    try:
+        candidates = sp.solve(g0, dof)
+    except (NotImplementedError, ValueError):
+        candidates = []
+    for root in candidates:
+        if root.has(sp.I) or root.free_symbols - set(constants) or sp.simplify(g1.subs(dof, root)) != 0:
+            continue
+        try:
+            critical_load = sp.limit(load_of_dof, dof, root)
+        except (NotImplementedError, ValueError):
+            critical_load = sp.nan
+        trivial_paths.append((
+            sp.lambdify(constants, root, "numpy"),
+            None if critical_load.is_finite is False or critical_load.has(sp.nan, sp.zoo, sp.oo)
+            else sp.lambdify(constants, critical_load, "numpy"),
+        ))
+    return AnalyticModel(dof, list(constant_names), sp.lambdify([dof, *constants], load_of_dof, "numpy"), trivial_paths)
+
+
+def _evaluate(function, args):
+    if function is None:
+        return None
+    value = complex(function(*args))
+    return value.real if np.isfinite(value.real) and abs(value.imag) < 1e-12 else None
+
+
+def _runs(mask):
+    """(start, stop) ranges of the True runs in `mask`."""
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], mask.astype(np.int8), [0]])))
+    return list(zip(edges[::2], edges[1::2]))
+
+
+def _branch(loads, dof_values, types):
+    return {
+        "PT": np.arange(1, len(loads) + 1),
+        "TY": types.astype(np.int64),
+        "PAR(1)": np.asarray(loads, dtype=float),
+        "U(1)": np.asarray(dof_values, dtype=float),
+    }
+
+
+# One registry per process
+ANALYTIC_REGISTRY = AnalyticRegistry()
+
+
+def solve_analytic(energy, constants, P_max, **options):
+    """Branches from the closed-form solution, or None when the energy has none."""
+    model = ANALYTIC_REGISTRY.model_for(energy, constants)
+    if model is None:
+        return None
+    with span("solve.analytic"):
+        return model.branches(constants, P_max, **options)
@@ -0,0 +1,183 @@
+"""Load-stepping animation of the deformed system: every frame is computed up front and played in the browser."""
+import json
+from string import Template
+
+import numpy as np
+
+from .stability import STABILITY_COLUMN
+
+
+def load_path(store, loads, dof="U(1)", snap_fraction=0.05):
+    """The equilibrium the structure follows while the load is increased through `loads`.
+
+    At every load the state stays on the segment it is on as long as that is stable;
+    otherwise it moves to the closest stable equilibrium (buckling at a branch point,
+    snap-through after a limit point), or to the closest equilibrium when none is stable.
+    Returns the DOF values (NaN where there is no equilibrium), their stability, and
+    the loads at which the state jumps by more than `snap_fraction` of the DOF range to
+    a segment it is not connected to.
+    """
+    loads = np.asarray(loads, dtype=float)
+    grid = store.equilibria_grid(loads, dof)
+    if STABILITY_COLUMN in store.columns and store.segments:
+        with np.errstate(invalid="ignore"):
+            stable_grid = np.stack(
+                [segment.interpolate(loads, STABILITY_COLUMN) for segment in store.segments], axis=1
+            ) >= 0.5
+    else:
+        stable_grid = np.isfinite(grid)
+    finite = np.isfinite(grid)
+    span = np.ptp(grid[finite]) if finite.any() else 0.0
+    values = np.full(len(loads), np.nan)
+    stable = np.zeros(len(loads), dtype=bool)
+    snaps = np.zeros(len(loads), dtype=bool)
+    segment = None
+    for i in range(len(loads)):
+        candidates = np.flatnonzero(finite[i])
+        if len(candidates) == 0:
+            segment = None
+            continue
+        if segment is not None and finite[i, segment] and (stable_grid[i, segment] or not stable_grid[i].any()):
+            chosen = segment
+        else:
+            pool = candidates[stable_grid[i, candidates]] if stable_grid[i, candidates].any() else candidates
+            previous = values[i - 1] if i > 0 and np.isfinite(values[i - 1]) else 0.0
+            chosen = pool[np.argmin(np.abs(grid[i, pool] - previous))]
+            if i > 0 and np.isfinite(values[i - 1]):
+                departure = _departure(store.segments[chosen], grid[i - 1, chosen], dof)
+                snaps[i] = abs(departure - previous) > snap_fraction * span
+        segment = chosen
+        values[i] = grid[i, chosen]
+        stable[i] = stable_grid[i, chosen]
+    return values, stable, snaps
+
+
+def _departure(segment, previous_value, dof):
+    """Where the state enters `segment`: its value at the previous load, or its first point if it
+    only starts after it (e.g. a branch emanating from a branch point)."""
+    return previous_value if np.isfinite(previous_value) else segment.column(dof)[0]
+
+
+def animation_frames(store, loads, configuration, initial_configuration, dof="U(1)", digits=4):
+    """Frame buffer of the load-stepping animation, as a JSON-serializable dict.
+
+    `configuration(P, dof_values)` is evaluated once for the whole load path and returns the
+    node coordinates (xs, ys), each of shape (n_nodes, n_loads); `initial_configuration`
+    is the undeformed (xs, ys).
+    """
+    loads = np.asarray(loads, dtype=float)
+    values, stable, snaps = load_path(store, loads, dof)
+    with np.errstate(all="ignore"):
+        xs, ys = configuration(loads, values)
+    xs = np.array([np.broadcast_to(x, len(loads)) for x in xs], dtype=float)
+    ys = np.array([np.broadcast_to(y, len(loads)) for y in ys], dtype=float)
+    missing = ~np.isfinite(values)
+    xs[:, missing] = np.nan
+    ys[:, missing] = np.nan
+    initial_xs, initial_ys = (np.asarray(c, dtype=float) for c in initial_configuration)
+    coordinates = np.concatenate([xs.ravel(), ys.ravel(), initial_xs, initial_ys])
+    coordinates = coordinates[np.isfinite(coordinates)]
+    # Same range on both axes, so the drawing is not distorted
+    low, high = float(coordinates.min()), float(coordinates.max())
+    pad = 0.1 * (high - low or 1.0)
+
+    def rounded(array):
+        return [None if not np.isfinite(v) else round(float(v), digits) for v in np.ravel(array)]
+
+    return {
+        "loads": rounded(loads),
+        "values": rounded(values),
+        "stable": stable.tolist(),
+        "snaps": snaps.tolist(),
+        "xs": [rounded(x) for x in xs.T],
+        "ys": [rounded(y) for y in ys.T],
+        "initial": {"xs": rounded(initial_xs), "ys": rounded(initial_ys)},
+        "domain": [low - pad, high + pad],
+    }
+
+
+def animation_html(frames, dof_label, load_label="P", duration=6.0):
+    """Self-contained HTML player of `frames`: play/pause and a scrubber, tweened between frames in the browser."""
+    return _PLAYER.substitute(
+        frames=json.dumps(frames, separators=(",", ":")),
+        dof_label=json.dumps(dof_label),
+        load_label=json.dumps(load_label),
+        duration=float(duration),
+    )
+
+
+_PLAYER = Template("""<div style="font-family: sans-serif; font-size: 13px;">
+  <div>
+    <button id="play" style="width: 5em;">Play</button>
+    <input id="scrub" type="range" min="0" step="0.01" value="0" style="width: 60%; vertical-align: middle;">
+    <span id="status"></span>
+  </div>
+  <svg id="deformation" width="300" height="300" style="border: 1px solid #ddd; margin-top: 6px;"></svg>
+  <svg id="path" width="300" height="300" style="border: 1px solid #ddd; margin-top: 6px;"></svg>
+</div>
+<script>
+const F = $frames, DOF = $dof_label, LOAD = $load_label, DURATION = $duration;
+const n = F.loads.length, svgNS = "http://www.w3.org/2000/svg";
+const scrub = document.getElementById("scrub"), play = document.getElementById("play"), status = document.getElementById("status");
+scrub.max = n - 1;
+function element(svg, name, attributes) {
+  const e = document.createElementNS(svgNS, name);
+  for (const k in attributes) e.setAttribute(k, attributes[k]);
+  svg.appendChild(e);
+  return e;
+}
+function scale(domain, size) { return v => 20 + (v - domain[0]) / (domain[1] - domain[0]) * (size - 40); }
+// Deformation panel: undeformed system in blue, deformed in red
+const deformation = document.getElementById("deformation");
+const dx = scale(F.domain, 300), dy = v => 300 - scale(F.domain, 300)(v);
+const points = (xs, ys) => xs.map((x, i) => dx(x) + "," + dy(ys[i])).join(" ");
+element(deformation, "polyline", {points: points(F.initial.xs, F.initial.ys), fill: "none", stroke: "blue", "stroke-width": 2});
+const deformed = element(deformation, "polyline", {fill: "none", stroke: "red", "stroke-width": 2, "stroke-dasharray": "6,3"});
+const nodes = F.initial.xs.map(() => element(deformation, "circle", {r: 4, fill: "red"}));
+// Path panel: the followed equilibrium, solid where stable, with the current state
+const path = document.getElementById("path");
+const finite = F.values.filter(v => v !== null);
+const vmin = Math.min(...finite), vmax = Math.max(...finite), pad = 0.1 * (vmax - vmin || 1);
+const px = scale([vmin - pad, vmax + pad], 300), py = v => 300 - scale([F.loads[0], F.loads[n - 1] || 1], 300)(v);
+for (let i = 1; i < n; i++) {
+  if (F.values[i] === null || F.values[i - 1] === null) continue;
+  element(path, "line", {x1: px(F.values[i - 1]), y1: py(F.loads[i - 1]), x2: px(F.values[i]), y2: py(F.loads[i]),
+    stroke: F.snaps[i] ? "orange" : "black", "stroke-width": 1.5, "stroke-dasharray": F.stable[i] && !F.snaps[i] ? "" : "5,3"});
+}
+element(path, "text", {x: 150, y: 295, "text-anchor": "middle"}).textContent = DOF;
+element(path, "text", {x: 5, y: 12}).textContent = LOAD;
+const marker = element(path, "circle", {r: 5, fill: "red"});
+function mix(a, b, t) { return a === null || b === null ? (t < 0.5 ? a : b) : a + (b - a) * t; }
+function draw(position) {
+  const i = Math.min(Math.floor(position), n - 1), j = Math.min(i + 1, n - 1), t = position - i;
+  const xs = F.xs[i].map((x, k) => mix(x, F.xs[j][k], t)), ys = F.ys[i].map((y, k) => mix(y, F.ys[j][k], t));
+  const value = mix(F.values[i], F.values[j], t), load = mix(F.loads[i], F.loads[j], t);
+  const visible = value !== null && xs.every(x => x !== null) && ys.every(y => y !== null);
+  deformed.setAttribute("points", visible ? points(xs, ys) : "");
+  nodes.forEach((node, k) => { node.setAttribute("visibility", visible ? "visible" : "hidden"); if (visible) { node.setAttribute("cx", dx(xs[k])); node.setAttribute("cy", dy(ys[k])); } });
+  marker.setAttribute("visibility", visible ? "visible" : "hidden");
+  if (visible) { marker.setAttribute("cx", px(value)); marker.setAttribute("cy", py(load)); }
+  const state = F.snaps[j] && t > 0 ? "snap-through" : (F.stable[t < 0.5 ? i : j] ? "stable" : "unstable");
+  status.textContent = LOAD + " = " + load.toFixed(3) + ", " + DOF + " = " + (value === null ? "no equilibrium" : value.toFixed(4) + " (" + state + ")");
+}
+let playing = false, last = null;
+function tick(time) {
+  if (!playing) return;
+  if (last !== null) {
+    const position = Math.min(parseFloat(scrub.value) + (time - last) / 1000 * (n - 1) / DURATION, n - 1);
+    scrub.value = position;
+    draw(position);
+    if (position >= n - 1) { playing = false; play.textContent = "Play"; }
+  }
+  last = time;
+  if (playing) requestAnimationFrame(tick);
+}
+play.onclick = () => {
+  playing = !playing;
+  play.textContent = playing ? "Pause" : "Play";
+  if (playing) { if (parseFloat(scrub.value) >= n - 1) scrub.value = 0; last = null; requestAnimationFrame(tick); }
+};
+scrub.oninput = () => draw(parseFloat(scrub.value));
+draw(0);
+</script>
+""")
@@ -0,0 +1,133 @@
+"""Headless API: solve an energy and get structured results, without Streamlit.
+
+Example::
+
+    from bifurcation_engine.api import solve
+
+    result = solve("k*l*(1-sp.sqrt(1+q))**2 - P*l*(1-sp.sqrt(1-q**2))", "q", {"k": 1.0, "l": 2.0}, P_max=3.0)
+    result.critical_loads, result.equilibria_at(1.0)
+    result.table().to_pandas().to_csv("asymmetric.csv", index=False)
+    open("asymmetric.pdf", "wb").write(result.report("Asymmetric bifurcation"))
+"""
+from .analytic import solve_analytic
+from .branches import BranchStore
+from .cache import solution_key, solution_metadata
+from .continuation import solve_continuation
+from .figures import bifurcation_figure
+from .formulas import build_energy_expression, compile_energy, dof_names
+from .frames import ResultFrame
+from .metrics import span
+from .report import ReportBuilder
+from .solver import solve_job
+from .stability import STABILITY_COLUMN, classify_stability
+from .workspace import default_scratch_root
+
+# Continuation backends: AUTO-07p through pyfurc, or the in-process NumPy continuation
+BACKENDS = ("auto", "numpy")
+
+
+class StabilityResult:
+    """Solved branches of one problem with the stability of every point, and table, figure and report views."""
+
+    def __init__(self, energy_formula, parameter, constants, P_max, key, store, method):
+        self.energy_formula = energy_formula
+        self.parameter = parameter
+        self.constants = dict(constants)
+        self.P_max = P_max
+        self.key = key
+        self.store = store
+        self.method = method  # "cache", "analytic", "auto" or "numpy"
+
+    @property
+    def dof_names(self):
+        return dof_names(self.parameter)
+
+    def dof_column(self, dof=None):
+        """Store column U(i) of the DOF named `dof` (the first DOF by default)."""
+        return f"U({self.dof_names.index(dof) + 1 if dof else 1})"
+
+    @property
+    def critical_loads(self):
+        return self.store.critical_loads()
+
+    def equilibria_at(self, load, dof=None):
+        return self.store.equilibria_at(load, self.dof_column(dof))
+
+    def table(self, dof_label=None):
+        labels = {self.dof_column(name): name for name in self.dof_names}
+        if dof_label:
+            labels["U(1)"] = dof_label
+        return ResultFrame(self.store, dof_labels=labels)
+
+    def figure(self, load=None, dof=None):
+        """Bifurcation plot of `dof` (the first DOF by default); with `load`, the equilibria at that load are marked."""
+        dof = dof or self.dof_names[0]
+        spec = bifurcation_figure(self.store, xlabel=dof, ylabel="P", dof=self.dof_column(dof))
+        if load is not None:
+            equilibria = self.equilibria_at(load, dof)
+            if len(equilibria):
+                spec.add_points(equilibria, load, color="red", label=f"Equilibria at P = {load:.3f}")
+        return spec
+
+    def report(self, description="", sketch=None, builder=None):
+        """PDF bytes of the stability analysis report (`sketch` is optional image bytes)."""
+        builder = builder or ReportBuilder(max_reports=1)
+        return builder.build(
+            description, sketch, self.energy_formula, self.parameter, self.P_max, self.constants, self.figure()
+        )
+
+    def summary(self):
+        """JSON-serializable overview of the result."""
+        return {
+            "key": self.key,
+            "formula": self.energy_formula,
+            "dof": self.parameter,
+            "constants": self.constants,
+            "P_max": float(self.P_max),
+            "method": self.method,
+            "critical_loads": self.critical_loads,
+            "n_branches": len(self.store),
+            "n_points": self.store.n_points,
+        }
+
+
+def classified_store(branches, energy_formula, parameter, constants):
+    """BranchStore of `branches` with the stability column of every point."""
+    with span("result.classify") as attributes:
+        store = BranchStore(branches)
+        compiled = compile_energy(energy_formula, parameter, list(constants))
+        store.add_column(STABILITY_COLUMN, classify_stability(compiled, store, constants))
+        attributes["points"] = store.n_points
+    return store
+
+
+def solve(energy_formula, parameter, constants, P_max, cache=None, workspace_root=None, analytic=True, backend="auto"):
+    """Solves one problem: closed form when possible, otherwise by continuation.
+
+    `backend` is "auto" for the AUTO-07p continuation (run in this process) or "numpy"
+    for the in-process NumPy continuation. `cache` is an optional SolutionCache shared
+    between calls. Invalid formulas raise FormulaError, failed continuations RuntimeError.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    energy = build_energy_expression(energy_formula, parameter, constants)
+    key = solution_key(energy, parameter, P_max, constants)
+    branches = cache.get(key) if cache is not None else None
+    method = "cache"
+    if branches is None and analytic:
+        branches = solve_analytic(energy, constants, P_max)
+        method = "analytic"
+    if branches is None and backend == "numpy":
+        branches = solve_continuation(compile_energy(energy_formula, parameter, list(constants)), constants, P_max)
+        method = "numpy"
+    if branches is None:
+        branches = solve_job(
+            energy, constants, P_max, workspace_root or default_scratch_root(), "api", dof_names(parameter)
+        )
+        method = "auto"
+    if cache is not None and method != "cache":
+        branches = cache.put(key, branches, solution_metadata(energy, parameter, P_max, constants, method))
+    return StabilityResult(
+        energy_formula, parameter, constants, P_max, key,
+        classified_store(branches, energy_formula, parameter, constants), method,
+    )
@@ -0,0 +1,170 @@
+"""Persistent archive of solved branches: typed binary arrays with their metadata, reloaded memory-mapped.
+
+Every solution is one file ``<key>.bfa``: a fixed preamble, a JSON header with the
+metadata (energy hash, constants, solver settings, ...) and the layout of the arrays,
+then the raw arrays, each aligned to 64 bytes. Loading maps the file read-only and
+returns NumPy views into it: nothing is copied or parsed, and all processes that load
+the same solution share its pages through the OS page cache. Files are written under a
+temporary name and renamed, so readers in other processes never see a partial solution,
+and a mapped solution stays valid when the file is replaced or pruned.
+"""
+import json
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from .metrics import span
+
+MAGIC = b"BFARCH01"
+ALIGNMENT = 64
+SUFFIX = ".bfa"
+_PREAMBLE = struct.Struct("<8sQ")  # magic, length of the JSON header
+
+
+class ResultArchive:
+    """Solutions on disk by key; a solution is a list of branches, each a dict of column name -> array."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}{SUFFIX}")
+
+    def __contains__(self, key):
+        return os.path.exists(self.path(key))
+
+    def keys(self):
+        return [name[:-len(SUFFIX)] for name in os.listdir(self.directory) if name.endswith(SUFFIX)]
+
+    def save(self, key, branches, metadata=None):
+        """Writes the branches with `metadata` (a JSON-serializable dict) and returns the path of the file."""
+        layout, arrays, offset, end = [], [], 0, 0
+        for branch in branches:
+            columns = {}
+            for column, values in branch.items():
+                array = np.ascontiguousarray(values)
+                if array.dtype.hasobject:
+                    raise ValueError(f"Column {column!r} is not a numeric array")
+                columns[str(column)] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+                arrays.append((offset, array))
+                end = offset + array.nbytes
+                offset = _aligned(end)
+            layout.append(columns)
+        header = json.dumps({
+            "version": 1, "key": key, "created": time.time(), "metadata": metadata or {}, "branches": layout,
+        }, default=str).encode("utf-8")
+        data_start = _aligned(_PREAMBLE.size + len(header))
+
+        tmp_path = self.path(key) + f".{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(_PREAMBLE.pack(MAGIC, len(header)))
+                f.write(header)
+                for array_offset, array in arrays:
+                    f.seek(data_start + array_offset)
+                    f.write(array.tobytes())
+                f.truncate(data_start + end)
+            os.replace(tmp_path, self.path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return self.path(key)
+
+    def load(self, key):
+        """The branches of `key` as read-only arrays mapped from the file, or None if it is missing or unreadable."""
+        path = self.path(key)
+        try:
+            with span("archive.load"):
+                with open(path, "rb") as f:
+                    header, data_start = _read_header(f)
+                buffer = np.memmap(path, dtype=np.uint8, mode="r")
+                if len(buffer) != data_start + _data_size(header):
+                    raise ValueError("Truncated or damaged archive file")
+                branches = [
+                    {column: _view(buffer, data_start, item) for column, item in columns.items()}
+                    for columns in header["branches"]
+                ]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return branches
+
+    def metadata(self, key):
+        """The metadata stored with `key` (only the header is read), or None."""
+        try:
+            with open(self.path(key), "rb") as f:
+                return _read_header(f)[0]["metadata"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def entries(self):
+        """(key, metadata) of every archived solution."""
+        for key in self.keys():
+            metadata = self.metadata(key)
+            if metadata is not None:
+                yield key, metadata
+
+    def prune(self, max_bytes):
+        """Removes the least recently written solutions until the archive holds at most `max_bytes`; returns their keys."""
+        files = []
+        for key in self.keys():
+            try:
+                stat = os.stat(self.path(key))
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, key))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        removed = []
+        for _, size, key in files:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                continue
+            total -= size
+            removed.append(key)
+        return removed
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _read_header(f):
+    """(header, offset of the first array) of an archive file."""
+    preamble = f.read(_PREAMBLE.size)
+    if len(preamble) != _PREAMBLE.size:
+        raise ValueError("Truncated archive file")
+    magic, length = _PREAMBLE.unpack(preamble)
+    if magic != MAGIC:
+        raise ValueError("Not a result archive file")
+    header = json.loads(f.read(length).decode("utf-8"))
+    return header, _aligned(_PREAMBLE.size + length)
+
+
+def _data_size(header):
+    """Bytes from the first array to the end of the last one, the exact length of the data part of the file."""
+    return max(
+        (item["offset"] + _count(item) * np.dtype(item["dtype"]).itemsize
+         for columns in header["branches"] for item in columns.values()),
+        default=0,
+    )
+
+
+def _count(item):
+    return int(np.prod(item["shape"], dtype=np.int64))
+
+
+def _view(buffer, data_start, item):
+    dtype = np.dtype(item["dtype"])
+    count = _count(item)
+    start = data_start + item["offset"]
+    if start + count * dtype.itemsize > len(buffer):
+        raise ValueError("Truncated archive file")
+    return np.frombuffer(buffer, dtype=dtype, count=count, offset=start).reshape(tuple(item["shape"]))
@@ -0,0 +1,121 @@
+"""Batch solving of a file of problems, e.g. to precompute course material.
+
+Example (from the BifurcationApp folder)::
+
+    python -m bifurcation_engine solve problems.jsonl --out results
+
+Each problem is a JSON object (one per line, or a JSON list) with either a ``formula``
+and ``dof`` or the ``case`` key of a kit model, plus optional ``constants``, ``P_max``,
+``name`` and ``description``. Every problem gets ``<name>.csv`` (the result table) and,
+unless ``--no-reports`` is given, ``<name>.pdf``; ``results.jsonl`` lists the outcome
+of every problem.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .cases import KIT_CASES
+from .workspace import default_scratch_root
+
+
+def load_problems(path):
+    """Reads the problems of a JSON list or JSON Lines file and fills in names and kit case defaults."""
+    with open(path) as f:
+        text = f.read()
+    stripped = text.lstrip()
+    entries = json.loads(text) if stripped.startswith("[") else [json.loads(line) for line in text.splitlines() if line.strip()]
+    problems = []
+    for index, entry in enumerate(entries):
+        problem = dict(entry)
+        if "case" in problem:
+            case = KIT_CASES[problem["case"]]
+            problem.setdefault("formula", case.formula)
+            problem.setdefault("dof", case.dof)
+            problem["constants"] = {**case.constants, **problem.get("constants", {})}
+            problem.setdefault("P_max", case.P_max)
+        if "formula" not in problem:
+            raise ValueError(f"Problem {index + 1} needs a 'formula' or a 'case'")
+        problem.setdefault("dof", "q")
+        problem.setdefault("constants", {})
+        problem.setdefault("P_max", 3.0)
+        problem.setdefault("description", "")
+        problem.setdefault("name", problem.get("case", "problem") + f"-{index + 1}")
+        problem["name"] = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(problem["name"]))
+        problems.append(problem)
+    names = [problem["name"] for problem in problems]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate problem names: {', '.join(duplicates)}")
+    return problems
+
+
+def solve_problem(problem, directory, workspace_root, reports=True, backend="auto"):
+    """Solves one problem and writes its files; runs in the worker processes."""
+    from .api import solve
+
+    result = solve(
+        problem["formula"], problem["dof"], problem["constants"], problem["P_max"],
+        workspace_root=workspace_root, backend=backend,
+    )
+    files = [f"{problem['name']}.csv"]
+    result.table().to_pandas().to_csv(os.path.join(directory, files[0]), index=False)
+    if reports:
+        files.append(f"{problem['name']}.pdf")
+        with open(os.path.join(directory, files[1]), "wb") as f:
+            f.write(result.report(problem["description"]))
+    return {**result.summary(), "files": files}
+
+
+def solve_problems(problems, directory, max_workers=None, workspace_root=None, reports=True, progress=None,
+                   backend="auto"):
+    """Solves `problems` in a process pool; returns one record per problem, in input order."""
+    os.makedirs(directory, exist_ok=True)
+    workspace_root = workspace_root or default_scratch_root()
+    records = {}
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool, \
+            open(os.path.join(directory, "results.jsonl"), "w") as index:
+        futures = {
+            pool.submit(solve_problem, problem, directory, workspace_root, reports, backend): problem
+            for problem in problems
+        }
+        for finished, future in enumerate(as_completed(futures), start=1):
+            problem = futures[future]
+            try:
+                record = {"name": problem["name"], **future.result()}
+            except Exception as e:
+                record = {"name": problem["name"], "error": str(e)}
+            records[problem["name"]] = record
+            index.write(json.dumps(record) + "\n")
+            index.flush()
+            if progress:
+                progress(f"[{finished}/{len(futures)}] {problem['name']}: {record.get('critical_loads', record.get('error'))}")
+    return [records[problem["name"]] for problem in problems]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m bifurcation_engine solve", description="Solve a file of bifurcation problems in parallel."
+    )
+    parser.add_argument("problems", help="JSON list or JSON Lines file of problems")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--no-reports", action="store_true", help="Only write the result tables, no PDF reports")
+    parser.add_argument(
+        "--backend", choices=("auto", "numpy"), default="auto",
+        help="Continuation backend: AUTO-07p (default) or the in-process NumPy continuation",
+    )
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    records = solve_problems(
+        load_problems(args.problems), args.out, max_workers=args.workers, reports=not args.no_reports, progress=print,
+        backend=args.backend,
+    )
+    failed = sum("error" in record for record in records)
+    print(f"{len(records) - failed} solved, {failed} failed, results in {args.out} ({time.time() - start:.1f} s)")
+    return 1 if failed else 0
@@ -0,0 +1,250 @@
+"""Stage benchmark of the app's problems: ``python -m bifurcation_engine benchmark``.
+
+Every kit case, the default problem of the Stability Analysis page and the Limit Point
+truss run headlessly through the engine functions the pages call: formula parsing,
+compilation, solving, stability classification, lookups and tables, plot rendering and
+the PDF report. Each stage is timed over several repeats (median wall time) and traced
+once with tracemalloc (peak memory), for every continuation size and report length of
+the sweep. As with the startup benchmark, results can be saved and compared with a
+baseline to catch regressions.
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from .analytic import AnalyticRegistry
+from .api import classified_store
+from .cases import KIT_CASES
+from .continuation import solve_continuation
+from .figures import bifurcation_figure
+from .formulas import FormulaCompiler, dof_names
+from .frames import ResultFrame
+from .report import ReportBuilder
+from .solver import solve_job
+from .truss import ShallowTruss
+from .workspace import default_scratch_root
+
+PLOT_WIDTH = 704  # Width of the plots on the page
+BACKENDS = ("analytic", "numpy", "auto")
+# Default inputs of the Stability Analysis page
+STABILITY_PROBLEM = ("(1 / 2) * k * (q ** 2) * l ** 2 - 2 * P * l * (1 - sp.sqrt(1 - q ** 2))", "q", {"l": 1.0, "k": 1.0}, 1.0)
+# Default inputs of the Limit Point / Saddle-node page
+LIMIT_POINT = {"L": 2.0, "k": 1.0, "alpha": np.radians(30.0)}
+
+
+def problems():
+    """{scenario: (formula, parameter, constants, P_max)} of the energy-based pages."""
+    scenarios = {case.key: (case.formula, case.dof, case.constants, case.P_max) for case in KIT_CASES}
+    scenarios["stability_analysis"] = STABILITY_PROBLEM
+    return scenarios
+
+
+def scenario_names():
+    return [*problems(), "limit_point"]
+
+
+def energy_stages(formula, parameter, constants, P_max, backend="analytic", size=1, report_lines=20):
+    """(stage, function) pairs of one problem; every function gets the outputs of the earlier stages.
+
+    `size` scales the number of points of the continuation. Parsing and compiling use
+    fresh compilers, so they are timed without the caches the app keeps between reruns.
+    """
+    names = list(constants)
+
+    def parse(outputs):
+        return FormulaCompiler().expression(formula, parameter, names)
+
+    def compile_energy(outputs):
+        if backend == "analytic":
+            return AnalyticRegistry().model_for(outputs["parse"], constants)
+        return FormulaCompiler().compile(formula, parameter, names)
+
+    def solve(outputs):
+        if backend == "analytic":
+            if outputs["compile"] is None:
+                raise RuntimeError("The energy has no closed-form solution")
+            branches = outputs["compile"].branches(constants, P_max, n_points=2000 * size + 1)
+            if branches is None:
+                raise RuntimeError("The closed-form paths do not leave the load window")
+            return branches
+        if backend == "numpy":
+            return solve_continuation(outputs["compile"], constants, P_max, ds=0.1 / size, ds_max=0.2 / size,
+                                      max_points=200 * size)
+        # AUTO compiles its model inside the job, once per process, and cleans up its workspace
+        return solve_job(outputs["parse"], constants, P_max, default_scratch_root(), "benchmark", dof_names(parameter))
+
+    def classify(outputs):
+        return classified_store(outputs["solve"], formula, parameter, constants)
+
+    def lookup(outputs):
+        store = outputs["classify"]
+        return store.equilibria_grid(np.linspace(0.0, P_max, 200)), store.critical_loads(), ResultFrame(store).to_pandas()
+
+    def plot(outputs):
+        return bifurcation_figure(outputs["classify"], xlabel=parameter, ylabel="P").to_png(PLOT_WIDTH)
+
+    def report(outputs):
+        spec = bifurcation_figure(outputs["classify"], xlabel=parameter, ylabel="P")
+        return ReportBuilder(max_reports=1).build(
+            _description(report_lines), None, formula, parameter, P_max, constants, spec
+        )
+
+    stages = [("parse", parse)]
+    if backend != "auto":
+        stages.append(("compile", compile_energy))
+    return stages + [("solve", solve), ("classify", classify), ("lookup", lookup), ("plot", plot), ("report", report)]
+
+
+def truss_stages(size=1):
+    """(stage, function) pairs of the Limit Point truss; `size` scales the number of loads."""
+
+    def solve(outputs):
+        truss = ShallowTruss(**LIMIT_POINT)
+        P_limit = truss.snap_through()[0]
+        loads = np.linspace(0.0, 2 * P_limit, 2000 * size)
+        return truss, truss.angle_at(loads), truss.equilibrium_path(2 * P_limit, 400 * size)
+
+    def plot(outputs):
+        truss = outputs["solve"][0]
+        P_limit = truss.snap_through()[0]
+        return truss.figure(2 * P_limit, load=P_limit, num=400 * size).to_png(PLOT_WIDTH)
+
+    return [("solve", solve), ("plot", plot)]
+
+
+def _description(lines):
+    return "\n".join(
+        f"Paragraph {i + 1} of the benchmark description, long enough to be wrapped over more than one line of the report page."
+        for i in range(lines)
+    )
+
+
+def run_stages(stages, repeat=3):
+    """{stage: {"ms", "min_ms", "max_ms", "first_ms", "peak_kib"}}.
+
+    The first run of all stages warms up imports and caches and is reported as
+    `first_ms`; the other times are over the `repeat` runs after it. The peak memory is
+    what a stage allocates on top of the memory in use when it starts, in one extra
+    traced run.
+    """
+    times = {name: [] for name, _ in stages}
+    for _ in range(repeat + 1):
+        outputs = {}
+        for name, function in stages:
+            start = time.perf_counter()
+            outputs[name] = function(outputs)
+            times[name].append((time.perf_counter() - start) * 1000)
+    peaks = {}
+    outputs = {}
+    tracemalloc.start()
+    try:
+        for name, function in stages:
+            tracemalloc.reset_peak()
+            in_use = tracemalloc.get_traced_memory()[0]
+            outputs[name] = function(outputs)
+            peaks[name] = (tracemalloc.get_traced_memory()[1] - in_use) / 1024
+    finally:
+        tracemalloc.stop()
+    return {
+        name: {"ms": statistics.median(times[name][1:]), "min_ms": min(times[name][1:]), "max_ms": max(times[name][1:]),
+               "first_ms": times[name][0], "peak_kib": peaks[name]}
+        for name, _ in stages
+    }
+
+
+def run_benchmarks(names=None, backends=("analytic",), sizes=(1,), report_lines=(20,), repeat=3, progress=None):
+    """{run key: {stage: measurements}} for every scenario, backend, size and report length.
+
+    Run keys look like ``asymmetric/analytic/size=1/lines=20``; `progress(key)` is called
+    before each run. Scenarios a backend cannot solve are left out.
+    """
+    energy_problems = problems()
+    results = {}
+    for name in names or scenario_names():
+        for size in sizes:
+            if name == "limit_point":
+                runs = [(f"{name}/closed-form/size={size}", truss_stages(size))]
+            else:
+                runs = [
+                    (f"{name}/{backend}/size={size}/lines={lines}",
+                     energy_stages(*energy_problems[name], backend=backend, size=size, report_lines=lines))
+                    for backend in backends for lines in report_lines
+                ]
+            for key, stages in runs:
+                if progress:
+                    progress(key)
+                try:
+                    results[key] = run_stages(stages, repeat)
+                except RuntimeError as e:
+                    if progress:
+                        progress(f"{key}: skipped, {e}")
+    return results
+
+
+def compare(results, baseline, tolerance=1.25, slack_ms=1.0, slack_kib=64.0):
+    """Regressions against `baseline`: (key, stage, what, value, limit) for every stage that got
+    more than `tolerance` times slower or larger, and at least `slack_ms` / `slack_kib` worse."""
+    regressions = []
+    for key, stages in results.items():
+        for stage, result in stages.items():
+            before = baseline.get(key, {}).get(stage)
+            if before is None:
+                continue
+            for what, slack in (("ms", slack_ms), ("peak_kib", slack_kib)):
+                limit = max(tolerance * before[what], before[what] + slack)
+                if result[what] > limit:
+                    regressions.append((key, stage, what, result[what], limit))
+    return regressions
+
+
+def _list(text, convert):
+    return [convert(item) for item in text.split(",") if item.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m bifurcation_engine benchmark",
+        description="Wall time and peak memory of the solve, lookup, plot and report stages of the app's problems.",
+    )
+    parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run: {', '.join(scenario_names())} (default: all)")
+    parser.add_argument("--backend", action="append", choices=BACKENDS,
+                        help="Solver of the energy-based scenarios, can be repeated (default: analytic)")
+    parser.add_argument("--sizes", default="1", help="Comma-separated continuation size factors (default: 1)")
+    parser.add_argument("--report-lines", default="20", help="Comma-separated description lengths of the report (default: 20)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (default: 3)")
+    parser.add_argument("--baseline", help="JSON file of an earlier run; a stage fails if it got 25%% slower or larger")
+    parser.add_argument("--save", help="Write the results as JSON, e.g. as a new baseline")
+    args = parser.parse_args(argv)
+
+    for name in args.scenarios:
+        if name not in scenario_names():
+            parser.error(f"unknown scenario {name!r}")
+    try:
+        sizes = _list(args.sizes, int)
+        report_lines = _list(args.report_lines, int)
+    except ValueError:
+        parser.error("--sizes and --report-lines take comma-separated integers")
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else {}
+
+    results = run_benchmarks(
+        args.scenarios or None, args.backend or ["analytic"], sizes, report_lines, args.repeat,
+        progress=lambda key: print(f"# {key}", flush=True),
+    )
+    regressions = compare(results, baseline)
+    failed = {(key, stage) for key, stage, *_ in regressions}
+    for key, stages in results.items():
+        print(key)
+        for stage, result in stages.items():
+            status = "FAIL" if (key, stage) in failed else ("ok  " if key in baseline else "    ")
+            print(f"  {status} {stage:9s} {result['ms']:9.2f} ms (min {result['min_ms']:.2f}, first {result['first_ms']:.2f})"
+                  f" {result['peak_kib']:10.1f} KiB peak")
+    for key, stage, what, value, limit in regressions:
+        print(f"FAIL {key} {stage}: {what} {value:.2f} > {limit:.2f}")
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2))
+    return 1 if failed else 0
@@ -0,0 +1,162 @@
+import numpy as np
+
+LOAD_COLUMN = "PAR(1)"
+
+
+class Segment:
+    """Part of a branch along which the load is monotone, stored with ascending load."""
+
+    def __init__(self, branch, start, stop):
+        self.branch = branch
+        self.start = start
+        self.stop = stop
+        load = branch.load[start:stop]
+        self.reversed = bool(len(load) > 1 and load[-1] < load[0])
+        self.load = load[::-1] if self.reversed else load
+
+    def column(self, name):
+        values = self.branch[name][self.start:self.stop]
+        return values[::-1] if self.reversed else values
+
+    def interpolate(self, loads, name):
+        """Linearly interpolates column `name` at `loads`, NaN where the segment does not reach."""
+        loads = np.asarray(loads, dtype=float)
+        x = self.load
+        y = self.column(name).astype(float, copy=False)
+        if len(x) == 1:
+            return np.where(loads == x[0], y[0], np.nan)
+        i = np.clip(np.searchsorted(x, loads, side="left"), 1, len(x) - 1)
+        x0, x1 = x[i - 1], x[i]
+        dx = x1 - x0
+        t = np.divide(loads - x0, dx, out=np.zeros(np.broadcast(loads, dx).shape), where=dx > 0)
+        values = y[i - 1] + t * (y[i] - y[i - 1])
+        return np.where((loads >= x[0]) & (loads <= x[-1]), values, np.nan)
+
+
+class Branch:
+    """One continuation branch as contiguous NumPy arrays, indexed like the AUTO columns."""
+
+    def __init__(self, columns, branch_id=0):
+        self.branch_id = branch_id
+        self.columns = {str(name): np.ascontiguousarray(values) for name, values in columns.items()}
+        self.load = self.columns[LOAD_COLUMN].astype(float, copy=False)
+        self.segments = [Segment(self, start, stop) for start, stop in _monotone_segments(self.load)]
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __len__(self):
+        return len(self.load)
+
+    @property
+    def dof_names(self):
+        return [name for name in self.columns if name.startswith("U(")]
+
+
+class BranchStore:
+    """All branches of a solution with vectorized lookups of the equilibria at a given load.
+
+    The points of all branches are stored column by column in one contiguous array
+    per AUTO column; the branches are views into these arrays. Each branch is split
+    into segments along which the load is monotone, so finding the equilibria at a
+    load is a binary search per segment followed by linear interpolation instead of
+    a scan over all points with a fixed tolerance.
+    """
+
+    def __init__(self, branches):
+        branches = [branch.columns if isinstance(branch, Branch) else branch for branch in branches]
+        names = [str(name) for name in branches[0].keys()] if branches else [LOAD_COLUMN]
+        lengths = [len(branch[LOAD_COLUMN]) for branch in branches]
+        self.offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+        self.columns = {
+            name: np.concatenate([np.asarray(branch[name]) for branch in branches])
+            if branches else np.empty(0)
+            for name in names
+        }
+        self.branches = [
+            Branch({name: values[start:stop] for name, values in self.columns.items()}, branch_id=index)
+            for index, (start, stop) in enumerate(zip(self.offsets[:-1], self.offsets[1:]))
+        ]
+        self.segments = [segment for branch in self.branches for segment in branch.segments]
+
+    @property
+    def n_points(self):
+        return int(self.offsets[-1])
+
+    def add_column(self, name, values):
+        """Adds a per-point column (e.g. the stability) to the store and to the branch views."""
+        values = np.asarray(values)
+        if len(values) != self.n_points:
+            raise ValueError(f"Column {name} has {len(values)} values for {self.n_points} points")
+        self.columns[name] = values
+        for branch, start, stop in zip(self.branches, self.offsets[:-1], self.offsets[1:]):
+            branch.columns[name] = values[start:stop]
+
+    @property
+    def branch_ids(self):
+        """Branch index of every point, aligned with `columns`."""
+        return np.repeat(np.arange(len(self.branches)), np.diff(self.offsets))
+
+    def __iter__(self):
+        return iter(self.branches)
+
+    def __len__(self):
+        return len(self.branches)
+
+    def __getitem__(self, index):
+        return self.branches[index]
+
+    def __repr__(self):
+        return f"BranchStore({len(self.branches)} branches, {self.n_points} points)"
+
+    def critical_loads(self):
+        """Loads of the branch and limit points, sorted and without duplicates.
+
+        These are the points AUTO labels BP or LP plus the load maxima along the branches.
+        """
+        loads = []
+        if "TY" in self.columns:
+            loads.extend(self.columns[LOAD_COLUMN][np.isin(self.columns["TY"], (1, 2, 5, 6))])
+        for branch in self.branches:
+            for before, after in zip(branch.segments[:-1], branch.segments[1:]):
+                if not before.reversed and after.reversed:
+                    loads.append(branch.load[after.start])
+        unique = []
+        for load in sorted(float(load) for load in loads):
+            if not unique or load - unique[-1] > 1e-9 * (1.0 + abs(load)):
+                unique.append(load)
+        return unique
+
+    def equilibria_grid(self, loads, dof="U(1)"):
+        """Returns an array of shape (len(loads), number of segments) with NaN where a segment has no equilibrium."""
+        loads = np.atleast_1d(np.asarray(loads, dtype=float))
+        if not self.segments:
+            return np.empty((len(loads), 0))
+        return np.stack([segment.interpolate(loads, dof) for segment in self.segments], axis=1)
+
+    def equilibria_at(self, load, dof="U(1)"):
+        """Returns every equilibrium value of `dof` at `load`, in the order of the branches."""
+        values = self.equilibria_grid([load], dof)[0]
+        values = values[~np.isnan(values)]
+        # Points shared by neighbouring segments (turning points, branch points) are reported once
+        unique = []
+        for value in values:
+            if not any(abs(value - other) <= 1e-9 * (1.0 + abs(other)) for other in unique):
+                unique.append(value)
+        return np.array(unique)
+
+
+def _monotone_segments(load):
+    """(start, stop) index ranges of the monotone parts of `load`; neighbours share their turning point."""
+    steps = np.sign(np.diff(load))
+    moving = np.flatnonzero(steps)
+    if len(moving) == 0:
+        return [(0, len(load))]
+    direction = steps[moving]
+    turning_points = moving[1:][direction[1:] != direction[:-1]]
+    starts = [0, *turning_points.tolist()]
+    stops = [*(turning_points + 1).tolist(), len(load)]
+    return list(zip(starts, stops))
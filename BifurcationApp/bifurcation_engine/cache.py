@@ -0,0 +1,187 @@
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import sympy as sp
+
+from .archive import ResultArchive
+from .metrics import count, span
+
+
+def solution_key(energy, parameter, P_max, constants):
+    """Content hash of everything that determines the continuation result.
+
+    The load P only selects a point on the branches, so it is not part of the key.
+    """
+    payload = {
+        "energy": sp.srepr(energy),
+        "dof": str(parameter),
+        "RL1": float(P_max),
+        "constants": {str(key): float(value) for key, value in sorted(constants.items())},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def solution_metadata(energy, parameter, P_max, constants, solver):
+    """What a solution was solved from and how, stored with it on disk: the energy and its hash,
+    the DOFs, the constants, P_max and the solver ("analytic", "numpy" or "auto") with its settings."""
+    return {
+        "energy": str(energy),
+        "energy_hash": hashlib.sha256(sp.srepr(energy).encode("utf-8")).hexdigest(),
+        "parameter": str(parameter),
+        "constants": {str(key): float(value) for key, value in constants.items()},
+        "P_max": float(P_max),
+        "solver": solver,
+        "settings": _solver_settings(solver, P_max),
+    }
+
+
+def _solver_settings(solver, P_max):
+    # The defaults the solvers run with, none of them is changed by the app
+    if solver == "auto":
+        import pyfurc as pf
+        return {**pf.AutoParameters(), "RL1": float(P_max)}
+    if solver == "numpy":
+        from .continuation import Continuation
+        function = Continuation.__init__
+    elif solver == "analytic":
+        from .analytic import AnalyticModel
+        function = AnalyticModel.branches
+    else:
+        return {}
+    return {
+        name: parameter.default for name, parameter in inspect.signature(function).parameters.items()
+        if parameter.default is not inspect.Parameter.empty
+    }
+
+
+class SolutionCache:
+    """LRU cache of solved branches with an optional on-disk tier.
+
+    A cached solution is a list of branches, each branch a dict mapping the AUTO
+    column names ("PAR(1)", "U(1)", ...) to read-only NumPy arrays. On disk, solutions
+    are kept in a ResultArchive with their metadata and memory-mapped when they are
+    loaded, so a restarted app or another worker process serves them without copying.
+    `compressed` solutions (e.g. of sweeps) are stored as .npz files instead.
+    """
+
+    def __init__(self, max_entries=64, disk_dir=None, compressed=False):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.compressed = compressed
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if disk_dir and not os.path.exists(disk_dir):
+            os.makedirs(disk_dir, exist_ok=True)
+        self.archive = ResultArchive(disk_dir) if disk_dir and not compressed else None
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                count("cache.solution.hit")
+                return self._entries[key]
+        branches = self._load_from_disk(key)
+        with self._lock:
+            if branches is None:
+                self.misses += 1
+                count("cache.solution.miss")
+                return None
+            self.hits += 1
+            count("cache.solution.disk_hit")
+            self._remember(key, branches)
+        return branches
+
+    def put(self, key, branches, metadata=None):
+        """Caches the branches, with `metadata` (see solution_metadata) stored next to them on disk."""
+        branches = [_freeze_branch(branch) for branch in branches]
+        with self._lock:
+            self._remember(key, branches)
+        self._save_to_disk(key, branches, metadata)
+        return branches
+
+    def get_or_solve(self, key, solve):
+        """Returns the cached branches for `key`, calling `solve()` only on a miss."""
+        branches = self.get(key)
+        if branches is None:
+            branches = self.put(key, solve())
+        return branches
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries or (self.archive is not None and key in self.archive) or (
+            self.disk_dir is not None and os.path.exists(self._disk_path(key))
+        )
+
+    def _remember(self, key, branches):
+        self._entries[key] = branches
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.npz")
+
+    def _save_to_disk(self, key, branches, metadata=None):
+        if not self.disk_dir:
+            return
+        if self.archive is not None:
+            self.archive.save(key, branches, metadata)
+            return
+        arrays = {
+            f"branch{index}/{column}": values
+            for index, branch in enumerate(branches)
+            for column, values in branch.items()
+        }
+        arrays["n_branches"] = np.array(len(branches))
+        # Write to a temporary file first so concurrent readers never see a partial archive
+        tmp_path = self._disk_path(key) + f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            (np.savez_compressed if self.compressed else np.savez)(f, **arrays)
+        os.replace(tmp_path, self._disk_path(key))
+
+    def _load_from_disk(self, key):
+        if self.archive is not None:
+            branches = self.archive.load(key)
+            if branches is not None:
+                return branches
+        if not self.disk_dir or not os.path.exists(self._disk_path(key)):
+            return None
+        try:
+            with span("cache.load"), np.load(self._disk_path(key), allow_pickle=False) as archive:
+                branches = [{} for _ in range(int(archive["n_branches"]))]
+                for name in archive.files:
+                    if name == "n_branches":
+                        continue
+                    branch_name, column = name.split("/", 1)
+                    branches[int(branch_name[len("branch"):])][column] = archive[name]
+        except (OSError, ValueError, KeyError):
+            return None
+        branches = [_freeze_branch(branch) for branch in branches]
+        if self.archive is not None:
+            # A solution of an earlier version of the cache, moved to the archive
+            self.archive.save(key, branches)
+            os.remove(self._disk_path(key))
+        return branches
+
+
+def _freeze_branch(branch):
+    frozen = {}
+    for column, values in branch.items():
+        array = np.array(values, copy=True)
+        array.setflags(write=False)
+        frozen[str(column)] = array
+    return frozen
@@ -0,0 +1,172 @@
+"""Declarative registry of the kit models: energy, inputs, labels and deformation kinematics.
+
+The app renders every registered case with the same page code, so a new kit model only
+needs a `KitCase` registration here.
+"""
+import numpy as np
+
+
+class CaseInput:
+    """A number input of a case page; `name` is a constant of the energy or "P" for the load."""
+
+    def __init__(self, name, label, default, step=None):
+        self.name = name
+        self.label = label
+        self.default = default
+        self.step = step
+
+
+class KitCase:
+    """One kit model.
+
+    `deformed(constants, P, dof)` and `initial(constants)` return the node coordinates
+    (xs, ys) of the deformed and the undeformed system; `deformed` is evaluated with
+    NumPy arrays of loads and DOF values as well. `results(constants, P, dof)` returns
+    the lines shown below the deformation plot.
+    """
+
+    def __init__(self, key, title, formula, dof, inputs, image, dof_label, deformation_title,
+                 initial, deformed, results, P_max=3.0, plot_button="Update Plots"):
+        self.key = key
+        self.title = title
+        self.formula = formula
+        self.dof = dof
+        self.inputs = inputs
+        self.image = image
+        self.dof_label = dof_label
+        self.deformation_title = deformation_title
+        self.initial = initial
+        self.deformed = deformed
+        self.results = results
+        self.P_max = P_max
+        self.plot_button = plot_button
+
+    @property
+    def constants(self):
+        """Default values of the constants of the energy."""
+        return {item.name: float(item.default) for item in self.inputs if item.name != "P"}
+
+    @property
+    def default_load(self):
+        return next(item.default for item in self.inputs if item.name == "P")
+
+    @property
+    def template(self):
+        return {"formula": self.formula, "dof": self.dof, "constants": self.constants}
+
+
+class CaseRegistry:
+    """Kit cases in the order of the app navigation."""
+
+    def __init__(self):
+        self._cases = {}
+
+    def register(self, case):
+        if case.key in self._cases:
+            raise ValueError(f"A case named {case.key!r} is already registered")
+        self._cases[case.key] = case
+        return case
+
+    def __getitem__(self, key):
+        return self._cases[key]
+
+    def __iter__(self):
+        return iter(self._cases.values())
+
+    def __len__(self):
+        return len(self._cases)
+
+    def titles(self):
+        return [case.title for case in self]
+
+    def by_title(self, title):
+        return next(case for case in self if case.title == title)
+
+    def templates(self):
+        """{key: {"formula", "dof", "constants"}} of all cases."""
+        return {case.key: case.template for case in self}
+
+
+def _zeros(values):
+    return np.zeros_like(np.asarray(values, dtype=float))
+
+
+KIT_CASES = CaseRegistry()
+
+KIT_CASES.register(KitCase(
+    key="stable_symmetric",
+    title="Stable Symmetric Bifurcation",
+    formula="2 * c * theta**2 - 2 * P * L * (1 - sp.cos(theta))",
+    dof="theta",
+    inputs=[
+        CaseInput("L", "Enter L (cm):", 2.0, 0.1),
+        CaseInput("c", "Enter c (N*cm/rad):", 1.0, 0.1),
+        CaseInput("P", "Enter P (N):", 1.31, 0.1),
+    ],
+    image="images/stable_symmetric_case.jpeg",
+    dof_label="Displacement (theta)",
+    deformation_title="Deformation of 2 Rigid Links with Torsional Spring",
+    initial=lambda constants: ([0, constants["L"], 2 * constants["L"]], [0, 0, 0]),
+    # Delta = L * (1 - cos(theta)) is the horizontal displacement of the left cart
+    deformed=lambda constants, P, theta: (
+        [constants["L"] * (1 - np.cos(theta)), constants["L"] * (3 - np.cos(theta)) / 2, 2 * constants["L"] + _zeros(P)],
+        [_zeros(theta), np.abs(constants["L"] * np.sin(theta / 1.5)), _zeros(theta)],
+    ),
+    results=lambda constants, P, theta: [
+        f"Applied force (P): {P} N",
+        f"Angle (Theta): {np.degrees(theta):.2f} degrees",
+        f"Horizontal displacement of left cart (Delta): {constants['L'] * (1 - np.cos(theta)):.2f} cm",
+    ],
+    plot_button="Update Plot",
+))
+
+KIT_CASES.register(KitCase(
+    key="unstable_symmetric",
+    title="Unstable Symmetric Bifurcation",
+    formula="(1/2) * k * q**2 * l**2 - 2 * P * l * (1 - sp.sqrt(1 - q**2))",
+    dof="q",
+    inputs=[
+        CaseInput("l", "L (cm):", 1.0),
+        CaseInput("k", "k (N/cm):", 3.0),
+        CaseInput("P", "P (N):", 0.857),
+    ],
+    image="images/unstable_symmetric_case.jpeg",
+    dof_label="Displacement (q)",
+    deformation_title="Deformation of the 2 Rigid Links with Spring",
+    initial=lambda constants: ([0, constants["l"], 2 * constants["l"]], [0, 0, 0]),
+    # The left cart moves by P / k (Hooke's law), the center joint rises by |q * L|
+    deformed=lambda constants, P, q: (
+        [P / constants["k"], constants["l"] + P / constants["k"] / 2, 2 * constants["l"] + _zeros(P)],
+        [_zeros(q), np.abs(q * constants["l"]), _zeros(q)],
+    ),
+    results=lambda constants, P, q: [
+        f"**Applied force (P):** {P} N",
+        f"**Horizontal displacement of the left cart (Delta):** {P / constants['k']:.2f} cm",
+        f"**Center joint position:** X = {constants['l'] + P / constants['k'] / 2:.2f} cm, Y = {abs(q * constants['l']):.2f} cm",
+    ],
+))
+
+KIT_CASES.register(KitCase(
+    key="asymmetric",
+    title="Asymmetric Bifurcation",
+    formula="k*l*(1-sp.sqrt(1+q))**2 - P*l*(1-sp.sqrt(1-q**2))",
+    dof="q",
+    inputs=[
+        CaseInput("l", "L (cm):", 2.0, 0.1),
+        CaseInput("k", "k (N/cm):", 1.0, 0.1),
+        CaseInput("P", "P (N):", 1.41, 0.1),
+    ],
+    image="images/asymmetric_case.jpeg",
+    dof_label="Displacement (q)",
+    deformation_title="Deformation of the 2 Rigid Links with Spring embedded in the left one",
+    initial=lambda constants: ([0, constants["l"], constants["l"]], [0, constants["l"], 0]),
+    # The top node moves horizontally by q * L and down by P / k (Hooke's law)
+    deformed=lambda constants, P, q: (
+        [_zeros(q), constants["l"] + q * constants["l"], constants["l"] + _zeros(q)],
+        [_zeros(P), constants["l"] - P / constants["k"], _zeros(P)],
+    ),
+    results=lambda constants, P, q: [
+        f"**Vertical displacement of the top node (delta):** {P / constants['k']:.2f} cm",
+        f"**Horizontal displacement of the top node (q*L):** {q * constants['l']:.2f} cm",
+    ],
+))
@@ -0,0 +1,149 @@
+"""Interactive Vega-Lite charts of the branches, with a load slider evaluated in the browser."""
+import numpy as np
+
+from .branches import LOAD_COLUMN
+from .stability import STABILITY_COLUMN
+
+
+def lttb_indices(x, y, n_out):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept; from every bucket in between the
+    point forming the largest triangle with the previous pick and the mean of the
+    next bucket is chosen, which keeps peaks and turning points of the curve.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    picked = np.empty(n_out, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = np.nanmean(x[stop:next_stop])
+        next_y = np.nanmean(y[stop:next_stop])
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.nanargmax(area)) if np.isfinite(area).any() else start
+        picked[bucket + 1] = previous
+    return picked
+
+
+def branch_rows(store, dof="U(1)", max_points=2000):
+    """Downsampled branch points as Vega-Lite rows, one line per run of equal stability.
+
+    Every branch keeps a share of `max_points` proportional to its length.
+    """
+    rows = []
+    total = max(store.n_points, 1)
+    for branch in store:
+        x, load = branch[dof], branch[LOAD_COLUMN]
+        kept = lttb_indices(x, load, max(3, int(max_points * len(load) / total)))
+        stable = branch[STABILITY_COLUMN][kept] if STABILITY_COLUMN in branch else np.ones(len(kept), dtype=bool)
+        # A new run starts where the stability changes; its first point also ends the previous run
+        run = np.concatenate([[0], np.cumsum(stable[1:] != stable[:-1])])
+        for index in range(len(kept)):
+            point = {"x": float(x[kept[index]]), "P": float(load[kept[index]]), "branch": branch.branch_id + 1}
+            if np.isfinite(point["x"]) and np.isfinite(point["P"]):
+                for point_run, point_stable in [(run[index], stable[index])] + (
+                    [(run[index + 1], stable[index + 1])] if index + 1 < len(kept) and run[index + 1] != run[index] else []
+                ):
+                    stability = "Stable" if point_stable else "Unstable"
+                    rows.append({**point, "run": f"{branch.branch_id}/{point_run}", "stability": stability, "order": len(rows)})
+    return rows
+
+
+def interactive_chart(store, loads, xlabel, ylabel, initial_load, dof="U(1)", configuration=None,
+                      initial_configuration=None, max_points=2000):
+    """Vega-Lite spec of the bifurcation plot with a load slider, and optionally the deformed system.
+
+    The equilibria at every load of `loads` are computed here once; the slider only filters
+    them in the browser. `configuration(P, dof_values)` returns the node coordinates
+    (xs, ys), each of shape (n_nodes, n_loads), of the deformed system for the last
+    equilibrium at each load; `initial_configuration` is the undeformed (xs, ys).
+    """
+    loads = np.asarray(loads, dtype=float)
+    step = float(loads[1] - loads[0]) if len(loads) > 1 else 1.0
+    grid = store.equilibria_grid(loads, dof)
+    equilibria = [
+        {"P": float(load), "x": float(value)}
+        for load, row in zip(loads, grid) for value in row[np.isfinite(row)]
+    ]
+    slider = {
+        "name": "load", "value": float(loads[np.argmin(np.abs(loads - initial_load))]),
+        "bind": {"input": "range", "min": float(loads[0]), "max": float(loads[-1]), "step": step, "name": f"{ylabel} "},
+    }
+    at_load = {"filter": f"abs(datum.P - load) < {step / 2}"}
+    bifurcation = {
+        "title": "Bifurcation Plot",
+        "width": 320 if configuration else 640,
+        "height": 300,
+        "layer": [
+            {
+                "data": {"values": branch_rows(store, dof, max_points)},
+                "mark": {"type": "line", "clip": True},
+                "encoding": {
+                    "x": {"field": "x", "type": "quantitative", "title": xlabel},
+                    "y": {"field": "P", "type": "quantitative", "title": ylabel},
+                    "color": {"field": "branch", "type": "nominal", "title": "Branch"},
+                    "strokeDash": {"field": "stability", "type": "nominal", "title": "Stability",
+                                   "scale": {"domain": ["Stable", "Unstable"], "range": [[1, 0], [6, 3]]}},
+                    "detail": {"field": "run"},
+                    "order": {"field": "order"},
+                },
+            },
+            {
+                "data": {"values": equilibria},
+                "transform": [at_load],
+                "mark": {"type": "point", "filled": True, "color": "red", "size": 60},
+                "encoding": {"x": {"field": "x", "type": "quantitative"}, "y": {"field": "P", "type": "quantitative"}},
+            },
+        ],
+    }
+    if configuration is None:
+        return {"params": [slider], **bifurcation}
+
+    last = np.full(len(loads), np.nan)
+    finite = np.isfinite(grid)
+    has_equilibrium = finite.any(axis=1)
+    last_column = grid.shape[1] - 1 - np.argmax(finite[:, ::-1], axis=1)
+    last[has_equilibrium] = grid[has_equilibrium, last_column[has_equilibrium]]
+    xs, ys = configuration(loads, last)
+    xs, ys = np.broadcast_to(xs, (len(xs), len(loads))), np.broadcast_to(ys, (len(ys), len(loads)))
+    deformed = [
+        {"P": float(load), "node": node, "X": float(xs[node, i]), "Y": float(ys[node, i])}
+        for i, load in enumerate(loads) if has_equilibrium[i] for node in range(len(xs))
+    ]
+    initial_xs, initial_ys = initial_configuration
+    initial = [{"node": node, "X": float(x), "Y": float(y)} for node, (x, y) in enumerate(zip(initial_xs, initial_ys))]
+    coordinates = np.concatenate([np.ravel(xs), np.ravel(ys), np.ravel(initial_xs), np.ravel(initial_ys)])
+    coordinates = coordinates[np.isfinite(coordinates)]
+    # Same range on both axes, so the drawing is not distorted
+    low, high = float(coordinates.min()), float(coordinates.max())
+    pad = 0.1 * (high - low or 1.0)
+    domain = [low - pad, high + pad]
+    deformation = {
+        "title": "Deformation",
+        "width": 300,
+        "height": 300,
+        "encoding": {
+            "x": {"field": "X", "type": "quantitative", "title": "X (cm)", "scale": {"domain": domain}},
+            "y": {"field": "Y", "type": "quantitative", "title": "Y (cm)", "scale": {"domain": domain}},
+            "order": {"field": "node"},
+        },
+        "layer": [
+            {"data": {"values": initial}, "mark": {"type": "line", "point": True, "color": "blue"}},
+            {
+                "data": {"values": deformed},
+                "transform": [at_load],
+                "mark": {"type": "line", "point": {"color": "red"}, "color": "red", "strokeDash": [6, 3]},
+            },
+        ],
+    }
+    return {"params": [slider], "hconcat": [bifurcation, deformation]}
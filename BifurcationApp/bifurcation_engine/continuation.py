@@ -0,0 +1,257 @@
+"""In-process pseudo-arclength continuation of the equilibrium paths with NumPy, an alternative to AUTO.
+
+The unknowns are x = (U(1), ..., U(n), P); the equilibrium equations are the gradient of
+the energy, their Jacobian is the Hessian with the load derivatives of the gradient as
+last column. Like AUTO with its default constants, the continuation starts from the
+unloaded state at P = 0, detects branch points (sign changes of the determinant of the
+Jacobian bordered by the tangent) and limit points (sign changes of the load component
+of the tangent), and switches onto the branches emanating from the branch points. Steps
+over which more than one eigenvalue of the Hessian changes sign are refined, so close
+critical loads of many-DOF chains are found one by one.
+Small problems solve in milliseconds without code generation or files.
+"""
+import numpy as np
+
+from .analytic import BRANCH_POINT, END_POINT, ORDINARY
+from .metrics import span
+
+LIMIT_POINT = 2
+
+
+class EquilibriumSystem:
+    """Equilibrium equations of a compiled energy for fixed constant values, evaluated point by point."""
+
+    def __init__(self, compiled, constants):
+        self.compiled = compiled
+        self.n = len(compiled.dofs)
+        self.args = compiled.constant_values(constants)
+
+    def residual(self, x):
+        return np.array(self.compiled.gradient_function(*x, *self.args), dtype=float)
+
+    def jacobian(self, x):
+        """The n x (n + 1) Jacobian of the residual by (U, P)."""
+        jacobian = np.zeros((self.n, self.n + 1))
+        entries = self.compiled.hessian_function(*x, *self.args)
+        for (i, j), value in zip(self.compiled.hessian_pattern, entries):
+            jacobian[i, j] = jacobian[j, i] = value
+        jacobian[:, self.n] = self.compiled.load_gradient_function(*x, *self.args)
+        return jacobian
+
+
+class Continuation:
+    """Traces the branches of an EquilibriumSystem between P = 0 and `P_max`.
+
+    The step size `ds` adapts between `ds_min` and `ds_max`; each branch has at most
+    `max_points` points and at most `max_branches` branches are traced, as with AUTO's
+    NMX and MXBF. Newton corrections stop at a relative change of `tol`.
+    """
+
+    def __init__(self, system, P_max, ds=0.1, ds_min=1e-3, ds_max=0.2, max_points=200, max_branches=10,
+                 tol=1e-7, max_iterations=8):
+        self.system = system
+        self.P_max = float(P_max)
+        self.ds = ds
+        self.ds_min = ds_min
+        self.ds_max = ds_max
+        self.max_points = max_points
+        self.max_branches = max_branches
+        self.tol = tol
+        self.max_iterations = max_iterations
+
+    def branches(self, start=None):
+        """The branches as dicts of PT, TY, PAR(1) and U(i) arrays, shaped like the AUTO solution."""
+        n = self.system.n
+        x = np.zeros(n + 1) if start is None else np.append(np.asarray(start, dtype=float), 0.0)
+        x = self._correct_at_load(x)
+        if x is None:
+            return []
+        direction = np.zeros(n + 1)
+        direction[n] = 1.0
+        pending = [(x, self._tangent(x, direction), END_POINT)]
+        branch_points = []
+        branches = []
+        while pending and len(branches) < self.max_branches:
+            x, tangent, start_type = pending.pop(0)
+            points, types, found = self._trace(x, tangent, start_type)
+            if len(points) > 1:
+                branches.append(_branch(np.array(points), types))
+            for point, point_tangent in found:
+                if any(np.linalg.norm(point - other) <= 1e-6 * (1.0 + np.linalg.norm(other)) for other in branch_points):
+                    continue
+                branch_points.append(point)
+                switch = self._switching_direction(point, point_tangent)
+                if switch is not None:
+                    pending.extend([(point, -switch, BRANCH_POINT), (point, switch, BRANCH_POINT)])
+        return branches
+
+    def _trace(self, x, tangent, start_type):
+        """Follows one branch from `x` in the direction of `tangent`; returns its points, types and branch points."""
+        points, types, found = [x], [start_type], []
+        ds = self.ds
+        # The test function vanishes at the start of a switched branch, so its first step is not checked
+        test = None if start_type == BRANCH_POINT else self._bifurcation_test(x, tangent)
+        inertia = self._inertia(x)
+        while len(points) < self.max_points:
+            step = self._step(x, tangent, ds)
+            if step is None:
+                ds /= 2
+                if ds < self.ds_min:
+                    break
+                continue
+            x_next, iterations = step
+            leaving = not 0.0 <= x_next[-1] <= self.P_max
+            if leaving:
+                # End exactly at the bound of the load range
+                x_next = self._correct_at_load(x + (x_next - x) * _fraction(x[-1], x_next[-1], self.P_max))
+                if x_next is None:
+                    break
+            inertia_next = self._inertia(x_next)
+            if abs(inertia_next - inertia) > 1 and ds / 2 >= self.ds_min:
+                # Several eigenvalues crossed zero, which the sign of the test function cannot tell apart
+                ds /= 2
+                continue
+            tangent_next = self._tangent(x_next, tangent)
+            test_next = self._bifurcation_test(x_next, tangent_next)
+            reach = tangent @ (x_next - x)
+            if test is not None and np.sign(test_next) != np.sign(test):
+                point = self._locate(x, tangent, reach, test, test_next, self._bifurcation_test)
+                if point is not None:
+                    points.append(point[0])
+                    types.append(BRANCH_POINT)
+                    found.append(point)
+            elif tangent[-1] * tangent_next[-1] < 0:
+                point = self._locate(x, tangent, reach, tangent[-1], tangent_next[-1], lambda y, t: t[-1])
+                if point is not None:
+                    points.append(point[0])
+                    types.append(LIMIT_POINT)
+            points.append(x_next)
+            types.append(END_POINT if leaving else ORDINARY)
+            if leaving:
+                break
+            x, tangent, test, inertia = x_next, tangent_next, test_next, inertia_next
+            if iterations <= 3:
+                ds = min(2 * ds, self.ds_max)
+        if len(types) > 1 and types[-1] == ORDINARY:
+            types[-1] = END_POINT
+        return points, types, found
+
+    def _step(self, x, tangent, ds):
+        """Predictor along the tangent and Newton corrector on the hyperplane normal to it."""
+        predicted = x + ds * tangent
+        y = predicted.copy()
+        with np.errstate(all="ignore"):
+            for iteration in range(1, self.max_iterations + 1):
+                residual = np.append(self.system.residual(y), tangent @ (y - predicted))
+                matrix = np.vstack([self.system.jacobian(y), tangent])
+                if not (np.isfinite(residual).all() and np.isfinite(matrix).all()):
+                    return None
+                delta = _solve(matrix, -residual)
+                y += delta
+                if np.linalg.norm(delta) <= self.tol * (1.0 + np.linalg.norm(y)):
+                    return (y, iteration) if np.isfinite(y).all() else None
+        return None
+
+    def _correct_at_load(self, x):
+        """Newton correction of the DOFs of `x` at its load."""
+        y = x.copy()
+        n = self.system.n
+        with np.errstate(all="ignore"):
+            for _ in range(self.max_iterations):
+                residual = self.system.residual(y)
+                matrix = self.system.jacobian(y)[:, :n]
+                if not (np.isfinite(residual).all() and np.isfinite(matrix).all()):
+                    return None
+                delta = _solve(matrix, -residual)
+                y[:n] += delta
+                if np.linalg.norm(delta) <= self.tol * (1.0 + np.linalg.norm(y)):
+                    return y
+        return None
+
+    def _tangent(self, x, previous):
+        """Unit null vector of the Jacobian at `x`, oriented like `previous`."""
+        matrix = np.vstack([self.system.jacobian(x), previous])
+        right = np.zeros(len(x))
+        right[-1] = 1.0
+        try:
+            tangent = np.linalg.solve(matrix, right)
+        except np.linalg.LinAlgError:
+            tangent = np.linalg.svd(self.system.jacobian(x))[2][-1]
+        tangent /= np.linalg.norm(tangent)
+        return tangent if tangent @ previous >= 0 else -tangent
+
+    def _inertia(self, x):
+        """Number of negative eigenvalues of the Hessian at `x`, i.e. of unstable directions."""
+        with np.errstate(all="ignore"):
+            hessian = self.system.jacobian(x)[:, :-1]
+        return int((np.linalg.eigvalsh(hessian) < 0).sum()) if np.isfinite(hessian).all() else 0
+
+    def _bifurcation_test(self, x, tangent):
+        return np.linalg.det(np.vstack([self.system.jacobian(x), tangent]))
+
+    def _locate(self, x, tangent, ds, test, test_next, function, iterations=12):
+        """Secant search along the step from `x` for the zero of `function`.
+
+        Returns the point with the tangent of the step, which unlike the null space of the
+        Jacobian still tells the traced branch apart at a branch point.
+        """
+        low, high = 0.0, ds
+        found = None
+        for _ in range(iterations):
+            s = low - test * (high - low) / (test_next - test)
+            step = self._step(x, tangent, s)
+            if step is None:
+                return found
+            point = step[0]
+            point_tangent = self._tangent(point, tangent)
+            value = function(point, point_tangent)
+            found = (point, tangent)
+            if np.sign(value) == np.sign(test):
+                low, test = s, value
+            else:
+                high, test_next = s, value
+            if high - low <= self.tol * (1.0 + abs(ds)) or value == 0:
+                break
+        return found
+
+    def _switching_direction(self, x, tangent):
+        """Direction of the second branch through the branch point `x`: the null vector orthogonal to `tangent`."""
+        null_space = np.linalg.svd(self.system.jacobian(x))[2][-2:]
+        candidates = null_space - np.outer(null_space @ tangent, tangent)
+        direction = candidates[np.argmax(np.linalg.norm(candidates, axis=1))]
+        norm = np.linalg.norm(direction)
+        return direction / norm if norm > 1e-12 else None
+
+
+def _solve(matrix, right):
+    """Solution of the linear system, in the least-squares sense where it is singular (e.g. at a branch point)."""
+    try:
+        return np.linalg.solve(matrix, right)
+    except np.linalg.LinAlgError:
+        return np.linalg.lstsq(matrix, right, rcond=None)[0]
+
+
+def _fraction(start, stop, P_max):
+    """Fraction of the step from load `start` to load `stop` at which it leaves [0, P_max]."""
+    bound = P_max if stop > P_max else 0.0
+    return (bound - start) / (stop - start)
+
+
+def _branch(points, types):
+    branch = {
+        "PT": np.arange(1, len(points) + 1),
+        "TY": np.asarray(types, dtype=np.int64),
+        "PAR(1)": points[:, -1],
+    }
+    branch.update({f"U({i + 1})": points[:, i] for i in range(points.shape[1] - 1)})
+    return branch
+
+
+def solve_continuation(compiled, constants, P_max, **options):
+    """Branches of a CompiledEnergy from the NumPy continuation, shaped like the AUTO solution."""
+    with span("solve.numpy") as attributes:
+        branches = Continuation(EquilibriumSystem(compiled, constants), P_max, **options).branches()
+        attributes["branches"] = len(branches)
+    if not branches:
+        raise RuntimeError("The continuation found no equilibrium path starting from the unloaded state")
+    return branches
@@ -0,0 +1,212 @@
+"""Plots kept as a small in-memory spec, rendered to PNG at the requested size or drawn as vectors into a PDF."""
+import hashlib
+import io
+import json
+
+import numpy as np
+from matplotlib.colors import to_hex
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
+
+from .branches import LOAD_COLUMN
+from .metrics import count, span
+from .stability import STABILITY_COLUMN, split_by_stability
+
+ASPECT = 0.75  # height / width, as Matplotlib's default 6.4 x 4.8 figure
+
+
+class FigureSpec:
+    """Lines and marker points of a 2D plot with their labels.
+
+    `to_png` renders a bitmap of the width the page shows, `draw` emits vector
+    drawing operations on a reportlab canvas. Both derive from the same data.
+    """
+
+    def __init__(self, title="", xlabel="", ylabel=""):
+        self.title = title
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.lines = []
+        self.points = []
+        self._png = {}
+
+    def add_line(self, x, y, color=None, linestyle="-", label=None):
+        color = to_hex(color or f"C{len({line['color'] for line in self.lines}) % 10}")
+        self.lines.append({
+            "x": np.asarray(x, dtype=float), "y": np.asarray(y, dtype=float),
+            "color": color, "linestyle": linestyle, "label": label,
+        })
+        self._png.clear()
+        return color
+
+    def add_points(self, x, y, color="red", label=None):
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.broadcast_to(np.asarray(y, dtype=float), x.shape)
+        self.points.append({"x": x, "y": np.array(y), "color": to_hex(color), "label": label})
+        self._png.clear()
+
+    def digest(self):
+        """Content hash of the figure, e.g. for caching documents that embed it."""
+        h = hashlib.sha256(json.dumps([self.title, self.xlabel, self.ylabel]).encode("utf-8"))
+        for item in self.lines + self.points:
+            h.update(json.dumps([item["color"], item.get("linestyle"), item["label"]]).encode("utf-8"))
+            h.update(item["x"].tobytes())
+            h.update(item["y"].tobytes())
+        return h.hexdigest()
+
+    def limits(self):
+        """Axis ranges with 5% padding, like Matplotlib's autoscaling."""
+        ranges = []
+        for axis in ("x", "y"):
+            values = [item[axis][np.isfinite(item[axis])] for item in self.lines + self.points]
+            values = np.concatenate(values) if values else np.empty(0)
+            low, high = (values.min(), values.max()) if values.size else (0.0, 1.0)
+            if high == low:
+                low, high = low - 0.5, high + 0.5
+            pad = 0.05 * (high - low)
+            ranges.append((low - pad, high + pad))
+        return ranges
+
+    def labels(self):
+        """(label, color, linestyle or None for markers) of the legend entries."""
+        entries = [(line["label"], line["color"], line["linestyle"]) for line in self.lines if line["label"]]
+        return entries + [(points["label"], points["color"], None) for points in self.points if points["label"]]
+
+    def to_matplotlib(self, figsize=None, dpi=100):
+        # A pyplot-free Figure, nothing has to be closed and renders do not share global state
+        fig = Figure(figsize=figsize, dpi=dpi)
+        ax = fig.subplots()
+        for line in self.lines:
+            ax.plot(line["x"], line["y"], color=line["color"], linestyle=line["linestyle"], label=line["label"])
+        for points in self.points:
+            ax.scatter(points["x"], points["y"], color=points["color"], label=points["label"], zorder=5)
+        ax.set_xlabel(self.xlabel)
+        ax.set_ylabel(self.ylabel)
+        ax.set_title(self.title)
+        if self.labels():
+            ax.legend()
+        return fig
+
+    def to_png(self, width, dpi=100):
+        """PNG bytes `width` pixels wide, rendered once per width."""
+        if width in self._png:
+            count("cache.plot.hit")
+            return self._png[width]
+        count("cache.plot.miss")
+        with span("plot.render", width=width):
+            fig = self.to_matplotlib(figsize=(width / dpi, width * ASPECT / dpi), dpi=dpi)
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format="png")
+            self._png[width] = buffer.getvalue()
+        return self._png[width]
+
+    def draw(self, c, x, y, width, height, font="Helvetica"):
+        """Draws the figure as vector graphics into the box with lower left corner (x, y) of canvas `c`."""
+        left, bottom, right, top = 48, 34, 10, 22
+        x0, y0 = x + left, y + bottom
+        plot_width, plot_height = width - left - right, height - bottom - top
+        (xmin, xmax), (ymin, ymax) = self.limits()
+
+        def to_page(xs, ys):
+            return x0 + (xs - xmin) / (xmax - xmin) * plot_width, y0 + (ys - ymin) / (ymax - ymin) * plot_height
+
+        c.saveState()
+        c.setLineWidth(0.6)
+        c.setFont(font, 7)
+        for tick in MaxNLocator(nbins=6).tick_values(xmin, xmax):
+            if xmin <= tick <= xmax:
+                px, _ = to_page(tick, ymin)
+                c.line(px, y0, px, y0 - 3)
+                c.drawCentredString(px, y0 - 11, f"{tick:g}")
+        for tick in MaxNLocator(nbins=6).tick_values(ymin, ymax):
+            if ymin <= tick <= ymax:
+                _, py = to_page(xmin, tick)
+                c.line(x0, py, x0 - 3, py)
+                c.drawRightString(x0 - 5, py - 2.5, f"{tick:g}")
+        c.setFont(font, 9)
+        c.drawCentredString(x0 + plot_width / 2, y, self.xlabel)
+        c.drawCentredString(x0 + plot_width / 2, y0 + plot_height + 8, self.title)
+        c.translate(x + 8, y0 + plot_height / 2)
+        c.rotate(90)
+        c.drawCentredString(0, 0, self.ylabel)
+        c.restoreState()
+
+        c.saveState()
+        clip = c.beginPath()
+        clip.rect(x0, y0, plot_width, plot_height)
+        c.clipPath(clip, stroke=0, fill=0)
+        c.setLineWidth(1)
+        for line in self.lines:
+            c.setStrokeColor(line["color"])
+            c.setDash([4, 2] if line["linestyle"] == "--" else [])
+            px, py = to_page(line["x"], line["y"])
+            finite = np.isfinite(px) & np.isfinite(py)
+            # NaN breaks the line, as in Matplotlib
+            starts = np.flatnonzero(finite & ~np.concatenate([[False], finite[:-1]]))
+            stops = np.flatnonzero(finite & ~np.concatenate([finite[1:], [False]])) + 1
+            for start, stop in zip(starts, stops):
+                path = c.beginPath()
+                path.moveTo(px[start], py[start])
+                for point_x, point_y in zip(px[start + 1:stop], py[start + 1:stop]):
+                    path.lineTo(point_x, point_y)
+                c.drawPath(path, stroke=1, fill=0)
+        c.setDash([])
+        for points in self.points:
+            c.setFillColor(points["color"])
+            px, py = to_page(points["x"], points["y"])
+            for point_x, point_y in zip(px, py):
+                c.circle(point_x, point_y, 2.5, stroke=0, fill=1)
+        c.restoreState()
+
+        c.saveState()
+        c.setLineWidth(0.6)
+        c.rect(x0, y0, plot_width, plot_height)
+        c.setFont(font, 7)
+        entries = self.labels()
+        text_x = x0 + plot_width - 6 - max((c.stringWidth(label, font, 7) for label, _, _ in entries), default=0)
+        entry_y = y0 + plot_height - 10
+        for label, color, linestyle in entries:
+            c.setStrokeColor(color)
+            c.setFillColor(color)
+            if linestyle is None:
+                c.circle(text_x - 14, entry_y + 2.5, 2.5, stroke=0, fill=1)
+            else:
+                c.setDash([4, 2] if linestyle == "--" else [])
+                c.line(text_x - 24, entry_y + 2.5, text_x - 4, entry_y + 2.5)
+            c.setFillColor("#000000")
+            c.drawString(text_x, entry_y, label)
+            entry_y -= 10
+        c.restoreState()
+
+
+def bifurcation_figure(store, xlabel, ylabel, title="Bifurcation Plot", dof="U(1)"):
+    """Figure of all branches of `store`; stable parts solid, unstable parts dashed in the same color."""
+    spec = FigureSpec(title=title, xlabel=xlabel, ylabel=ylabel)
+    for branch in store:
+        if STABILITY_COLUMN in branch:
+            stable_load, unstable_load = split_by_stability(branch[LOAD_COLUMN], branch[STABILITY_COLUMN])
+            color = spec.add_line(branch[dof], stable_load)
+            spec.add_line(branch[dof], unstable_load, color=color, linestyle="--")
+        else:
+            spec.add_line(branch[dof], branch[LOAD_COLUMN])
+    if any(STABILITY_COLUMN in branch for branch in store):
+        spec.add_line([], [], color="gray", label="Stable")
+        spec.add_line([], [], color="gray", linestyle="--", label="Unstable")
+    return spec
+
+
+def deformation_figure(initial, deformed, title):
+    """Initial and deformed configuration of a kit model, each given as node coordinates (xs, ys)."""
+    fig = Figure(figsize=(5, 4))
+    ax = fig.subplots()
+    ax.plot(*initial, 'o-', label='Initial Configuration', color='blue')
+    ax.plot(*deformed, 'o--', label='Deformed Configuration', color='red')
+    ax.set_title(title)
+    ax.set_xlabel("X (cm)")
+    ax.set_ylabel("Y (cm)")
+    ax.axhline(0, color='black', linewidth=0.5, linestyle='--')
+    ax.axvline(0, color='black', linewidth=0.5, linestyle='--')
+    ax.legend()
+    ax.grid(True)
+    ax.axis('equal')
+    return fig
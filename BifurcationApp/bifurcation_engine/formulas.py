@@ -0,0 +1,298 @@
+"""Parsing of user formulas into sympy expressions without ``eval``, plus memoized compiled energies."""
+import ast
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+
+import pyfurc as pf
+import sympy as sp
+
+from .metrics import count, span
+
+# Functions allowed in formulas, either bare (`sqrt(q)`) or with a module prefix (`sp.sqrt(q)`)
+FUNCTIONS = {
+    "sqrt": sp.sqrt, "sin": sp.sin, "cos": sp.cos, "tan": sp.tan,
+    "asin": sp.asin, "acos": sp.acos, "atan": sp.atan,
+    "sinh": sp.sinh, "cosh": sp.cosh, "tanh": sp.tanh,
+    "exp": sp.exp, "log": sp.log, "Abs": sp.Abs, "abs": sp.Abs,
+}
+NAMED_CONSTANTS = {"pi": sp.pi, "E": sp.E}
+MODULE_PREFIXES = {"sp", "sympy", "np", "numpy", "math"}
+LOAD_NAME = "P"
+# Largest magnitude of a number literal; bigger integers are only good for exhausting the server
+MAX_LITERAL = 10 ** 15
+
+_BINARY_OPERATORS = {
+    ast.Add: lambda a, b: a + b,
+    ast.Sub: lambda a, b: a - b,
+    ast.Mult: lambda a, b: a * b,
+    ast.Div: lambda a, b: _divide(a, b),
+    ast.Pow: lambda a, b: _power(a, b),
+}
+_UNARY_OPERATORS = {ast.USub: lambda a: -a, ast.UAdd: lambda a: a}
+
+
+def _divide(a, b):
+    # Plain numbers divide like Python does (1/2 == 0.5), so no integer Rationals reach the Fortran source
+    if isinstance(a, sp.Number) and isinstance(b, sp.Number) and b != 0:
+        return sp.Float(float(a) / float(b))
+    return a / b
+
+
+def _power(a, b):
+    # Powers of plain numbers are evaluated as floats: exact sympy Integers such as 9**9**9 would
+    # take the server thread forever to compute
+    if isinstance(a, sp.Number) and isinstance(b, sp.Number):
+        try:
+            value = float(a) ** float(b)
+        except (OverflowError, ZeroDivisionError):
+            raise FormulaError(f"The power ({a})**({b}) in the formula is not a finite number") from None
+        if not isinstance(value, float) or not math.isfinite(value):
+            raise FormulaError(f"The power ({a})**({b}) in the formula is not a finite real number")
+        return sp.Float(value)
+    return a ** b
+
+
+class FormulaError(ValueError):
+    """Raised for formulas or constants that are not valid input."""
+
+
+def parse_formula(text, symbols):
+    """Parses `text` into a sympy expression; `symbols` maps the allowed names to sympy symbols."""
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise FormulaError(f"Invalid formula syntax: {e.msg}") from None
+    except ValueError as e:  # e.g. null bytes
+        raise FormulaError(f"Invalid formula: {e}") from None
+    return sp.sympify(_convert(tree.body, symbols))
+
+
+def _convert(node, symbols):
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        if not abs(node.value) <= MAX_LITERAL:
+            raise FormulaError(f"Numbers in formulas must not be larger than {MAX_LITERAL:.0e}")
+        return sp.Integer(node.value) if isinstance(node.value, int) else sp.Float(node.value)
+    if isinstance(node, ast.Name):
+        if node.id in symbols:
+            return symbols[node.id]
+        if node.id in NAMED_CONSTANTS:
+            return NAMED_CONSTANTS[node.id]
+        allowed = ", ".join(sorted(symbols))
+        raise FormulaError(f"Unknown name '{node.id}' in formula. Allowed names: {allowed}")
+    if isinstance(node, ast.Attribute) and _is_module(node.value) and node.attr in NAMED_CONSTANTS:
+        return NAMED_CONSTANTS[node.attr]
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        return _BINARY_OPERATORS[type(node.op)](_convert(node.left, symbols), _convert(node.right, symbols))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        return _UNARY_OPERATORS[type(node.op)](_convert(node.operand, symbols))
+    if isinstance(node, ast.Call) and not node.keywords:
+        name = _function_name(node.func)
+        if name in FUNCTIONS:
+            return FUNCTIONS[name](*(_convert(arg, symbols) for arg in node.args))
+        raise FormulaError(f"Unsupported function in formula. Allowed functions: {', '.join(sorted(FUNCTIONS))}")
+    raise FormulaError(f"Unsupported expression in formula: {ast.unparse(node)}")
+
+
+def _is_module(node):
+    return isinstance(node, ast.Name) and node.id in MODULE_PREFIXES
+
+
+def _function_name(node):
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute) and _is_module(node.value):
+        return node.attr
+    return None
+
+
+def parse_constants(text):
+    """Parses a constants dict such as ``{'l': 1, 'k': 1}`` into {name: float}."""
+    try:
+        constants = ast.literal_eval(text.strip())
+    except (SyntaxError, ValueError):
+        raise FormulaError("Constants must be written as {'name': value, ...}") from None
+    if not isinstance(constants, dict):
+        raise FormulaError("Constants must be written as {'name': value, ...}")
+    parsed = {}
+    for name, value in constants.items():
+        if not isinstance(name, str) or not name.isidentifier():
+            raise FormulaError(f"Invalid constant name {name!r}")
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise FormulaError(f"The value of constant '{name}' must be a number")
+        parsed[name] = float(value)
+    return parsed
+
+
+class CompiledEnergy:
+    """An energy expression with its gradient, Hessian and lambdified NumPy callables.
+
+    The callables take ``(dof values..., P, constant values...)`` and broadcast over arrays.
+    Derivatives follow the sparsity of the energy: each additive term is only differentiated
+    by the DOFs it contains, and each gradient component by the DOFs it contains, so a chain
+    of links coupled to its neighbours costs O(n) derivatives instead of n^2.
+    `gradient_function` returns all gradient components, `hessian_function` the
+    upper-triangle entries of `hessian_pattern` and `load_gradient_function` the
+    derivatives of the gradient by the load, each as a list from one call.
+    """
+
+    def __init__(self, energy, dofs, load, constant_names):
+        self.energy = energy
+        self.dofs = dofs
+        self.load = load
+        self.constant_names = list(constant_names)
+        self.constants = [sp.Symbol(name) for name in self.constant_names]
+        gradient = {dof: [] for dof in dofs}
+        for term in _additive_terms(energy, set(dofs)):
+            for dof in term.free_symbols & gradient.keys():
+                gradient[dof].append(sp.diff(term, dof))
+        self.gradient = [sp.Add(*gradient[dof]) for dof in dofs]
+        self.hessian_entries = {}
+        for i, g in enumerate(self.gradient):
+            coupled = g.free_symbols
+            for j in range(i, len(dofs)):
+                if dofs[j] in coupled:
+                    h = sp.diff(g, dofs[j])
+                    if h != 0:
+                        self.hessian_entries[(i, j)] = h
+        self.hessian_pattern = list(self.hessian_entries)
+        self.load_gradient = [sp.diff(g, load) for g in self.gradient]
+        arguments = [*dofs, load, *self.constants]
+        self.energy_function = sp.lambdify(arguments, energy, "numpy")
+        self.gradient_function = sp.lambdify(arguments, self.gradient, "numpy")
+        self.hessian_function = sp.lambdify(arguments, list(self.hessian_entries.values()), "numpy")
+        self.load_gradient_function = sp.lambdify(arguments, self.load_gradient, "numpy")
+
+    @property
+    def hessian(self):
+        """The symbolic Hessian as a sympy SparseMatrix."""
+        entries = dict(self.hessian_entries)
+        entries.update({(j, i): h for (i, j), h in self.hessian_entries.items()})
+        return sp.SparseMatrix(len(self.dofs), len(self.dofs), entries)
+
+    @property
+    def expression_hash(self):
+        return expression_hash(self.energy)
+
+    def constant_values(self, constants):
+        return [float(constants[name]) for name in self.constant_names]
+
+
+def _additive_terms(expression, dofs):
+    """Splits `expression` into summands, also through factors without DOFs, e.g. ``k/2*(a + b)``."""
+    if expression.is_Add:
+        return [term for arg in expression.args for term in _additive_terms(arg, dofs)]
+    if expression.is_Mul:
+        factors = [arg for arg in expression.args if arg.free_symbols & dofs]
+        if len(factors) == 1 and factors[0].is_Add:
+            coefficient = expression / factors[0]
+            return [coefficient * term for term in _additive_terms(factors[0], dofs)]
+    return [expression]
+
+
+def expression_hash(expression):
+    return hashlib.sha256(sp.srepr(expression).encode("utf-8")).hexdigest()
+
+
+class FormulaCompiler:
+    """Parses each formula once and compiles each distinct energy expression once (LRU bounded)."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._expressions = OrderedDict()
+        self._compiled = OrderedDict()
+        self._lock = threading.Lock()
+
+    def expression(self, formula, parameter, constant_names):
+        dofs = dof_names(parameter)
+        key = (formula.strip(), dofs, tuple(sorted(constant_names)))
+        with self._lock:
+            if key in self._expressions:
+                self._expressions.move_to_end(key)
+                count("cache.formula.hit")
+                return self._expressions[key]
+        count("cache.formula.miss")
+        with span("formula.parse"):
+            expression = parse_formula(formula, energy_symbols(parameter, constant_names))
+            contained = {atom.name for atom in expression.atoms(pf.Dof)}
+            for name in dofs:
+                if name not in contained:
+                    raise FormulaError(f"The formula does not contain the degree of freedom '{name}'")
+            if pf.Load(LOAD_NAME) not in expression.free_symbols:
+                raise FormulaError(f"The formula must contain the load {LOAD_NAME}")
+        with self._lock:
+            self._remember(self._expressions, key, expression)
+        return expression
+
+    def compile(self, formula, parameter, constant_names):
+        energy = self.expression(formula, parameter, constant_names)
+        dofs = dof_names(parameter)
+        key = (expression_hash(energy), dofs, tuple(sorted(constant_names)))
+        with self._lock:
+            if key in self._compiled:
+                self._compiled.move_to_end(key)
+                count("cache.compiled.hit")
+                return self._compiled[key]
+        count("cache.compiled.miss")
+        with span("formula.compile", dofs=len(dofs)):
+            compiled = CompiledEnergy(energy, [pf.Dof(name) for name in dofs], pf.Load(LOAD_NAME), key[2])
+        with self._lock:
+            self._remember(self._compiled, key, compiled)
+        return compiled
+
+    def _remember(self, entries, key, value):
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+
+def dof_names(parameter):
+    """The DOF names of `parameter`, a name, a comma-separated list of names or a sequence of names.
+
+    Their order is the order of the solution columns U(1), U(2), ...
+    """
+    names = parameter.split(",") if isinstance(parameter, str) else list(parameter)
+    names = tuple(str(name).strip() for name in names)
+    for name in names:
+        if not name.isidentifier():
+            raise FormulaError(f"Invalid parameter name {name!r}")
+    if not names or len(set(names)) != len(names):
+        raise FormulaError(f"Invalid degrees of freedom {parameter!r}, expected distinct names such as 'q1, q2'")
+    return names
+
+
+def energy_symbols(parameter, constant_names):
+    """Names usable in an energy formula: the load P, the DOFs and the constants.
+
+    A single DOF can also be written as `q` or `theta`.
+    """
+    dofs = dof_names(parameter)
+    reserved = {*dofs, LOAD_NAME, *(("q", "theta") if len(dofs) == 1 else ())}
+    for name in constant_names:
+        if name in reserved:
+            raise FormulaError(f"Constants should not contain '{name}'. Please remove it.")
+    symbols = {name: sp.Symbol(name) for name in constant_names}
+    if len(dofs) == 1:
+        symbols.update({"q": pf.Dof(dofs[0]), "theta": pf.Dof(dofs[0])})
+    symbols.update({name: pf.Dof(name) for name in dofs})
+    symbols[LOAD_NAME] = pf.Load(LOAD_NAME)
+    return symbols
+
+
+# One compiler per process
+FORMULA_COMPILER = FormulaCompiler()
+
+
+def compile_energy(formula, parameter, constant_names):
+    return FORMULA_COMPILER.compile(formula, parameter, constant_names)
+
+
+def build_energy_expression(energy_formula, parameter, constants):
+    """Builds the sympy energy with the constants kept as symbols.
+
+    `parameter` names the degrees of freedom (see `dof_names`); with a single one, `q` and
+    `theta` both refer to it.
+    """
+    return FORMULA_COMPILER.expression(energy_formula, parameter, list(constants))
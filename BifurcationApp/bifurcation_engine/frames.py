@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from .stability import STABILITY_COLUMN
+
+# AUTO-07p point type codes (column TY of fort.7)
+POINT_TYPES = {1: "BP", 2: "LP", 3: "HB", 4: "RG", -4: "UZ", 5: "LP", 6: "BP", 7: "PD", 8: "TR", 9: "EP", -9: "MX"}
+_TYPE_CATEGORIES = ["", *sorted(set(POINT_TYPES.values()))]
+_TYPE_CODES = np.zeros(19, dtype=np.int8)  # indexed by TY + 9
+for _code, _name in POINT_TYPES.items():
+    _TYPE_CODES[_code + 9] = _TYPE_CATEGORIES.index(_name)
+
+
+class ResultFrame:
+    """Columnar result table of a solution, built from the BranchStore arrays without copying them.
+
+    Columns are the branch id, the AUTO point number and point type, the load, the
+    degrees of freedom (renamed through `dof_labels`) and the stability of each
+    point (taken from the store's stability column unless given, missing until it
+    has been classified).
+    """
+
+    def __init__(self, store, dof_labels=None, stability=None, load_label="Load (P)"):
+        self.store = store
+        dof_labels = dof_labels or {}
+        n = store.n_points
+        columns = {"Branch": store.branch_ids + 1}
+        if "PT" in store.columns:
+            columns["Point"] = store.columns["PT"]
+        if "TY" in store.columns:
+            ty = np.clip(store.columns["TY"].astype(np.int64), -9, 9)
+            columns["Type"] = pd.Categorical.from_codes(_TYPE_CODES[ty + 9], _TYPE_CATEGORIES)
+        columns[load_label] = store.columns["PAR(1)"]
+        dof_columns = sorted((name for name in store.columns if name.startswith("U(")), key=lambda name: int(name[2:-1]))
+        for name in dof_columns:
+            columns[dof_labels.get(name, name)] = store.columns[name]
+        if stability is None and STABILITY_COLUMN in store.columns:
+            stability = store.columns[STABILITY_COLUMN]
+        if stability is None:
+            columns["Stable"] = pd.arrays.BooleanArray(np.zeros(n, dtype=bool), np.ones(n, dtype=bool))
+        else:
+            columns["Stable"] = pd.array(np.asarray(stability, dtype=bool), dtype="boolean")
+        self.columns = columns
+        self._frame = None
+
+    def __len__(self):
+        return self.store.n_points
+
+    def to_pandas(self):
+        if self._frame is None:
+            self._frame = pd.DataFrame(self.columns, copy=False)
+        return self._frame
+
+    def to_arrow(self):
+        """Returns a pyarrow Table (requires the optional pyarrow package)."""
+        import pyarrow as pa
+
+        return pa.Table.from_pandas(self.to_pandas(), preserve_index=False)
+
+    def n_pages(self, page_size):
+        return max(1, -(-len(self) // page_size))
+
+    def page(self, number, page_size):
+        """Rows of the zero-based page `number`."""
+        start = number * page_size
+        return self.to_pandas().iloc[start:start + page_size]
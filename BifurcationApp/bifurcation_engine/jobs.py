@@ -0,0 +1,156 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+
+from .metrics import METRICS, collect
+
+# Set inside the worker processes, see _init_worker and report_progress
+_progress_queue = None
+_current_job_id = None
+
+
+def report_progress(stage, fraction):
+    """Reports the progress of the job running in this worker process (no-op elsewhere)."""
+    if _progress_queue is not None and _current_job_id is not None:
+        _progress_queue.put((_current_job_id, stage, float(fraction)))
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _run_job(job_id, fn, args, kwargs):
+    global _current_job_id
+    _current_job_id = job_id
+    try:
+        # The spans and counts of the job travel back with its result
+        with collect() as collected:
+            result = fn(*args, **kwargs)
+        return result, collected
+    finally:
+        _current_job_id = None
+
+
+class Job:
+    def __init__(self, job_id, owner, key, future):
+        self.job_id = job_id
+        self.owner = owner
+        self.key = key
+        self.future = future
+        self.submitted = time.time()
+        self.stage = "queued"
+        self.fraction = 0.0
+        self.superseded = False
+
+
+class JobScheduler:
+    """Runs solver jobs in a process pool with bounded concurrency.
+
+    Every job belongs to an `owner` (e.g. one result slot of one session). Submitting
+    a job with a new input `key` for the same owner supersedes the previous job:
+    it is cancelled if it has not started yet, otherwise its result is discarded.
+    """
+
+    def __init__(self, max_workers=None):
+        context = multiprocessing.get_context("spawn")
+        self._progress_queue = context.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers or min(4, os.cpu_count() or 1),
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._progress_queue,),
+        )
+        self._jobs = {}
+        self._by_owner = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+    def submit(self, owner, key, fn, *args, **kwargs):
+        """Submits `fn(*args, **kwargs)` and returns its job id.
+
+        If the owner's current job already has the same `key`, its id is returned instead.
+        """
+        with self._lock:
+            current = self._jobs.get(self._by_owner.get(owner))
+            if current is not None and current.key == key and not current.future.cancelled():
+                return current.job_id
+            if current is not None:
+                self._supersede(current)
+            job_id = f"job-{next(self._ids)}"
+            future = self._executor.submit(_run_job, job_id, fn, args, kwargs)
+            self._jobs[job_id] = Job(job_id, owner, key, future)
+            self._by_owner[owner] = job_id
+            return job_id
+
+    def status(self, job_id):
+        """One of "queued", "running", "done", "failed", "cancelled" or "unknown"."""
+        self._drain_progress()
+        job = self._jobs.get(job_id)
+        if job is None:
+            return "unknown"
+        if job.superseded or job.future.cancelled():
+            return "cancelled"
+        if job.future.done():
+            return "failed" if job.future.exception() is not None else "done"
+        return "running" if job.future.running() else "queued"
+
+    def progress(self, job_id):
+        """Returns (stage, fraction, elapsed seconds) of a job."""
+        self._drain_progress()
+        job = self._jobs.get(job_id)
+        if job is None:
+            return "unknown", 0.0, 0.0
+        if job.future.done() and not job.future.cancelled():
+            return "done", 1.0, time.time() - job.submitted
+        return job.stage, job.fraction, time.time() - job.submitted
+
+    def result(self, job_id):
+        """Returns the job's result, re-raising its exception if it failed.
+
+        The spans and counts recorded by the job are merged into this process's metrics.
+        """
+        job = self._jobs[job_id]
+        if job.superseded:
+            raise CancelledError(f"{job_id} was superseded by a newer job")
+        result, collected = job.future.result()
+        METRICS.merge(collected["spans"], collected["counters"])
+        return result
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._supersede(job)
+
+    def forget(self, job_id):
+        """Drops a finished job from the bookkeeping."""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is not None and self._by_owner.get(job.owner) == job_id:
+                del self._by_owner[job.owner]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _supersede(self, job):
+        job.superseded = True
+        job.future.cancel()
+        # Keep the job until it finishes so its worker slot is accounted for
+        job.future.add_done_callback(lambda _: self.forget(job.job_id))
+        if self._by_owner.get(job.owner) == job.job_id:
+            del self._by_owner[job.owner]
+
+    def _drain_progress(self):
+        while True:
+            try:
+                job_id, stage, fraction = self._progress_queue.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                return
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.stage, job.fraction = stage, fraction
@@ -0,0 +1,76 @@
+"""Text layout for the PDF reports: cached glyph widths and linear greedy word wrapping."""
+from functools import lru_cache
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+
+class GlyphWidths(dict):
+    """Width of each character in one font and size, measured on first use."""
+
+    def __init__(self, font, size):
+        super().__init__()
+        self.font = font
+        self.size = size
+
+    def __missing__(self, char):
+        width = self[char] = stringWidth(char, self.font, self.size)
+        return width
+
+    def text_width(self, text):
+        return sum(self[char] for char in text)
+
+
+@lru_cache(maxsize=None)
+def glyph_widths(font, size):
+    return GlyphWidths(font, size)
+
+
+def break_word(word, width, widths):
+    """Splits a word wider than `width` into pieces that fit, character by character."""
+    pieces = []
+    start = 0
+    used = 0.0
+    for index, char in enumerate(word):
+        if used + widths[char] > width and index > start:
+            pieces.append(word[start:index])
+            start = index
+            used = 0.0
+        used += widths[char]
+    pieces.append(word[start:])
+    return pieces
+
+
+@lru_cache(maxsize=256)
+def wrap_text(text, font, size, width):
+    """Lines of `text` that fit into `width` points.
+
+    Words are placed greedily, each character is measured once, and words wider than
+    a whole line are broken between characters. Empty input lines are kept.
+    """
+    widths = glyph_widths(font, size)
+    space = widths[" "]
+    lines = []
+    for paragraph in text.split("\n"):
+        words = paragraph.split()
+        if not words:
+            lines.append("")
+            continue
+        line, used = [], 0.0
+        for word in words:
+            word_width = widths.text_width(word)
+            if word_width > width:
+                pieces = break_word(word, width, widths)
+                word = pieces.pop()
+                word_width = widths.text_width(word)
+                for piece in pieces:
+                    if line:
+                        lines.append(" ".join(line))
+                    line, used = [], 0.0
+                    lines.append(piece)
+            if line and used + space + word_width > width:
+                lines.append(" ".join(line))
+                line, used = [], 0.0
+            used += word_width + (space if line else 0.0)
+            line.append(word)
+        lines.append(" ".join(line))
+    return tuple(lines)
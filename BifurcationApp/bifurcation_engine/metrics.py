@@ -0,0 +1,153 @@
+"""Timing spans and cache counters of the hot path, kept in memory and exportable as JSON or Prometheus text.
+
+Stages are timed with ``with span("solver.run"):`` and caches count their hits and
+misses with ``count("cache.solution.hit")``. Every span belongs to the trace that is
+current in its thread (e.g. one rerun of a session, see `begin_trace`) and to the
+enclosing span, so the stages of a slow rerun can be looked at one by one. Spans
+and counts of a solver worker process are gathered with `collect` and merged into the
+app process with the job result.
+
+Set BIFURCATION_TRACE_FILE to also append every span as a JSON line to that file.
+"""
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+_current_trace = contextvars.ContextVar("bifurcation_trace", default=None)
+_current_span = contextvars.ContextVar("bifurcation_span", default=None)
+_collector = contextvars.ContextVar("bifurcation_collector", default=None)
+
+
+class Metrics:
+    """The recent spans of this process, duration statistics per span name and counters."""
+
+    def __init__(self, max_spans=2000, trace_file=None):
+        self.trace_file = trace_file
+        self._spans = deque(maxlen=max_spans)
+        self._stages = {}  # name -> [count, total ms, max ms]
+        self._counters = Counter()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def begin_trace(self, trace_id=None):
+        """Makes `trace_id` (a new id by default) the trace of the spans of this thread and returns it."""
+        trace_id = trace_id or self._new_id()
+        _current_trace.set(trace_id)
+        _current_span.set(None)
+        return trace_id
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Times the enclosed block; the yielded dict of attributes can still be extended inside it."""
+        span_id = self._new_id()
+        parent = _current_span.get()
+        token = _current_span.set(span_id)
+        started = time.time()
+        start = time.perf_counter()
+        try:
+            yield attributes
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            _current_span.reset(token)
+            self.record({
+                "name": name, "trace_id": _current_trace.get(), "span_id": span_id, "parent_id": parent,
+                "start": started, "duration_ms": duration, "attributes": attributes,
+            })
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+        collected = _collector.get()
+        if collected is not None:
+            collected["counters"][name] += n
+
+    def record(self, span, export=True):
+        with self._lock:
+            self._spans.append(span)
+            stage = self._stages.setdefault(span["name"], [0, 0.0, 0.0])
+            stage[0] += 1
+            stage[1] += span["duration_ms"]
+            stage[2] = max(stage[2], span["duration_ms"])
+            if export and self.trace_file:
+                with open(self.trace_file, "a") as f:
+                    f.write(json.dumps(span, default=str) + "\n")
+        collected = _collector.get()
+        if collected is not None:
+            collected["spans"].append(span)
+
+    def merge(self, spans, counters=None):
+        """Adds spans and counters recorded elsewhere (e.g. in a worker process) to the current trace and span."""
+        trace_id, parent = _current_trace.get(), _current_span.get()
+        for span in spans:
+            self.record(dict(span, trace_id=trace_id, parent_id=span["parent_id"] or parent), export=False)
+        for name, n in (counters or {}).items():
+            self.count(name, n)
+
+    def spans(self, trace_id=None):
+        """The recent spans in the order they finished, only those of `trace_id` if given."""
+        with self._lock:
+            spans = list(self._spans)
+        return [span for span in spans if trace_id is None or span["trace_id"] == trace_id]
+
+    def stages(self):
+        """{span name: {"count", "total_ms", "mean_ms", "max_ms"}} since the process started."""
+        with self._lock:
+            return {
+                name: {"count": n, "total_ms": total, "mean_ms": total / n, "max_ms": longest}
+                for name, (n, total, longest) in sorted(self._stages.items())
+            }
+
+    def counters(self):
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def to_json(self, trace_id=None):
+        """Spans (of `trace_id` if given), stage statistics and counters as a JSON document."""
+        return json.dumps(
+            {"spans": self.spans(trace_id), "stages": self.stages(), "counters": self.counters()}, default=str, indent=2
+        )
+
+    def to_prometheus(self):
+        """Stage statistics and counters in the Prometheus text exposition format."""
+        lines = ["# TYPE bifurcation_stage_seconds summary"]
+        for name, stage in self.stages().items():
+            lines.append(f'bifurcation_stage_seconds_count{{stage="{name}"}} {stage["count"]}')
+            lines.append(f'bifurcation_stage_seconds_sum{{stage="{name}"}} {stage["total_ms"] / 1000:.6f}')
+        lines.append("# TYPE bifurcation_stage_max_seconds gauge")
+        for name, stage in self.stages().items():
+            lines.append(f'bifurcation_stage_max_seconds{{stage="{name}"}} {stage["max_ms"] / 1000:.6f}')
+        lines.append("# TYPE bifurcation_events_total counter")
+        for name, n in self.counters().items():
+            lines.append(f'bifurcation_events_total{{event="{name}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def _new_id(self):
+        return f"{os.getpid():x}-{next(self._ids):x}"
+
+
+# One registry per process
+METRICS = Metrics(trace_file=os.environ.get("BIFURCATION_TRACE_FILE"))
+
+
+def span(name, **attributes):
+    return METRICS.span(name, **attributes)
+
+
+def count(name, n=1):
+    METRICS.count(name, n)
+
+
+@contextmanager
+def collect():
+    """Gathers the spans and counts recorded in the enclosed block into the yielded {"spans", "counters"} dict."""
+    collected = {"spans": [], "counters": Counter()}
+    token = _collector.set(collected)
+    try:
+        yield collected
+    finally:
+        _collector.reset(token)
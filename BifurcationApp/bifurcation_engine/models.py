@@ -0,0 +1,145 @@
+import itertools
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import pyfurc as pf
+import sympy as sp
+
+from .metrics import count, span
+
+PROBLEM_NAME = "model"
+
+
+class EnergyModel:
+    """Generated AUTO code for one energy template.
+
+    The constants of the template are AUTO parameters PAR(2), PAR(3), ... whose values
+    are passed in the constants file at runtime, so the compiled executable can be
+    reused for any values of them.
+
+    AUTO only writes the first few components of U to fort.7, so with several DOFs the
+    PVLS routine copies each of them into an output parameter after the constants, which
+    AUTO prints for every point. `dof_columns` maps the fort.7 column of each DOF to its
+    name; pyfurc numbers the DOFs in the (hash dependent) iteration order of the
+    expression's atoms, so this is the only reliable way to tell them apart.
+    """
+
+    def __init__(self, source, ndofs, parameter_indices, dof_columns):
+        self.source = source
+        self.ndofs = ndofs
+        self.parameter_indices = parameter_indices
+        self.dof_columns = dof_columns
+
+    @property
+    def output_indices(self):
+        return [int(column[4:-1]) for column in self.dof_columns if column.startswith("PAR(")]
+
+    def column_names(self, dofs=None):
+        """Maps the fort.7 DOF columns to U(1), U(2), ... in the order of `dofs` (DOF names, sorted by default)."""
+        order = {name: i for i, name in enumerate(dofs or sorted(self.dof_columns.values()))}
+        return {column: f"U({order[name] + 1})" for column, name in self.dof_columns.items()}
+
+    def auto_constants(self, constants, **settings):
+        """Contents of the AUTO constants file for the given constant values and settings (e.g. RL1)."""
+        params = pf.AutoParameters()
+        for name, value in settings.items():
+            params[name] = float(value) if isinstance(params.get(name), float) else value
+        params.update(pf.HiddenAutoParameters())
+        outputs = self.output_indices
+        params.update({"NDIM": self.ndofs, "NPAR": len(self.parameter_indices) + len(outputs) + 1})
+        if outputs:
+            # Only PAR(1) is continued, the others are just printed
+            params["ICP"] = [1, *outputs]
+        if self.parameter_indices:
+            params["PAR"] = {
+                index: float(constants[name])
+                for name, index in sorted(self.parameter_indices.items(), key=lambda item: item[1])
+            }
+        return params
+
+    def write_constants_file(self, basedir, constants, **settings):
+        path = os.path.join(basedir, f"c.{PROBLEM_NAME}")
+        with open(path, "w") as outfile:
+            for name, value in self.auto_constants(constants, **settings).items():
+                outfile.write(f"{name}\t=\t{value}\n")
+        return path
+
+
+class ModelRegistry:
+    """Generates the AUTO code of each energy template once and keeps it for reuse.
+
+    Templates are keyed on the canonical sympy energy and the names of its constants;
+    their values never end up in the generated code.
+    """
+
+    def __init__(self, max_models=128):
+        self.max_models = max_models
+        self._models = OrderedDict()
+        # pyfurc stores the Fortran names on the (globally cached) sympy symbols
+        self._lock = threading.Lock()
+
+    def model_for(self, energy, constant_names):
+        key = (sp.srepr(energy), tuple(sorted(constant_names)))
+        with self._lock:
+            model = self._models.get(key)
+            count(f"cache.model.{'miss' if model is None else 'hit'}")
+            if model is None:
+                with span("model.codegen"):
+                    model = self._models[key] = _generate_model(energy, key[1])
+                while len(self._models) > self.max_models:
+                    self._models.popitem(last=False)
+            self._models.move_to_end(key)
+            return model
+
+    def __len__(self):
+        return len(self._models)
+
+
+def _generate_model(energy, constant_names):
+    # pyfurc keeps the Fortran names on the symbol instances (`_name`), while sympy's caches may hand
+    # out other, equal instances of the same symbols, e.g. after solving a closed form. Quantities
+    # with names used nowhere else are the only instances in the expressions pyfurc derives and
+    # prints, so the generated code does not depend on what was computed earlier in the process.
+    suffix = f"_model{next(_model_ids)}"
+    replacements, names = {}, {}
+    for symbol in energy.free_symbols:
+        if isinstance(symbol, pf.Dof):
+            fresh = pf.Dof(symbol.name + suffix)
+        elif isinstance(symbol, pf.Load):
+            fresh = pf.Load(symbol.name + suffix)
+        elif symbol.name in constant_names:
+            fresh = pf.Parameter(symbol.name + suffix)
+        else:
+            continue
+        replacements[symbol] = fresh
+        names[fresh] = symbol.name
+    V = pf.Energy(energy.xreplace(replacements))
+    solver = pf.BifurcationProblemSolver(pf.BifurcationProblem(V, name=PROBLEM_NAME))
+    with tempfile.TemporaryDirectory() as basedir:
+        solver.write_func_file(basedir=basedir, silent=True)
+        with open(os.path.join(basedir, f"{PROBLEM_NAME}.f90")) as f:
+            source = f.read()
+    # Fortran names look like "PAR(2)"
+    parameter_indices = {names[atom]: _index(info["name"]) for atom, info in V.params.items()}
+    dof_columns = {info["name"]: names[atom] for atom, info in V.dofs.items()}
+    if V.ndofs > 1:
+        first = len(parameter_indices) + 2
+        outputs = {f"PAR({first + i})": column for i, column in enumerate(sorted(dof_columns, key=_index))}
+        assignments = "".join(f"  {parameter} = {column}\n" for parameter, column in outputs.items())
+        source = source.replace("END SUBROUTINE PVLS", assignments + "\nEND SUBROUTINE PVLS")
+        dof_columns = {parameter: dof_columns[column] for parameter, column in outputs.items()}
+    return EnergyModel(source, V.ndofs, parameter_indices, dof_columns)
+
+
+_model_ids = itertools.count(1)
+
+
+def _index(name):
+    # Index of a Fortran name like "U(3)"
+    return int(name[name.index("(") + 1:-1])
+
+
+# One registry per process, shared by all solves running in it
+MODEL_REGISTRY = ModelRegistry()
@@ -0,0 +1,130 @@
+"""PDF report of a stability analysis, built in memory and cached by the hash of its inputs."""
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from .layout import wrap_text
+from .metrics import count, span
+
+FONT = "Helvetica"
+TOP = 750
+TEXT_X = 100
+LINE_HEIGHT = 14  # Height of each text line
+BOTTOM_MARGIN = 50  # Margin to avoid text running into the footer or plot
+PAGE_WIDTH = letter[0] - 2 * TEXT_X
+IMAGE_WIDTH, IMAGE_HEIGHT = 400, 300
+
+
+def report_key(description, sketch, energy_formula, parameter, P_max, constants, plot):
+    """Content hash of the report inputs; `sketch` is image bytes and `plot` a FigureSpec (or None)."""
+    payload = {
+        "description": description,
+        "sketch": hashlib.sha256(sketch).hexdigest() if sketch else None,
+        "energy_formula": energy_formula,
+        "parameter": parameter,
+        "P_max": P_max,
+        "constants": [[str(key), str(value)] for key, value in constants.items()],
+        "plot": plot.digest() if plot is not None else None,
+    }
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+
+class ReportBuilder:
+    """Builds report PDFs on demand and keeps the most recent ones (and their decoded images) in memory."""
+
+    def __init__(self, max_reports=16, max_images=16):
+        self.max_reports = max_reports
+        self.max_images = max_images
+        self._reports = OrderedDict()
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def build(self, description, sketch, energy_formula, parameter, P_max, constants, plot):
+        """Returns the PDF bytes of the report, rendering it only if these inputs were not seen before."""
+        key = report_key(description, sketch, energy_formula, parameter, P_max, constants, plot)
+        with self._lock:
+            if key in self._reports:
+                self._reports.move_to_end(key)
+                count("cache.report.hit")
+                return self._reports[key]
+            image = self._image(sketch) if sketch else None
+        count("cache.report.miss")
+        # Rendering happens outside the lock, so reports of different sessions are built concurrently
+        with span("report.build") as attributes:
+            pdf = self._render(description, image, energy_formula, parameter, P_max, constants, plot)
+            attributes["bytes"] = len(pdf)
+        with self._lock:
+            self._remember(self._reports, key, pdf, self.max_reports)
+        return pdf
+
+    def _image(self, data):
+        # Decoded images are shared by all reports that embed the same picture
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self._images:
+            self._images.move_to_end(digest)
+            return self._images[digest]
+        image = ImageReader(io.BytesIO(data))
+        # Decoded here, under the lock: the reader caches its pixels on first use, and renders
+        # running at the same time then only read them
+        image.getRGBData()
+        self._remember(self._images, digest, image, self.max_images)
+        return image
+
+    def _render(self, description, image, energy_formula, parameter, P_max, constants, plot):
+        buffer = io.BytesIO()
+        c = canvas.Canvas(buffer, pagesize=letter)
+        text_y = TOP
+
+        def add_text(text, font_size):
+            nonlocal text_y
+            c.setFont(FONT, font_size)
+            for line in wrap_text(text, FONT, font_size, PAGE_WIDTH):
+                if text_y <= BOTTOM_MARGIN:
+                    c.showPage()
+                    c.setFont(FONT, font_size)
+                    text_y = TOP
+                c.drawString(TEXT_X, text_y, line)
+                text_y -= LINE_HEIGHT
+
+        add_text("Stability Analysis:\n", 20)
+        add_text("Description:", 16)
+        add_text("\n" + description, 12)
+        add_text("\nSketch:", 16)
+
+        # Add uploaded image to PDF, check if there's space, else create a new page
+        if image is not None:
+            if text_y - IMAGE_HEIGHT <= BOTTOM_MARGIN:
+                c.showPage()
+                text_y = TOP
+            c.drawImage(image, TEXT_X, text_y - IMAGE_HEIGHT, width=IMAGE_WIDTH, height=IMAGE_HEIGHT)
+            text_y -= IMAGE_HEIGHT + 20
+
+        add_text("\nEnergy Formula:\n", 12)
+        add_text(f"V = {energy_formula}", 12)
+        add_text(f"Parameter = {parameter}", 12)
+        add_text(f"Max Parameter (P_max) = {P_max}", 12)
+        for key, value in constants.items():
+            add_text(f"{key} = {value}", 12)
+        # Add the plot to the PDF, check if there's space, else create a new page
+        if text_y - IMAGE_HEIGHT <= BOTTOM_MARGIN:
+            c.showPage()
+            text_y = TOP
+        add_text("\nPlot:", 16)
+        if plot is not None:
+            # Drawn as vector graphics, so the plot stays sharp at any zoom
+            plot.draw(c, TEXT_X, text_y - IMAGE_HEIGHT, IMAGE_WIDTH, IMAGE_HEIGHT)
+
+        c.save()
+        return buffer.getvalue()
+
+    def _remember(self, entries, key, value, max_entries):
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > max_entries:
+            entries.popitem(last=False)
@@ -0,0 +1,117 @@
+"""Uploaded sketches, decoded once per content and kept as downscaled variants for the page and the report."""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .metrics import count, span
+
+DISPLAY_SIZE = (1408, 1408)  # Twice the plot width of the page, sharp on high-density screens
+REPORT_SIZE = (1200, 900)  # The 400 x 300 pt frame of the report at 216 dpi
+JPEG_QUALITY = 85
+CHUNK_SIZE = 1 << 20
+
+
+class Sketch:
+    """A decoded sketch: its content hash, original size and the encoded display and report variants."""
+
+    def __init__(self, digest, size, display, report):
+        self.digest = digest
+        self.size = size
+        self.display = display
+        self.report = report
+
+
+def sketch_digest(source):
+    """SHA-256 of image bytes or of a binary file object, which is read in chunks and rewound."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(source).hexdigest()
+    source.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+    source.seek(0)
+    return digest.hexdigest()
+
+
+class SketchStore:
+    """Keeps the most recent sketches by content hash, so that an upload is decoded and scaled only once.
+
+    The same picture uploaded again, in the same or in another session, reuses its variants.
+    """
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._sketches = OrderedDict()
+        self._lock = threading.Lock()
+
+    def prepare(self, source):
+        """The Sketch of image bytes or a binary file object; raises ValueError if it is not a readable image."""
+        digest = sketch_digest(source)
+        with self._lock:
+            if digest in self._sketches:
+                self._sketches.move_to_end(digest)
+                count("cache.sketch.hit")
+                return self._sketches[digest]
+        count("cache.sketch.miss")
+        # Decoding happens outside the lock, other sessions keep getting their cached sketches meanwhile
+        with span("sketch.decode"):
+            sketch = _decode(digest, io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source)
+        with self._lock:
+            self._sketches[digest] = sketch
+            self._sketches.move_to_end(digest)
+            while len(self._sketches) > self.max_entries:
+                self._sketches.popitem(last=False)
+        return sketch
+
+    def __len__(self):
+        return len(self._sketches)
+
+
+def _decode(digest, file):
+    try:
+        with Image.open(file) as image:
+            size = image.size
+            lossless = image.format != "JPEG"
+            # JPEGs are decoded directly at a reduced scale, which is much faster for large photos
+            image.draft("RGB", DISPLAY_SIZE)
+            image = ImageOps.exif_transpose(image)
+            image = _normalized(image, lossless)
+            image = _scaled(image, DISPLAY_SIZE)
+            # The report variant is scaled from the display variant, which is already close to its size
+            display = _encoded(image, lossless)
+            report = _encoded(_scaled(image, REPORT_SIZE), lossless)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as error:
+        raise ValueError(f"The uploaded file is not a readable image: {error}") from error
+    finally:
+        file.seek(0)
+    return Sketch(digest, size, display, report)
+
+
+def _normalized(image, lossless):
+    # Palette images are scaled in RGB(A), the lossy variants have no alpha channel
+    if image.mode not in ("RGB", "L", "RGBA", "LA") or (not lossless and image.mode in ("RGBA", "LA")):
+        has_alpha = "A" in image.mode or "transparency" in image.info
+        return image.convert("RGBA" if lossless and has_alpha else "RGB")
+    return image
+
+
+def _scaled(image, size):
+    """The image scaled down to fit `size`, never up."""
+    if image.width <= size[0] and image.height <= size[1]:
+        return image
+    image = image.copy()
+    image.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    return image
+
+
+def _encoded(image, lossless):
+    """PNG bytes for lossless sources (e.g. line drawings), JPEG otherwise."""
+    buffer = io.BytesIO()
+    if lossless:
+        image.save(buffer, format="PNG")
+    else:
+        image.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue()
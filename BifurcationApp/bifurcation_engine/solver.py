@@ -0,0 +1,61 @@
+import os
+from subprocess import PIPE, Popen
+
+import pyfurc as pf
+
+from .jobs import report_progress
+from .metrics import span
+from .models import MODEL_REGISTRY
+from .workspace import workspace_for
+
+
+def solve_branches(energy, constants, P_max, workspace, session_id="default", dofs=None):
+    """Runs the AUTO continuation in an isolated job directory of `workspace`.
+
+    The model of the energy template is compiled once and reused; the constant
+    values are only written to the constants file. Returns each branch as a dict
+    of NumPy arrays, with U(i) the i-th DOF name of `dofs` (sorted names by default).
+    """
+    model = MODEL_REGISTRY.model_for(energy, constants)
+    with workspace.job(session_id) as job_dir:
+        report_progress("compiling", 0.1)
+        executable = workspace.compiled_executable(model.source)
+        constants_file = model.write_constants_file(job_dir, constants, RL1=P_max)
+        report_progress("solving", 0.5)
+        with span("solver.run"):
+            run_auto(executable, constants_file, job_dir)
+
+        report_progress("reading results", 0.9)
+        with span("solver.parse") as attributes:
+            solution = pf.BifurcationProblemSolution()
+            solution.read_solution(job_dir)
+            names = model.column_names(dofs)
+            branches = [
+                {names.get(str(column), str(column)): branch[column].to_numpy() for column in branch.columns}
+                for branch in solution.raw_data
+            ]
+            attributes["branches"] = len(branches)
+        return branches
+
+
+def solve_job(energy, constants, P_max, workspace_root, session_id, dofs=None):
+    """Entry point for the JobScheduler's worker processes."""
+    with span("solve.auto"):
+        return solve_branches(energy, constants, P_max, workspace_for(workspace_root), session_id, dofs)
+
+
+def run_auto(executable, constants_file, job_dir):
+    """Runs a compiled AUTO model with `job_dir` as working directory for the fort.* files."""
+    with open(constants_file) as parameters:
+        process = Popen(
+            [executable],
+            cwd=job_dir,
+            stdin=parameters,
+            stdout=PIPE,
+            stderr=PIPE,
+            env=pf.setup_auto_exec_env(),
+            universal_newlines=True,
+        )
+        out, err = process.communicate()
+    if process.returncode != 0 or not os.path.exists(os.path.join(job_dir, "fort.7")):
+        raise RuntimeError(f"AUTO did not produce a solution:\n{err or out}")
@@ -0,0 +1,61 @@
+"""Stability of equilibrium points from the Hessian of the energy, evaluated on whole branch arrays."""
+import numpy as np
+
+from .branches import LOAD_COLUMN
+
+STABILITY_COLUMN = "STABLE"
+
+
+def hessian_values(compiled, store, constants, dof_columns=None):
+    """Hessian of the energy at every point of `store`, shape (n_points, n_dofs, n_dofs).
+
+    Only the structurally non-zero entries of `compiled.hessian_pattern` are evaluated;
+    `dof_columns` names the store column of each DOF of `compiled` (U(1), U(2), ... by default).
+    """
+    n_dofs = len(compiled.dofs)
+    dof_columns = dof_columns or [f"U({i + 1})" for i in range(n_dofs)]
+    arguments = [store.columns[name] for name in dof_columns]
+    arguments += [store.columns[LOAD_COLUMN], *compiled.constant_values(constants)]
+    hessian = np.zeros((store.n_points, n_dofs, n_dofs))
+    with np.errstate(all="ignore"):
+        entries = compiled.hessian_function(*arguments)
+    for (i, j), values in zip(compiled.hessian_pattern, entries):
+        # Constant entries come back as scalars from lambdify
+        hessian[:, i, j] = np.broadcast_to(values, store.n_points)
+        hessian[:, j, i] = hessian[:, i, j]
+    return hessian
+
+
+def classify_stability(compiled, store, constants, dof_columns=None, rtol=1e-9):
+    """True where the Hessian is positive definite, i.e. the equilibrium is stable.
+
+    Eigenvalues within `rtol` of the median magnitude count as zero (critical points; the median
+    because the Hessian blows up at the ends of some branches), points where the Hessian is
+    undefined count as unstable.
+    """
+    hessian = hessian_values(compiled, store, constants, dof_columns)
+    if hessian.shape[1] == 1:
+        lowest = hessian[:, 0, 0]
+    else:
+        finite = np.isfinite(hessian).all(axis=(1, 2))
+        lowest = np.full(store.n_points, np.nan)
+        lowest[finite] = np.linalg.eigvalsh(hessian[finite])[:, 0]
+    finite_values = np.abs(lowest[np.isfinite(lowest)])
+    tolerance = rtol * np.median(finite_values) if finite_values.size else 0.0
+    with np.errstate(invalid="ignore"):
+        return lowest > tolerance
+
+
+def split_by_stability(values, stable):
+    """Copies of `values` with NaN outside the stable and the unstable parts, for solid/dashed lines.
+
+    Each part also keeps the point after it, so both lines meet where the stability changes.
+    """
+    values = np.asarray(values, dtype=float)
+    stable = np.asarray(stable, dtype=bool)
+    unstable = ~stable
+    stable_mask = stable.copy()
+    stable_mask[1:] |= stable[:-1]
+    unstable_mask = unstable.copy()
+    unstable_mask[1:] |= unstable[:-1]
+    return np.where(stable_mask, values, np.nan), np.where(unstable_mask, values, np.nan)
@@ -0,0 +1,107 @@
+"""Cold-start import benchmark: ``python -m bifurcation_engine startup``.
+
+Every scenario is imported in fresh interpreters with ``-X importtime``; the median
+total is compared with its budget and the slowest modules are listed, so import-time
+regressions of new app workers show up before deployment.
+"""
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# What every rerun of BifurcationUI.py imports before a page is rendered
+_APP_ENTRY = "import streamlit, numpy; from bifurcation_engine import KIT_CASES, METRICS, span"
+# st.pyplot imports pyplot when the first plot of a page is drawn
+_PLOTTING = "import matplotlib.pyplot"
+
+# Scenario -> (import statement, budget in ms). The statements mirror what the app pages import.
+SCENARIOS = {
+    "engine": ("import bifurcation_engine", 20),
+    "limit_point_page": (
+        f"{_APP_ENTRY}; from bifurcation_engine import ShallowTruss, deformation_figure; {_PLOTTING}", 2000,
+    ),
+    "result_tables": ("from bifurcation_engine import BranchStore, ResultFrame", 1500),
+    "case_pages": (
+        f"{_APP_ENTRY}; from bifurcation_engine import ResultFrame, bifurcation_figure, deformation_figure, "
+        f"build_energy_expression, solve_analytic, classify_stability; {_PLOTTING}", 4000,
+    ),
+    "report": ("from bifurcation_engine import ReportBuilder", 1500),
+}
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(statement, cwd=None):
+    """Runs `statement` in a fresh interpreter; returns (total ms, {module: cumulative ms}) of the top-level imports."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) == 1:  # Top-level import, indented by one space
+            modules[match.group(4)] = int(match.group(2)) / 1000
+    return sum(modules.values()), modules
+
+
+def run_scenarios(names=None, repeat=3, cwd=None):
+    """Median import time of each scenario: {name: {"ms", "budget_ms", "slowest"}}.
+
+    Modules the bare interpreter already imports at startup (site, encodings, ...) are not counted.
+    """
+    interpreter = set(measure("pass", cwd)[1])
+    results = {}
+    for name in names or SCENARIOS:
+        statement, budget = SCENARIOS[name]
+        runs = []
+        for _ in range(repeat):
+            _, modules = measure(statement, cwd)
+            modules = {module: ms for module, ms in modules.items() if module not in interpreter}
+            runs.append((sum(modules.values()), modules))
+        totals = [total for total, _ in runs]
+        _, modules = runs[totals.index(statistics.median_low(totals))]
+        slowest = sorted(modules.items(), key=lambda item: -item[1])[:5]
+        results[name] = {"ms": statistics.median(totals), "budget_ms": budget, "slowest": slowest}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m bifurcation_engine startup", description="Cold-start import times of the app against their budgets."
+    )
+    parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per scenario (default: 3)")
+    parser.add_argument("--budget", action="append", default=[], help="name=ms, overrides a budget")
+    parser.add_argument("--baseline", help="JSON file of an earlier run; a scenario also fails if it got 25%% slower")
+    parser.add_argument("--save", help="Write the results as JSON, e.g. as a new baseline")
+    args = parser.parse_args(argv)
+
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}")
+    budgets = {}
+    for item in args.budget:
+        name, _, value = item.partition("=")
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}")
+        budgets[name] = float(value)
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else {}
+
+    results = run_scenarios(args.scenarios or None, args.repeat, cwd=Path(__file__).resolve().parent.parent)
+    failed = False
+    for name, result in results.items():
+        result["budget_ms"] = budgets.get(name, result["budget_ms"])
+        limits = [result["budget_ms"]]
+        if name in baseline:
+            limits.append(1.25 * baseline[name]["ms"])
+        ok = result["ms"] <= min(limits)
+        failed |= not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name:18s} {result['ms']:8.1f} ms (limit {min(limits):.0f} ms)")
+        for module, ms in result["slowest"]:
+            print(f"       {module:30s} {ms:8.1f} ms")
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2))
+    return 1 if failed else 0
@@ -0,0 +1,184 @@
+"""Parameter sweeps of an energy template over grids of its constants.
+
+Example (from the BifurcationApp folder)::
+
+    python -m bifurcation_engine sweep asymmetric --grid k=0.5:2:4 --grid l=1,2 --out sweeps/asymmetric
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pyfurc as pf
+
+from .branches import BranchStore
+from .cache import SolutionCache, solution_key
+from .formulas import build_energy_expression, dof_names
+from .solver import solve_job
+from .templates import ENERGY_TEMPLATES
+from .workspace import default_scratch_root
+
+
+def parse_grid(specs):
+    """Parses ``name=v1,v2,...`` or ``name=start:stop:num`` specifications into {name: values}."""
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if not values:
+            raise ValueError(f"Grid specification '{spec}' must look like name=v1,v2 or name=start:stop:num")
+        if name.strip() in grid:
+            raise ValueError(f"The grid of constant '{name.strip()}' is given more than once")
+        if ":" in values:
+            start, stop, num = values.split(":")
+            grid[name.strip()] = np.linspace(float(start), float(stop), int(num)).tolist()
+        else:
+            grid[name.strip()] = [float(value) for value in values.split(",")]
+    return grid
+
+
+def grid_configurations(grid, base=None):
+    """All combinations of the grid values, on top of the `base` constants."""
+    names = list(grid)
+    configurations = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        constants = dict(base or {})
+        constants.update({name: float(value) for name, value in zip(names, values)})
+        configurations.append(constants)
+    return configurations
+
+
+def _check_grid_names(grid, energy):
+    """Raises ValueError for grid names that are not constants of `energy`, e.g. typos that would only multiply the sweep."""
+    constants = {
+        symbol.name for symbol in energy.free_symbols if not isinstance(symbol, (pf.Dof, pf.Load))
+    }
+    unknown = sorted(set(grid) - constants)
+    if unknown:
+        raise ValueError(
+            f"Grid constant(s) {', '.join(unknown)} do not appear in the energy; its constants are: "
+            f"{', '.join(sorted(constants)) or 'none'}"
+        )
+
+
+class SweepStore:
+    """On-disk result store of a sweep.
+
+    ``index.jsonl`` holds one line per solved configuration (constants, critical loads,
+    size of the solution) and ``branches/<key>.npz`` the compressed branch arrays.
+    Configurations already present are skipped when a sweep is resumed.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.jsonl")
+        self.branches = SolutionCache(max_entries=0, disk_dir=os.path.join(directory, "branches"), compressed=True)
+
+    def records(self):
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def completed_keys(self):
+        return {record["key"] for record in self.records() if "error" not in record}
+
+    def add(self, key, constants, P_max, branches=None, error=None):
+        record = {"key": key, "constants": constants, "P_max": float(P_max)}
+        if error is None:
+            store = BranchStore(self.branches.put(key, branches))
+            record.update(
+                critical_loads=store.critical_loads(),
+                n_branches=len(store),
+                n_points=store.n_points,
+            )
+        else:
+            record["error"] = str(error)
+        with open(self.index_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        return record
+
+    def load_branches(self, key):
+        return BranchStore(self.branches.get(key))
+
+    def to_frame(self):
+        """The index as a DataFrame with one column per constant."""
+        import pandas as pd
+
+        rows = [{**record["constants"], **{k: v for k, v in record.items() if k != "constants"}} for record in self.records()]
+        return pd.DataFrame(rows)
+
+
+def run_sweep(energy_formula, parameter, grid, P_max, directory, base_constants=None,
+              max_workers=None, workspace_root=None, progress=None):
+    """Solves every unique configuration of `grid` in a process pool and streams the results into a SweepStore.
+
+    Raises ValueError before solving anything if a grid name is not a constant of the energy.
+    """
+    configurations = grid_configurations(grid, base_constants)
+    energy = build_energy_expression(energy_formula, parameter, configurations[0] if configurations else {})
+    _check_grid_names(grid, energy)
+    unique = {}
+    for constants in configurations:
+        unique.setdefault(solution_key(energy, parameter, P_max, constants), constants)
+
+    os.makedirs(directory, exist_ok=True)
+    store = SweepStore(directory)
+    done = store.completed_keys()
+    pending = {key: constants for key, constants in unique.items() if key not in done}
+    workspace_root = workspace_root or default_scratch_root()
+    if progress:
+        progress(f"{len(configurations)} configurations, {len(unique)} unique, {len(pending)} to solve")
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+        futures = {
+            pool.submit(solve_job, energy, constants, P_max, workspace_root, "sweep", dof_names(parameter)): (key, constants)
+            for key, constants in pending.items()
+        }
+        for finished, future in enumerate(as_completed(futures), start=1):
+            key, constants = futures[future]
+            try:
+                record = store.add(key, constants, P_max, branches=future.result())
+            except Exception as e:
+                record = store.add(key, constants, P_max, error=e)
+            if progress:
+                progress(f"[{finished}/{len(futures)}] {constants}: {record.get('critical_loads', record.get('error'))}")
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m bifurcation_engine sweep", description="Bifurcation parameter sweep over a grid of constants."
+    )
+    parser.add_argument("template", nargs="?", choices=sorted(ENERGY_TEMPLATES), help="Built-in energy template")
+    parser.add_argument("--formula", help="Energy formula to use instead of a template")
+    parser.add_argument("--dof", default="q", help="Degree of freedom of --formula (default: q)")
+    parser.add_argument("--grid", action="append", default=[], help="name=v1,v2,... or name=start:stop:num")
+    parser.add_argument("--P-max", type=float, default=3.0, help="Upper load bound RL1 (default: 3)")
+    parser.add_argument("--out", required=True, help="Output directory of the result store")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    args = parser.parse_args(argv)
+
+    if args.formula:
+        formula, dof, base = args.formula, args.dof, {}
+    elif args.template:
+        template = ENERGY_TEMPLATES[args.template]
+        formula, dof, base = template["formula"], template["dof"], template["constants"]
+    else:
+        parser.error("either a template or --formula is required")
+
+    start = time.time()
+    try:
+        store = run_sweep(formula, dof, parse_grid(args.grid), args.P_max, args.out,
+                          base_constants=base, max_workers=args.workers, progress=print)
+    except ValueError as e:
+        parser.error(str(e))
+    # The latest record of each configuration counts, earlier failures may have been solved on resume
+    latest = {record["key"]: record for record in store.records()}
+    failed = sum("error" in record for record in latest.values())
+    print(f"{len(latest) - failed} solved, {failed} failed, results in {store.index_path} ({time.time() - start:.1f} s)")
+    return 1 if failed else 0
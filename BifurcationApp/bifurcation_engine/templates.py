@@ -0,0 +1,4 @@
+"""Energy templates of the kit models, with their constants as free symbols."""
+from .cases import KIT_CASES
+
+ENERGY_TEMPLATES = KIT_CASES.templates()
@@ -0,0 +1,132 @@
+"""Shallow two-bar truss of the Limit Point / Saddle-node kit, solved in closed form with NumPy.
+
+Two rigid bars of length Lb = L / cos(alpha) join at the apex, which carries the load P.
+The right support is fixed at x = 2L, the left one is a carriage held by a horizontal
+spring k. With theta the angle of the bars (alpha when unloaded), the energy is
+
+    V = 1/2 k (2 Lb (cos(theta) - cos(alpha)))^2 - P Lb (sin(alpha) - sin(theta))
+
+and dV/dtheta = 0 gives the equilibrium path P(theta) = 4 k Lb (sin(theta) - cos(alpha) tan(theta)).
+It has a maximum, the limit point, at cos(theta)^3 = cos(alpha); beyond it the truss
+snaps through to the inverted configuration. All arguments broadcast, so many loads and
+geometries are solved in one batch.
+"""
+import numpy as np
+
+from .figures import FigureSpec
+from .stability import split_by_stability
+
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-12
+EDGE = 1e-9  # Distance from the vertical bar angles, where the load becomes infinite
+
+
+class ShallowTruss:
+    """The truss with half span `L`, spring stiffness `k` and initial bar angle `alpha` (radians)."""
+
+    def __init__(self, L, k, alpha):
+        self.L, self.k, self.alpha = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (L, k, alpha)))
+        if not ((self.L > 0).all() and (self.k > 0).all() and ((self.alpha > 0) & (self.alpha < np.pi / 2)).all()):
+            raise ValueError("L and k must be positive and the initial angle between 0 and 90 degrees")
+        self.bar_length = self.L / np.cos(self.alpha)
+
+    def load(self, theta):
+        """The load in equilibrium at bar angle `theta`."""
+        return _load(theta, 4 * self.k * self.bar_length, np.cos(self.alpha))
+
+    def load_slope(self, theta):
+        """dP/dtheta along the equilibrium path."""
+        return _load_slope(theta, 4 * self.k * self.bar_length, np.cos(self.alpha))
+
+    def stable(self, theta):
+        # d2V/dtheta2 = -Lb cos(theta) dP/dtheta on the path, and cos(theta) > 0
+        return self.load_slope(theta) < 0
+
+    def limit_point(self):
+        """(theta, P) of the limit point, where dP/dtheta = 0 and the load is largest."""
+        theta = np.arccos(np.cbrt(np.cos(self.alpha)))
+        return theta, self.load(theta)
+
+    def angle_at(self, P):
+        """Bar angle when the load is increased from 0 to `P`.
+
+        Up to the limit load the truss stays on the stable branch through alpha, above it it
+        has snapped through to the stable branch below -theta_cr. P decreases monotonically
+        with theta on both, so Newton steps safeguarded by bisection find the angle for all
+        loads and geometries at once.
+        """
+        theta_cr, P_limit = self.limit_point()
+        arrays = np.broadcast_arrays(4 * self.k * self.bar_length, np.cos(self.alpha), theta_cr, P_limit, P)
+        shape = arrays[0].shape
+        stiffness, cos_alpha, theta_cr, P_limit, P = (np.array(a, dtype=float).ravel() for a in arrays)
+        snapped = P > P_limit
+        # Brackets with load(low) >= P >= load(high)
+        low = np.where(snapped, -np.pi / 2 + EDGE, theta_cr)
+        high = np.where(snapped, -theta_cr, np.pi / 2 - EDGE)
+        theta = np.where(snapped, -theta_cr, np.arccos(cos_alpha))
+        # Only the angles that have not converged yet are iterated
+        active = np.arange(theta.size)
+        with np.errstate(all="ignore"):
+            for _ in range(MAX_ITERATIONS):
+                if not active.size:
+                    break
+                current, args = theta[active], (stiffness[active], cos_alpha[active])
+                residual = _load(current, *args) - P[active]
+                low[active] = np.where(residual >= 0, current, low[active])
+                high[active] = np.where(residual >= 0, high[active], current)
+                step = current - residual / _load_slope(current, *args)
+                inside = np.isfinite(step) & (step > low[active]) & (step < high[active])
+                theta[active] = np.where(inside, step, (low[active] + high[active]) / 2)
+                active = active[np.abs(theta[active] - current) > TOLERANCE]
+        return theta.reshape(shape)
+
+    def snap_through(self):
+        """(P_limit, theta_cr, theta_after): the limit load and the bar angles before and after the snap."""
+        theta_cr, P_limit = self.limit_point()
+        return P_limit, theta_cr, self.angle_at(P_limit * (1 + 1e-12))
+
+    def deflection(self, theta):
+        """Downward displacement of the apex."""
+        return self.bar_length * (np.sin(self.alpha) - np.sin(theta))
+
+    def carriage_displacement(self, theta):
+        """Horizontal displacement of the carriage, negative to the left."""
+        return 2 * self.bar_length * (np.cos(self.alpha) - np.cos(theta))
+
+    def configuration(self, theta):
+        """Node coordinates (xs, ys) of carriage, apex and fixed support."""
+        apex_x = 2 * self.L - self.bar_length * np.cos(theta)
+        carriage_x = 2 * apex_x - 2 * self.L
+        fixed = np.broadcast_to(2 * self.L, np.shape(apex_x))
+        zero = np.zeros(np.shape(apex_x))
+        return (carriage_x, apex_x, fixed), (zero, self.bar_length * np.sin(theta), zero)
+
+    def equilibrium_path(self, P_max, num=400):
+        """(theta, P) along the whole equilibrium path from the unloaded state to P_max on the snapped branch."""
+        theta_end = self.angle_at(np.maximum(P_max, self.limit_point()[1] * 1.01))
+        theta = self.alpha + np.linspace(0.0, 1.0, num).reshape((num,) + (1,) * self.alpha.ndim) * (theta_end - self.alpha)
+        return theta, self.load(theta)
+
+    def figure(self, P_max, load=None, num=400):
+        """Load-deflection plot of a single truss: stable path solid, unstable dashed, with the snap-through."""
+        theta, P = self.equilibrium_path(P_max, num)
+        deflection = self.deflection(theta)
+        stable_load, unstable_load = split_by_stability(P, self.stable(theta))
+        spec = FigureSpec(title="Bifurcation Plot", xlabel="Deflection of the apex (cm)", ylabel="Load (P)")
+        color = spec.add_line(deflection, stable_load, label="Stable")
+        spec.add_line(deflection, unstable_load, color=color, linestyle="--", label="Unstable")
+        P_limit, theta_cr, theta_after = self.snap_through()
+        spec.add_line([self.deflection(theta_cr), self.deflection(theta_after)], [P_limit, P_limit],
+                      color="orange", linestyle=":", label="Snap-through")
+        spec.add_points(self.deflection(theta_cr), P_limit, color="black", label=f"Limit point P = {float(P_limit):.3f}")
+        if load is not None:
+            spec.add_points(self.deflection(self.angle_at(load)), load, color="red", label=f"State at P = {load:.3f}")
+        return spec
+
+
+def _load(theta, stiffness, cos_alpha):
+    return stiffness * (np.sin(theta) - cos_alpha * np.tan(theta))
+
+
+def _load_slope(theta, stiffness, cos_alpha):
+    return stiffness * (np.cos(theta) - cos_alpha / np.cos(theta) ** 2)
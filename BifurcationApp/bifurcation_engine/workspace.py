@@ -0,0 +1,147 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from subprocess import PIPE, Popen
+
+from pyfurc import setup_auto_exec_env
+
+from .metrics import count, span
+
+
+def default_scratch_root():
+    """Scratch root for solver runs, preferring tmpfs so AUTO's file I/O stays in memory."""
+    root = os.environ.get("BIFURCATION_WORKSPACE_DIR")
+    if root:
+        return root
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return os.path.join("/dev/shm", "bifurcation_app")
+    return os.path.join(tempfile.gettempdir(), "bifurcation_app")
+
+
+_managers = {}
+
+
+def workspace_for(root):
+    """Returns this process' WorkspaceManager for `root`, e.g. inside pool workers."""
+    if root not in _managers:
+        _managers[root] = WorkspaceManager(root)
+    return _managers[root]
+
+
+class WorkspaceManager:
+    """Hands out isolated scratch directories per session and per solver job.
+
+    Each session directory is reference counted by the jobs running in it and is
+    removed when the last one finishes. Compiled models are shared between all
+    sessions in ``<root>/artifacts``, keyed on a hash of their Fortran source.
+    """
+
+    def __init__(self, root=None):
+        self.root = os.path.abspath(root or default_scratch_root())
+        self.sessions_dir = os.path.join(self.root, "sessions")
+        self.artifact_dir = os.path.join(self.root, "artifacts")
+        os.makedirs(self.sessions_dir, exist_ok=True)
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, session_id):
+        """Returns the session's directory and adds a reference to it."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                path = tempfile.mkdtemp(prefix=f"{_safe_name(session_id)}_", dir=self.sessions_dir)
+                entry = self._sessions[session_id] = [path, 0]
+            entry[1] += 1
+            return entry[0]
+
+    def release(self, session_id):
+        """Drops a reference and removes the session directory once it is unused."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._sessions[session_id]
+        shutil.rmtree(entry[0], ignore_errors=True)
+
+    def refcount(self, session_id):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return entry[1] if entry else 0
+
+    @contextmanager
+    def job(self, session_id):
+        """Yields a fresh directory for one solver run inside the session's workspace."""
+        session_dir = self.acquire(session_id)
+        try:
+            job_dir = tempfile.mkdtemp(prefix="job_", dir=session_dir)
+            try:
+                yield job_dir
+            finally:
+                shutil.rmtree(job_dir, ignore_errors=True)
+        finally:
+            self.release(session_id)
+
+    def compiled_executable(self, source):
+        """Returns the path of the AUTO executable for `source`, compiling it only once."""
+        digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        target = os.path.join(self.artifact_dir, digest)
+        executable = os.path.join(target, "model.out")
+        if os.path.exists(executable):
+            count("cache.executable.hit")
+            return executable
+        count("cache.executable.miss")
+
+        build_dir = tempfile.mkdtemp(prefix=f"{digest}_build_", dir=self.artifact_dir)
+        try:
+            with open(os.path.join(build_dir, "model.f90"), "w") as f:
+                f.write(source)
+            env = setup_auto_exec_env()
+            with span("model.compile"):
+                _run(["gfortran", "-O", "-c", "model.f90", "-o", "model.o"], build_dir)
+                _run(
+                    ["gfortran", f"-L{env['LD_LIBRARY_PATH']}", "-O", "model.o", "-lauto", "-o", "model.out"],
+                    build_dir,
+                    env=env,
+                )
+            try:
+                os.rename(build_dir, target)
+            except OSError:
+                # Another process finished compiling the same source first
+                shutil.rmtree(build_dir, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            raise
+        return executable
+
+    def remove_stale(self, max_age=24 * 3600):
+        """Removes session directories left behind by crashed processes."""
+        now = time.time()
+        with self._lock:
+            active = {entry[0] for entry in self._sessions.values()}
+        for name in os.listdir(self.sessions_dir):
+            path = os.path.join(self.sessions_dir, name)
+            if path not in active and now - os.path.getmtime(path) > max_age:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+def _safe_name(session_id):
+    return "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in str(session_id))[:40]
+
+
+def _run(cmd, cwd, env=None):
+    try:
+        process = Popen(cmd, cwd=cwd, stdout=PIPE, stderr=PIPE, env=env, universal_newlines=True)
+    except FileNotFoundError:
+        raise OSError("Something went wrong when calling the Fortran compiler. Maybe gfortran is not installed?")
+    out, err = process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"Command {' '.join(cmd)} failed:\n{err or out}")
+    return out
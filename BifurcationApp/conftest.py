@@ -0,0 +1 @@
+"""Makes `bifurcation_engine` importable by the tests when pytest is run from this folder."""
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from bifurcation_engine import KIT_CASES, BranchStore, build_energy_expression, solve_analytic
+
+# A DOF that is not an angle: the nontrivial path P = k + q**2 / 10 reaches P = 3 at |q| = sqrt(20) > pi
+STIFFENING = "k/2*q**2 - P*q**2/2 + q**4/40"
+
+
+def solve(formula, constants, P_max):
+    return solve_analytic(build_energy_expression(formula, "q", constants), constants, P_max)
+
+
+@pytest.mark.parametrize("key, critical_load", [
+    ("stable_symmetric", 1.0),
+    ("unstable_symmetric", 1.5),
+    ("asymmetric", 0.5),
+])
+def test_kit_case_critical_loads(key, critical_load):
+    case = KIT_CASES[key]
+    store = BranchStore(solve(case.formula, case.constants, case.P_max))
+    assert store.critical_loads() == pytest.approx([critical_load])
+
+
+def test_dof_beyond_pi():
+    store = BranchStore(solve(STIFFENING, {"k": 1.0}, 3.0))
+    assert sorted(store.equilibria_at(2.5)) == pytest.approx([-np.sqrt(15), 0.0, np.sqrt(15)], abs=1e-6)
+    # The path is followed up to P_max instead of being cut off at |q| = pi
+    assert np.abs(store.columns["U(1)"]).max() == pytest.approx(np.sqrt(20), abs=1e-6)
+    assert store.critical_loads() == pytest.approx([1.0])
+
+
+def test_explicit_dof_range():
+    store = BranchStore(solve_analytic(
+        build_energy_expression(STIFFENING, "q", {"k": 1.0}), {"k": 1.0}, 3.0, dof_range=(-1.0, 1.0)
+    ))
+    assert np.abs(store.columns["U(1)"]).max() == pytest.approx(1.0)
+
+
+def test_paths_that_never_leave_the_load_window():
+    # P = 1 + 1/q tends to 1 for large |q|, no finite DOF range contains the path
+    assert solve("q**2/2*(1 - P) + q", {}, 3.0) is None
+
+
+def test_energies_without_closed_form():
+    assert solve("k/2*q**2 - P**2*q", {"k": 1.0}, 3.0) is None
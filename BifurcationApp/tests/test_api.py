@@ -0,0 +1,17 @@
+import pytest
+
+from bifurcation_engine import KIT_CASES, solve
+
+STABLE = "k/2*q**2 - P*(1-sp.cos(q))"
+
+
+def test_auto_after_analytic_in_one_process(tmp_path):
+    # The closed-form path leaves pf quantities in sympy's cache, AUTO must not pick them up
+    case = KIT_CASES["asymmetric"]
+    assert solve(case.formula, "q", {"k": 2, "l": 2}, 3).method == "analytic"
+    result = solve(STABLE, "q", {"k": 1}, 3, workspace_root=tmp_path, analytic=False)
+    assert result.method == "auto"
+    assert result.store.critical_loads() == pytest.approx([1.0], abs=1e-5)
+    # And once more, with another model compiled in the same process
+    result = solve(STABLE, "q", {"k": 2}, 3, workspace_root=tmp_path, analytic=False)
+    assert result.store.critical_loads() == pytest.approx([2.0], abs=1e-5)
@@ -0,0 +1,117 @@
+import os
+
+import numpy as np
+import pytest
+
+from bifurcation_engine import ResultArchive, SolutionCache
+
+BRANCHES = [
+    {"PAR(1)": np.linspace(0.0, 1.0, 11), "U(1)": np.zeros(11), "TY": np.array([9, 0, 1], dtype=np.int32)},
+    {"PAR(1)": np.linspace(1.0, 2.0, 5), "U(1)": np.linspace(0.0, 0.5, 5)},
+]
+METADATA = {"energy_hash": "abc", "constants": {"k": 1.0}, "solver": "numpy", "settings": {"ds": 0.1}}
+
+
+def assert_same(branches, expected):
+    assert len(branches) == len(expected)
+    for branch, other in zip(branches, expected):
+        assert branch.keys() == other.keys()
+        for column in other:
+            assert branch[column].dtype == other[column].dtype
+            np.testing.assert_array_equal(branch[column], other[column])
+
+
+def test_round_trip(tmp_path):
+    archive = ResultArchive(str(tmp_path))
+    archive.save("key", BRANCHES, METADATA)
+    assert "key" in archive and "other" not in archive
+    assert archive.keys() == ["key"]
+    assert archive.metadata("key") == METADATA
+    assert dict(archive.entries()) == {"key": METADATA}
+    assert_same(archive.load("key"), BRANCHES)
+
+
+def test_load_maps_the_file_read_only(tmp_path):
+    archive = ResultArchive(str(tmp_path))
+    archive.save("key", BRANCHES)
+    values = archive.load("key")[0]["PAR(1)"]
+    assert not values.flags.writeable
+    base = values
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    assert isinstance(base, np.memmap)
+    # Arrays start at aligned offsets of the file
+    assert values.ctypes.data % 8 == 0
+
+
+def test_replacing_keeps_loaded_arrays_valid(tmp_path):
+    archive = ResultArchive(str(tmp_path))
+    archive.save("key", BRANCHES)
+    loaded = archive.load("key")
+    archive.save("key", [{"PAR(1)": np.ones(3)}])
+    assert_same(loaded, BRANCHES)
+    assert_same(archive.load("key"), [{"PAR(1)": np.ones(3)}])
+
+
+def test_missing_file(tmp_path):
+    archive = ResultArchive(str(tmp_path))
+    assert archive.load("key") is None
+    assert archive.metadata("key") is None
+
+
+@pytest.mark.parametrize("size", [0, 4, 20, -8])
+def test_truncated_file(tmp_path, size):
+    archive = ResultArchive(str(tmp_path))
+    path = archive.save("key", BRANCHES, METADATA)
+    with open(path, "r+b") as f:
+        f.truncate(size if size >= 0 else os.path.getsize(path) + size)
+    assert archive.load("key") is None
+
+
+def test_corrupt_file(tmp_path):
+    archive = ResultArchive(str(tmp_path))
+    path = archive.save("key", BRANCHES, METADATA)
+    with open(path, "r+b") as f:
+        f.write(b"NOTANARC")
+    assert archive.load("key") is None
+    assert archive.metadata("key") is None
+    assert dict(archive.entries()) == {}
+
+    path = archive.save("key", BRANCHES, METADATA)
+    with open(path, "r+b") as f:
+        f.seek(16)
+        f.write(b"\xff\xfe{{")
+    assert archive.load("key") is None
+
+
+def test_object_columns_are_rejected(tmp_path):
+    archive = ResultArchive(str(tmp_path))
+    with pytest.raises(ValueError):
+        archive.save("key", [{"PAR(1)": np.array([1, "x"], dtype=object)}])
+    assert archive.keys() == []
+    assert os.listdir(tmp_path) == []
+
+
+def test_prune(tmp_path):
+    archive = ResultArchive(str(tmp_path))
+    for i, key in enumerate(("old", "middle", "new")):
+        os.utime(archive.save(key, BRANCHES), (i, i))
+    size = os.path.getsize(archive.path("new"))
+    assert archive.prune(2 * size) == ["old"]
+    assert sorted(archive.keys()) == ["middle", "new"]
+
+
+def test_solution_cache_reloads_from_the_archive(tmp_path):
+    SolutionCache(disk_dir=str(tmp_path)).put("key", BRANCHES, METADATA)
+    cache = SolutionCache(disk_dir=str(tmp_path))
+    assert "key" in cache
+    assert_same(cache.get("key"), BRANCHES)
+    assert cache.archive.metadata("key") == METADATA
+
+
+def test_solution_cache_moves_npz_files_into_the_archive(tmp_path):
+    legacy = SolutionCache(disk_dir=str(tmp_path), compressed=True)
+    legacy.put("key", BRANCHES)
+    assert os.listdir(tmp_path) == ["key.npz"]
+    assert_same(SolutionCache(disk_dir=str(tmp_path)).get("key"), BRANCHES)
+    assert os.listdir(tmp_path) == ["key.bfa"]
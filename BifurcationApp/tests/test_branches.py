@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from bifurcation_engine import BranchStore
+
+
+def branch(load, dof, **columns):
+    return {"PAR(1)": np.asarray(load, dtype=float), "U(1)": np.asarray(dof, dtype=float), **columns}
+
+
+def test_monotone_branch_is_one_segment():
+    store = BranchStore([branch([0.0, 0.5, 1.0, 2.0], [0.0, 1.0, 2.0, 4.0])])
+    assert len(store.segments) == 1
+    assert store.equilibria_at(0.75) == pytest.approx([1.5])
+    assert store.equilibria_at(2.0) == pytest.approx([4.0])
+    assert store.critical_loads() == []
+
+
+def test_descending_branch():
+    store = BranchStore([branch([2.0, 1.0, 0.0], [0.0, 1.0, 2.0])])
+    assert store.equilibria_at(0.5) == pytest.approx([1.5])
+
+
+def test_fold_back_in_load():
+    # The load rises to a limit point at 1 and falls again
+    store = BranchStore([branch([0.0, 0.5, 1.0, 0.5, 0.0], [0.0, 0.5, 1.0, 1.5, 2.0])])
+    assert len(store.segments) == 2
+    assert store.critical_loads() == pytest.approx([1.0])
+    assert sorted(store.equilibria_at(0.75)) == pytest.approx([0.75, 1.25])
+    # The turning point belongs to both segments but is reported once
+    assert store.equilibria_at(1.0) == pytest.approx([1.0])
+    assert store.equilibria_at(1.1).size == 0
+
+
+def test_branch_folding_several_times():
+    load = [0.0, 1.0, 0.5, 1.5, 1.0]
+    store = BranchStore([branch(load, np.arange(5.0))])
+    assert len(store.segments) == 4
+    assert store.critical_loads() == pytest.approx([1.0, 1.5])
+    assert sorted(store.equilibria_at(0.75)) == pytest.approx([0.75, 1.5, 2.25])
+
+
+def test_flat_part_does_not_split_segments():
+    store = BranchStore([branch([0.0, 0.5, 0.5, 1.0], [0.0, 1.0, 2.0, 3.0])])
+    assert len(store.segments) == 1
+    assert store.equilibria_at(0.25) == pytest.approx([0.5])
+    assert store.equilibria_at(0.75) == pytest.approx([2.5])
+    assert store.critical_loads() == []
+
+
+def test_loads_outside_the_solved_range():
+    store = BranchStore([branch([0.0, 1.0], [0.0, 1.0]), branch([0.5, 2.0], [1.0, 2.0])])
+    assert store.equilibria_at(-0.1).size == 0
+    assert store.equilibria_at(2.5).size == 0
+    assert store.equilibria_at(0.25) == pytest.approx([0.25])
+    grid = store.equilibria_grid([-1.0, 0.75, 3.0])
+    assert grid.shape == (3, 2)
+    assert np.isnan(grid[0]).all() and np.isnan(grid[2]).all()
+    assert grid[1] == pytest.approx([0.75, 1 + 0.25 / 1.5])
+
+
+def test_critical_loads_from_point_types():
+    store = BranchStore([
+        branch([0.0, 1.0, 2.0], [0.0, 0.0, 0.0], TY=np.array([9, 1, 0])),
+        branch([1.0, 2.0], [0.0, 1.0], TY=np.array([1, 0])),
+    ])
+    # The branch point shared by both branches is listed once
+    assert store.critical_loads() == pytest.approx([1.0])
+
+
+def test_branch_views_share_the_columns():
+    store = BranchStore([branch([0.0, 1.0], [0.0, 1.0]), branch([0.0, 2.0, 3.0], [0.0, 1.0, 2.0])])
+    assert store.n_points == 5
+    assert list(store.branch_ids) == [0, 0, 1, 1, 1]
+    assert np.shares_memory(store[1]["U(1)"], store.columns["U(1)"])
+    store.add_column("STABLE", np.array([True, False, True, True, False]))
+    assert list(store[1]["STABLE"]) == [True, True, False]
+    with pytest.raises(ValueError):
+        store.add_column("X", np.zeros(4))
+
+
+def test_empty_store():
+    store = BranchStore([])
+    assert store.n_points == 0
+    assert store.equilibria_at(1.0).size == 0
+    assert store.critical_loads() == []
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from bifurcation_engine import BranchStore, branch_rows, lttb_indices
+
+
+def test_keeps_endpoints_and_budget():
+    x = np.linspace(0.0, 10.0, 10_000)
+    kept = lttb_indices(x, np.sin(x), 200)
+    assert len(kept) == 200
+    assert kept[0] == 0 and kept[-1] == len(x) - 1
+    assert (np.diff(kept) > 0).all()
+
+
+def test_keeps_extreme_points():
+    x = np.arange(5000, dtype=float)
+    y = np.zeros(5000)
+    y[1234], y[3821] = 50.0, -80.0
+    kept = lttb_indices(x, y, 50)
+    assert 1234 in kept and 3821 in kept
+
+
+def test_keeps_the_turning_point_of_a_fold():
+    # A branch that turns back in x, as at a limit point
+    t = np.linspace(-1.0, 1.0, 4001)
+    x, y = 1.0 - t**2, t
+    kept = lttb_indices(x, y, 100)
+    # The tip of the fold is kept up to the bucket width
+    assert x[kept].max() > 1.0 - 1e-3
+
+
+@pytest.mark.parametrize("n, n_out", [(10, 10), (10, 50), (2, 100), (0, 10), (100, 2)])
+def test_small_inputs_are_unchanged(n, n_out):
+    x = np.arange(n, dtype=float)
+    assert list(lttb_indices(x, x, n_out)) == list(range(n))
+
+
+@pytest.mark.parametrize("n", range(4, 40))
+def test_every_output_length(n):
+    x = np.arange(n, dtype=float)
+    for n_out in range(3, n):
+        kept = lttb_indices(x, np.cos(x), n_out)
+        assert len(kept) == n_out and (np.diff(kept) > 0).all()
+
+
+def test_branch_rows_stay_within_budget():
+    load = np.linspace(0.0, 3.0, 20_000)
+    store = BranchStore([
+        {"PAR(1)": load, "U(1)": np.zeros_like(load)},
+        {"PAR(1)": load[:5000], "U(1)": np.sqrt(load[:5000])},
+    ])
+    rows = branch_rows(store, max_points=500)
+    assert len(rows) <= 500 + 2 * len(store)
+    assert {row["branch"] for row in rows} == {1, 2}
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from bifurcation_engine import KIT_CASES, BranchStore, classified_store, compile_energy, solve_continuation
+
+# Two rigid links with rotational springs; its critical loads are k/l times the eigenvalues of [[2, -1], [-1, 1]]
+CHAIN = "k/2*(q1**2 + (q2-q1)**2) - P*l*(2 - cos(q1) - cos(q2))"
+CHAIN_CONSTANTS = {"k": 2.0, "l": 1.0}
+
+
+@pytest.mark.parametrize("key, critical_load", [
+    ("stable_symmetric", 1.0),
+    ("unstable_symmetric", 1.5),
+    ("asymmetric", 0.5),
+])
+def test_kit_case_critical_loads(key, critical_load):
+    case = KIT_CASES[key]
+    compiled = compile_energy(case.formula, case.dof, list(case.constants))
+    store = BranchStore(solve_continuation(compiled, case.constants, case.P_max))
+    assert store.critical_loads() == pytest.approx([critical_load], abs=1e-6)
+
+
+@pytest.mark.parametrize("key", ["stable_symmetric", "unstable_symmetric", "asymmetric"])
+def test_points_are_equilibria(key):
+    case = KIT_CASES[key]
+    compiled = compile_energy(case.formula, case.dof, list(case.constants))
+    for branch in solve_continuation(compiled, case.constants, case.P_max):
+        # Away from q = +-1, where the square roots of some energies have infinite slopes
+        inside = np.abs(branch["U(1)"]) < 0.99
+        gradient = compiled.gradient_function(
+            branch["U(1)"][inside], branch["PAR(1)"][inside], *compiled.constant_values(case.constants)
+        )
+        assert np.abs(np.asarray(gradient, dtype=float)).max() < 1e-6
+
+
+def test_two_dof_chain():
+    compiled = compile_energy(CHAIN, "q1, q2", list(CHAIN_CONSTANTS))
+    branches = solve_continuation(compiled, CHAIN_CONSTANTS, 3.0)
+    store = classified_store(branches, CHAIN, "q1, q2", CHAIN_CONSTANTS)
+    assert store.critical_loads() == pytest.approx([3 - np.sqrt(5)], abs=1e-6)
+    # The straight chain is stable up to the critical load and unstable above it
+    load, straight = store.columns["PAR(1)"], np.abs(store.columns["U(1)"]) < 1e-9
+    assert store.columns["STABLE"][straight & (load < 0.7)].all()
+    assert not store.columns["STABLE"][straight & (load > 0.8)].any()
+
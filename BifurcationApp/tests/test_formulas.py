@@ -0,0 +1,103 @@
+import threading
+
+import pyfurc as pf
+import pytest
+import sympy as sp
+
+from bifurcation_engine.formulas import (
+    FormulaError, build_energy_expression, dof_names, energy_symbols, parse_constants, parse_formula,
+)
+
+
+def symbols():
+    return energy_symbols("q", ["k", "l"])
+
+
+def test_template_formula():
+    energy = build_energy_expression("(1/2) * k * q**2 * l**2 - 2 * P * l * (1 - sp.sqrt(1 - q**2))", "q", {"k": 1, "l": 1})
+    q, P, k, l = pf.Dof("q"), pf.Load("P"), sp.Symbol("k"), sp.Symbol("l")
+    assert sp.simplify(energy - (0.5 * k * q**2 * l**2 - 2 * P * l * (1 - sp.sqrt(1 - q**2)))) == 0
+
+
+def test_number_division_is_float():
+    assert parse_formula("1/2", symbols()) == sp.Float(0.5)
+
+
+@pytest.mark.parametrize("formula", [
+    "__import__('os').system('true')",
+    "q.__class__",
+    "sp.sympify('q')",
+    "(lambda: 1)()",
+    "[q][0]",
+    "q if P else k",
+    "open('x')",
+    "sqrt(q, k=1)",
+    "x + q",
+    "'text'",
+    "True * q",
+    "q < P",
+])
+def test_rejected_constructs(formula):
+    with pytest.raises(FormulaError):
+        parse_formula(formula, symbols())
+
+
+@pytest.mark.parametrize("formula", [
+    "q**2 - P*q + 10**10**10",
+    "q**2 - P*q + 0**-1",
+    "q**2 - P*q + (-8)**(1/3)",
+    "q**2 - P*q + 10000000000000000",
+    "q**2 - P*q + 0xFFFFFFFFFFFFFFFFFFFFFFFF",
+    "q**2 - P*q + 1e400",
+])
+def test_rejected_numbers(formula):
+    with pytest.raises(FormulaError):
+        parse_formula(formula, symbols())
+
+
+def test_huge_power_is_rejected_quickly():
+    # Evaluated exactly, 9**9**9 keeps the server thread busy for hours
+    outcome = []
+
+    def parse():
+        try:
+            parse_formula("q**2 - P*q + 9**9**9", symbols())
+        except FormulaError as e:
+            outcome.append(e)
+
+    thread = threading.Thread(target=parse, daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive() and len(outcome) == 1
+
+
+def test_number_powers_are_floats():
+    assert parse_formula("2**10", symbols()) == sp.Float(1024)
+    assert parse_formula("q**2", symbols()) == pf.Dof("q") ** 2
+
+
+def test_missing_dof_and_load():
+    with pytest.raises(FormulaError, match="degree of freedom"):
+        build_energy_expression("k * P", "q", {"k": 1})
+    with pytest.raises(FormulaError, match="load"):
+        build_energy_expression("k * q**2", "q", {"k": 1})
+
+
+def test_constants():
+    assert parse_constants("{'l': 1, 'k': 2.5}") == {"l": 1.0, "k": 2.5}
+    for text in ("[1, 2]", "{'l': 'x'}", "{'1l': 1}", "{'l': True}", "__import__('os')"):
+        with pytest.raises(FormulaError):
+            parse_constants(text)
+
+
+def test_reserved_constant_names():
+    with pytest.raises(FormulaError):
+        energy_symbols("q", ["P"])
+    with pytest.raises(FormulaError):
+        energy_symbols("q1, q2", ["q2"])
+
+
+def test_dof_names():
+    assert dof_names("q1, q2") == ("q1", "q2")
+    with pytest.raises(FormulaError):
+        dof_names("q, q")
@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from bifurcation_engine import glyph_widths, wrap_text
+
+FONT, SIZE = "Helvetica", 12
+
+
+def width(text):
+    return glyph_widths(FONT, SIZE).text_width(text)
+
+
+def wrap(text, line_width):
+    """wrap_text run in a thread, failing instead of hanging if it does not terminate."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(wrap_text(text, FONT, SIZE, line_width)), daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive(), "wrap_text did not terminate"
+    return result[0]
+
+
+def test_words_are_wrapped_greedily():
+    text = "the quick brown fox jumps over the lazy dog " * 20
+    lines = wrap(text, 200)
+    assert len(lines) > 1
+    assert all(width(line) <= 200 for line in lines)
+    assert " ".join(lines).split() == text.split()
+    # Every line is full: the first word of the next line would not have fit
+    for line, following in zip(lines, lines[1:]):
+        assert width(line + " " + following.split()[0]) > 200
+
+
+def test_over_long_token_is_broken():
+    token = "x" * 500
+    lines = wrap(f"before {token} after", 100)
+    assert all(width(line) <= 100 for line in lines)
+    assert lines[0] == "before"
+    assert len([line for line in lines if set(line) == {"x"}]) >= 4
+    # Only the token is broken, between characters, nothing is lost
+    assert "".join(" ".join(lines).split()) == f"before{token}after"
+    assert lines[-1].endswith(" after")
+
+
+def test_token_of_exactly_one_line():
+    token = "m" * 10
+    assert wrap(token, width(token)) == (token,)
+
+
+def test_narrower_than_a_character_terminates():
+    # Every character is wider than the line, each one is placed on a line of its own
+    assert wrap("abc de", 1) == ("a", "b", "c", "d", "e")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", ("",)),
+    ("\n", ("", "")),
+    ("   ", ("",)),
+    ("first\n\nsecond", ("first", "", "second")),
+    ("one\n  \ntwo\n", ("one", "", "two", "")),
+])
+def test_empty_lines_and_paragraphs(text, expected):
+    assert wrap(text, 300) == expected
@@ -0,0 +1,50 @@
+import io
+import threading
+
+from PIL import Image
+
+from bifurcation_engine import FigureSpec, ReportBuilder
+
+
+def image_bytes(mode, format):
+    buffer = io.BytesIO()
+    Image.new(mode, (320, 240), (200, 10, 10, 128)[:len(mode)]).save(buffer, format)
+    return buffer.getvalue()
+
+
+def plot():
+    spec = FigureSpec(title="Bifurcation Plot", xlabel="q", ylabel="P")
+    spec.add_line([0.0, 1.0], [0.0, 1.0], label="Stable")
+    return spec
+
+
+def build(builder, description, sketch=None):
+    return builder.build(description, sketch, "k*q**2 - P*q", "q", 3.0, {"k": 1.0}, plot())
+
+
+def test_reports_are_cached_by_their_inputs():
+    builder = ReportBuilder()
+    pdf = build(builder, "A description")
+    assert pdf.startswith(b"%PDF")
+    assert build(builder, "A description") is pdf
+    assert build(builder, "Another description") is not pdf
+
+
+def test_concurrent_builds_with_shared_images():
+    builder = ReportBuilder()
+    sketches = [image_bytes("RGBA", "PNG"), image_bytes("RGB", "JPEG")]
+    pdfs, errors = [], []
+
+    def work(i):
+        try:
+            pdfs.append(build(builder, f"Report {i} " * 100, sketches[i % 2]))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(pdfs) == 8 and all(pdf.startswith(b"%PDF") for pdf in pdfs)
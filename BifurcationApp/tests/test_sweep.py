@@ -0,0 +1,30 @@
+import pytest
+
+from bifurcation_engine import grid_configurations, parse_grid
+from bifurcation_engine.sweep import main
+
+
+def test_parse_grid():
+    assert parse_grid(["k=0.5:2:4", "l=1,2"]) == {"k": [0.5, 1.0, 1.5, 2.0], "l": [1.0, 2.0]}
+
+
+@pytest.mark.parametrize("specs", [["k"], ["k=1:2"], ["k=a"], ["k=1:2:3", "k=5"], ["k=1", " k =2"]])
+def test_invalid_grids(specs):
+    with pytest.raises(ValueError):
+        parse_grid(specs)
+
+
+def test_grid_configurations():
+    configurations = grid_configurations({"k": [1.0, 2.0], "l": [3.0]}, base={"l": 1.0, "c": 4.0})
+    assert configurations == [{"l": 3.0, "c": 4.0, "k": 1.0}, {"l": 3.0, "c": 4.0, "k": 2.0}]
+
+
+@pytest.mark.parametrize("grid", [["zz=1,2"], ["k=1:2:3", "k=5"]])
+def test_cli_rejects_bad_grids_before_solving(grid, tmp_path, capsys):
+    arguments = ["asymmetric", "--out", str(tmp_path / "sweep")]
+    for spec in grid:
+        arguments += ["--grid", spec]
+    with pytest.raises(SystemExit) as error:
+        main(arguments)
+    assert error.value.code == 2
+    assert not (tmp_path / "sweep").exists()
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from bifurcation_engine import ShallowTruss
+
+# Default inputs of the Limit Point / Saddle-node page
+DEFAULT = {"L": 2.0, "k": 1.0, "alpha": np.radians(30.0)}
+
+
+def energy(truss, theta, P):
+    Lb = truss.bar_length
+    return 0.5 * truss.k * (2 * Lb * (np.cos(theta) - np.cos(truss.alpha))) ** 2 - P * Lb * (np.sin(truss.alpha) - np.sin(theta))
+
+
+def test_limit_point_and_snap_through():
+    P_limit, theta_cr, theta_after = ShallowTruss(**DEFAULT).snap_through()
+    assert P_limit == pytest.approx(0.2554, abs=1e-4)
+    assert np.degrees(theta_cr) == pytest.approx(17.60, abs=0.01)
+    assert np.degrees(theta_after) == pytest.approx(-34.35, abs=0.01)
+
+
+def test_load_is_stationary_energy():
+    truss = ShallowTruss(**DEFAULT)
+    theta = np.linspace(-1.2, 1.2, 25)
+    P = truss.load(theta)
+    h = 1e-6
+    slope = (energy(truss, theta + h, P) - energy(truss, theta - h, P)) / (2 * h)
+    assert np.abs(slope).max() < 1e-6
+
+
+def test_angle_at_solves_the_load():
+    truss = ShallowTruss(**DEFAULT)
+    P_limit = truss.snap_through()[0]
+    loads = np.linspace(0.0, 3 * P_limit, 1001)
+    theta = truss.angle_at(loads)
+    assert truss.load(theta) == pytest.approx(loads, abs=1e-9)
+    assert truss.stable(theta).all()
+    # Before the limit load the truss is on the upper branch, after it on the snapped one
+    assert (theta[loads < P_limit] > 0).all() and (theta[loads > P_limit] < 0).all()
+
+
+def test_batch_of_geometries():
+    alpha = np.radians([10.0, 30.0, 50.0])[:, None]
+    truss = ShallowTruss(2.0, 1.0, alpha)
+    loads = np.linspace(0.0, 1.0, 7)
+    theta = truss.angle_at(loads)
+    assert theta.shape == (3, 7)
+    for i in range(3):
+        single = ShallowTruss(2.0, 1.0, alpha[i, 0])
+        assert theta[i] == pytest.approx(single.angle_at(loads), abs=1e-12)
+        assert truss.limit_point()[1][i, 0] == pytest.approx(single.limit_point()[1])
+
+
+@pytest.mark.parametrize("arguments", [(0.0, 1.0, 0.5), (2.0, -1.0, 0.5), (2.0, 1.0, 0.0), (2.0, 1.0, np.pi / 2)])
+def test_invalid_geometry(arguments):
+    with pytest.raises(ValueError):
+        ShallowTruss(*arguments)